@@ -0,0 +1,131 @@
+import random
+from typing import Dict, List
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.university import Base, Branch, Section, Teacher, Room, Subject, Course
+
+# Institution sizes; every section takes 6 theory subjects and 1-2 labs
+SCALES = {
+    'small': {'branches': 2, 'sections_per_branch': 2},
+    'medium': {'branches': 4, 'sections_per_branch': 3},
+    'large': {'branches': 6, 'sections_per_branch': 4},
+    'xlarge': {'branches': 10, 'sections_per_branch': 5}
+}
+
+BRANCH_CODES = ('CSE', 'ECE', 'EEE', 'MECH', 'CIVIL', 'IT', 'CHEM', 'AERO', 'BIO', 'MATH')
+SHARED_SUBJECTS = ('Mathematics', 'Physics', 'English')
+CLASSROOM_CAPACITIES = (40, 60, 75, 120)
+SECTION_STRENGTHS = (45, 60, 70)
+TEACHER_WEEKLY_LOAD = 16
+
+
+def create_session() -> Session:
+    # Throwaway in-memory database with the university schema
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def populate(db: Session, user_id: int, branches: int, sections_per_branch: int, seed: int = 0) -> Dict:
+    """Fill ``db`` with a reproducible synthetic institution for ``user_id``.
+
+    Shared subjects (maths, physics, English) are taught across branches by
+    one common teacher pool; branch subjects by a per-branch pool. Pools are
+    sized for about ``TEACHER_WEEKLY_LOAD`` hours a week per teacher and
+    every course goes to the least loaded qualified teacher, so the
+    instances are tight but feasible. Returns counts of what was created.
+    """
+    rng = random.Random(seed)
+    counts = {'branches': 0, 'sections': 0, 'teachers': 0, 'rooms': 0, 'subjects': 0, 'courses': 0, 'hours': 0}
+
+    def add_teachers(prefix: str, hours: int) -> List[Teacher]:
+        pool = [
+            Teacher(name=f"{prefix} Teacher {index + 1}", employee_id=f"{user_id}-{prefix}-{index + 1}",
+                    department=prefix, max_hours_per_day=rng.choice((4, 5, 6)), user_id=user_id)
+            for index in range(max(-(-hours // TEACHER_WEEKLY_LOAD), 2))
+        ]
+        db.add_all(pool)
+        counts['teachers'] += len(pool)
+        return pool
+
+    def add_subject(name: str, code: str, subject_type: str, hours: int) -> Subject:
+        subject = Subject(name=name, code=code, credits=hours, subject_type=subject_type,
+                          hours_per_week=hours, user_id=user_id)
+        db.add(subject)
+        counts['subjects'] += 1
+        return subject
+
+    shared = [add_subject(name, f"GEN{index + 1}", 'theory', rng.choice((3, 4)))
+              for index, name in enumerate(SHARED_SUBJECTS)]
+    total_sections = branches * sections_per_branch
+    shared_pool = add_teachers('GEN', sum(subject.hours_per_week for subject in shared) * total_sections)
+
+    plan = []
+    for branch_index in range(branches):
+        code = BRANCH_CODES[branch_index % len(BRANCH_CODES)]
+        if branch_index >= len(BRANCH_CODES):
+            code += str(branch_index // len(BRANCH_CODES) + 1)
+        branch = Branch(name=code, code=code, user_id=user_id)
+        db.add(branch)
+        counts['branches'] += 1
+
+        core = [add_subject(f"{code} Core {index + 1}", f"{code}{index + 1}", 'theory', rng.choice((3, 4)))
+                for index in range(3)]
+        labs = [add_subject(f"{code} Lab {index + 1}", f"{code}L{index + 1}", 'lab', rng.choice((2, 3)))
+                for index in range(rng.choice((1, 2)))]
+        pool = add_teachers(code, sum(subject.hours_per_week for subject in core + labs) * sections_per_branch)
+
+        for section_index in range(sections_per_branch):
+            section = Section(name=chr(ord('A') + section_index), year=1 + section_index % 4,
+                              semester=1 + section_index % 2, strength=rng.choice(SECTION_STRENGTHS),
+                              branch=branch, user_id=user_id)
+            db.add(section)
+            counts['sections'] += 1
+            plan.extend((section, subject, shared_pool) for subject in shared)
+            plan.extend((section, subject, pool) for subject in core + labs)
+
+    labs_needed = sum(1 for _, subject, _ in plan if subject.subject_type == 'lab')
+    rooms = [Room(number=f"C{index + 1}", building='Main', capacity=rng.choice(CLASSROOM_CAPACITIES),
+                  room_type='classroom', user_id=user_id)
+             for index in range(max(total_sections, 2))]
+    rooms += [Room(number=f"L{index + 1}", building='Labs', capacity=75, room_type='lab', user_id=user_id)
+              for index in range(max(-(-labs_needed // 4), 1))]
+    db.add_all(rooms)
+    counts['rooms'] = len(rooms)
+    db.flush()
+
+    load = {}
+    for section, subject, pool in plan:
+        lightest = min(load.get(teacher.id, 0) for teacher in pool)
+        teacher = rng.choice([teacher for teacher in pool if load.get(teacher.id, 0) == lightest])
+        load[teacher.id] = lightest + subject.hours_per_week
+        db.add(Course(section_id=section.id, subject_id=subject.id, teacher_id=teacher.id, user_id=user_id))
+        counts['courses'] += 1
+        counts['hours'] += subject.hours_per_week
+
+    db.commit()
+    return counts
+
+
+def smart_timetable_courses(db: Session, user_id: int) -> Dict[int, List[Dict]]:
+    # The flat course rows the public generator reads, grouped by section
+    rows = db.query(
+        Course.id, Course.section_id, Subject.name, Subject.code, Subject.hours_per_week, Teacher.name,
+        Room.number, Room.building
+    ).join(Subject, Course.subject_id == Subject.id).join(Teacher, Course.teacher_id == Teacher.id).outerjoin(
+        Room, Course.room_id == Room.id
+    ).filter(Course.user_id == user_id).order_by(Course.id).all()
+
+    sections: Dict[int, List[Dict]] = {}
+    for course_id, section_id, name, code, hours, teacher, room, building in rows:
+        sections.setdefault(section_id, []).append({
+            'id': course_id,
+            'subject_name': name,
+            'subject_code': code,
+            'hours_per_week': hours,
+            'teacher_name': teacher,
+            'room_number': room,
+            'building': building
+        })
+    return sections
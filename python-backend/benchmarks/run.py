@@ -0,0 +1,204 @@
+"""Solver benchmark over synthetic institutions.
+
+Run from python-backend:
+
+    python -m benchmarks.run --scales small,medium --solvers greedy,backtracking --output bench.json
+    python -m benchmarks.run --output after.json --baseline before.json
+
+Every (scale, generator) pair gets a fresh in-memory database populated by
+``benchmarks.dataset`` with the same seed, so reports from different
+commits describe the same instances and can be compared run by run.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List, Optional
+from benchmarks.dataset import SCALES, create_session, populate, smart_timetable_courses
+from config.sqlalchemy_db import assert_max_queries
+from services.conflict_analysis import GridEncoder, find_clashes
+from services.problem_instance import ProblemInstance
+from services.slot_template import slot_template_from_config
+from services.smart_timetable import generate_smart_timetable
+from services.solver_backends import solver_names
+from services.university_timetable_service import UniversityTimetableService
+
+BENCHMARK_USER_ID = 1
+
+# Registered service backends, plus 'smart': the public per-section generator
+SOLVERS = tuple(solver_names()) + ('smart',)
+DEFAULT_SOLVERS = ('fast', 'greedy', 'backtracking', 'multistart', 'smart')
+
+# 7 periods a day: 35 teaching periods a week for roughly 25 hours per section
+BENCHMARK_CONFIG = {'start_time': '08:30', 'end_time': '17:00', 'lunch_start': '12:30'}
+
+
+def measure(run) -> Dict:
+    tracemalloc.start()
+    started = perf_counter()
+    try:
+        result = run()
+        wall_ms = (perf_counter() - started) * 1000
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    result.update(wall_ms=round(wall_ms, 1), peak_memory_kb=round(peak / 1024, 1))
+    return result
+
+
+def run_service(solver: str, seed: int, config: Dict) -> Dict:
+    db = create_session()
+    counts = populate(db, BENCHMARK_USER_ID, seed=seed, **config['scale'])
+
+    # Loading must stay within its round-trip budget at every scale; a lazy
+    # load creeping back in fails the run instead of just slowing it down
+    with assert_max_queries(db, ProblemInstance.ROUND_TRIPS) as load:
+        ProblemInstance.from_db(db, BENCHMARK_USER_ID)
+    counts['load_queries'] = load.count
+
+    def run() -> Dict:
+        service = UniversityTimetableService(db)
+        timetables = service.generate_tenant_timetables(
+            BENCHMARK_USER_ID, {**BENCHMARK_CONFIG, **config['options'], 'solver': solver, 'seed': seed}
+        )
+        stats = service.solver_stats
+        conflicts = len(service.conflicts)
+        if timetables is not None:
+            conflicts += service.audit_tenant_conflicts(BENCHMARK_USER_ID)['total_conflicts']
+        return {
+            'placed_hours': stats.get('placed_hours', 0),
+            'total_hours': stats.get('total_hours', counts['hours']),
+            'conflicts': conflicts,
+            'complete': bool(stats.get('complete')) and timetables is not None,
+            'penalty': stats.get('penalty')
+        }
+
+    result = measure(run)
+    db.close()
+    return {**counts, **result}
+
+
+def run_smart(seed: int, config: Dict) -> Dict:
+    db = create_session()
+    counts = populate(db, BENCHMARK_USER_ID, seed=seed, **config['scale'])
+    sections = smart_timetable_courses(db, BENCHMARK_USER_ID)
+    db.close()
+
+    def run() -> Dict:
+        template = slot_template_from_config(BENCHMARK_CONFIG)
+        grids = {section_id: generate_smart_timetable(courses, template) for section_id, courses in sections.items()}
+
+        # Clashes are counted across sections, as the tenant audit does
+        day_encoder, teacher_encoder, room_encoder = GridEncoder(), GridEncoder(), GridEncoder()
+        days, periods, teachers, rooms, owners = [], [], [], [], []
+        for section_id, grid in grids.items():
+            for day, slots in grid.items():
+                for slot_number, slot in slots.items():
+                    if slot['type'] != 'class':
+                        continue
+                    days.append(day_encoder.encode(day))
+                    periods.append(slot_number - 1)
+                    teachers.append(teacher_encoder.encode(slot['teacher']))
+                    rooms.append(room_encoder.encode(slot['room']))
+                    owners.append(section_id)
+        clashes = find_clashes(days, periods, {'teacher': teachers, 'room': rooms, 'section': owners},
+                               template.periods_per_day)
+        return {
+            'placed_hours': len(days),
+            'total_hours': counts['hours'],
+            'conflicts': len(clashes),
+            'complete': len(days) == counts['hours'] and not clashes,
+            'penalty': None
+        }
+
+    return {**counts, **measure(run)}
+
+
+def run_benchmarks(scales: List[str], solvers: List[str], seed: int, options: Dict) -> List[Dict]:
+    runs = []
+    for scale in scales:
+        config = {'scale': SCALES[scale], 'options': options}
+        for solver in solvers:
+            result = run_smart(seed, config) if solver == 'smart' else run_service(solver, seed, config)
+            result['placement_rate'] = round(result['placed_hours'] / result['total_hours'], 4) if result['total_hours'] else 1.0
+            runs.append({'scale': scale, 'solver': solver, **result})
+            print(f"{scale:>7} {solver:>12}  {result['wall_ms']:>10.1f} ms  {result['peak_memory_kb']:>10.1f} KiB  "
+                  f"placed {result['placement_rate']:.1%}  conflicts {result['conflicts']}", file=sys.stderr)
+    return runs
+
+
+def compare(runs: List[Dict], baseline: Dict):
+    # Ratios against the same (scale, solver) run of an earlier report
+    previous = {(run['scale'], run['solver']): run for run in baseline.get('runs', [])}
+    for run in runs:
+        before = previous.get((run['scale'], run['solver']))
+        if not before:
+            continue
+        run['baseline'] = {
+            'commit': baseline.get('commit'),
+            'wall_ms': before['wall_ms'],
+            'speedup': round(before['wall_ms'] / run['wall_ms'], 3) if run['wall_ms'] else None,
+            'placement_rate_change': round(run['placement_rate'] - before['placement_rate'], 4),
+            'conflicts_change': run['conflicts'] - before['conflicts']
+        }
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Benchmark timetable generators on synthetic institutions")
+    parser.add_argument('--scales', default='small,medium,large', help=f"comma separated, from {', '.join(SCALES)}")
+    parser.add_argument('--solvers', default=','.join(DEFAULT_SOLVERS), help=f"comma separated, from {', '.join(SOLVERS)}")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--time-limit-ms', type=int, help="wall-clock budget passed to the service solvers")
+    parser.add_argument('--max-backtracks', type=int, default=20000)
+    parser.add_argument('--attempts', type=int, default=16)
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    parser.add_argument('--baseline', help="earlier JSON report to compare against")
+    args = parser.parse_args(argv)
+
+    scales = [scale for scale in args.scales.split(',') if scale]
+    solvers = [solver for solver in args.solvers.split(',') if solver]
+    unknown = [name for name in scales if name not in SCALES] + [name for name in solvers if name not in SOLVERS]
+    if unknown:
+        parser.error(f"unknown scale or solver: {', '.join(unknown)}")
+
+    options = {'max_backtracks': args.max_backtracks, 'attempts': args.attempts, 'workers': args.workers}
+    if args.time_limit_ms:
+        options['time_limit_ms'] = args.time_limit_ms
+
+    report = {
+        'commit': current_commit(),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'options': options,
+        'runs': run_benchmarks(scales, solvers, args.seed, options)
+    }
+    if args.baseline:
+        with open(args.baseline) as handle:
+            compare(report['runs'], json.load(handle))
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+    return report
+
+
+if __name__ == '__main__':
+    main()
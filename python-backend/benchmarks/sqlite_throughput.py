@@ -0,0 +1,159 @@
+"""Read/write throughput of the pooled SQLite layer under each tuning profile.
+
+Run from python-backend:
+
+    python -m benchmarks.sqlite_throughput --profiles default,production --readers 8 --writers 2
+    python -m benchmarks.sqlite_throughput --seconds 5 --output sqlite.json
+
+Each profile gets a fresh database file seeded with the same timetable-like
+rows. Reader threads look up one timetable's slots through
+``execute_query`` while writer threads add slots through
+``execute_insert``, all sharing one ``SQLiteDatabase`` pool, for a fixed
+wall-clock window.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from time import perf_counter
+from typing import Dict, List, Optional
+from benchmarks.run import current_commit
+from config.sqlite_database import SQLiteDatabase
+from config.sqlite_tuning import PROFILES, SQLiteTuning
+
+SCHEMA = """
+CREATE TABLE slots (
+    id INTEGER PRIMARY KEY,
+    timetable_id INTEGER NOT NULL,
+    course_id INTEGER,
+    day TEXT NOT NULL,
+    slot_number INTEGER NOT NULL,
+    room_id INTEGER
+)
+"""
+
+READ_QUERY = "SELECT id, course_id, day, slot_number, room_id FROM slots WHERE timetable_id = ? ORDER BY day, slot_number"
+WRITE_QUERY = "INSERT INTO slots (timetable_id, course_id, day, slot_number, room_id) VALUES (?, ?, ?, ?, ?)"
+DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+
+def seed_database(path: str, timetables: int, seed: int):
+    rng = random.Random(seed)
+    rows = [
+        (timetable_id, rng.randrange(1000), day, slot_number, rng.randrange(50))
+        for timetable_id in range(1, timetables + 1)
+        for day in DAYS
+        for slot_number in range(1, 8)
+    ]
+    db = SQLiteDatabase(path, SQLiteTuning.from_env('default'))
+    with db.pool.connection() as connection:
+        connection.execute(SCHEMA)
+        connection.execute("CREATE INDEX idx_slots_timetable ON slots (timetable_id)")
+        connection.executemany(WRITE_QUERY, rows)
+        connection.commit()
+    db.pool.close()
+
+
+def run_profile(profile: str, readers: int, writers: int, seconds: float, timetables: int, seed: int) -> Dict:
+    directory = tempfile.mkdtemp(prefix='sqlite-bench-')
+    path = os.path.join(directory, 'bench.db')
+    seed_database(path, timetables, seed)
+
+    db = SQLiteDatabase(path, SQLiteTuning.from_env(profile))
+    stop = threading.Event()
+    counts = {'reads': [0] * readers, 'writes': [0] * writers, 'errors': [0] * (readers + writers)}
+
+    def read(worker: int):
+        rng = random.Random(seed + worker)
+        while not stop.is_set():
+            if db.execute_query(READ_QUERY, (rng.randint(1, timetables),)) is None:
+                counts['errors'][worker] += 1
+            else:
+                counts['reads'][worker] += 1
+
+    def write(worker: int):
+        rng = random.Random(seed + readers + worker)
+        while not stop.is_set():
+            row = (rng.randint(1, timetables), rng.randrange(1000), rng.choice(DAYS), rng.randint(1, 7), rng.randrange(50))
+            if db.execute_insert(WRITE_QUERY, row) is None:
+                counts['errors'][readers + worker] += 1
+            else:
+                counts['writes'][worker] += 1
+
+    threads = [threading.Thread(target=read, args=(worker,)) for worker in range(readers)]
+    threads += [threading.Thread(target=write, args=(worker,)) for worker in range(writers)]
+    started = perf_counter()
+    for thread in threads:
+        thread.start()
+    stop.wait(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    elapsed = perf_counter() - started
+    db.pool.close()
+
+    for name in os.listdir(directory):
+        os.remove(os.path.join(directory, name))
+    os.rmdir(directory)
+
+    reads, writes = sum(counts['reads']), sum(counts['writes'])
+    return {
+        'profile': profile,
+        'settings': db.pool.tuning.as_dict(),
+        'seconds': round(elapsed, 2),
+        'reads': reads,
+        'writes': writes,
+        'errors': sum(counts['errors']),
+        'reads_per_second': round(reads / elapsed, 1),
+        'writes_per_second': round(writes / elapsed, 1)
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> Dict:
+    parser = argparse.ArgumentParser(description="Concurrent read/write throughput per SQLite tuning profile")
+    parser.add_argument('--profiles', default='default,production', help=f"comma separated, from {', '.join(PROFILES)}")
+    parser.add_argument('--readers', type=int, default=8)
+    parser.add_argument('--writers', type=int, default=2)
+    parser.add_argument('--seconds', type=float, default=3.0)
+    parser.add_argument('--timetables', type=int, default=500, help="timetables seeded before the run, 35 slots each")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="write the JSON report here instead of stdout")
+    args = parser.parse_args(argv)
+
+    profiles = [profile for profile in args.profiles.split(',') if profile]
+    unknown = [profile for profile in profiles if profile not in PROFILES]
+    if unknown:
+        parser.error(f"unknown profile: {', '.join(unknown)}")
+
+    runs = []
+    for profile in profiles:
+        result = run_profile(profile, args.readers, args.writers, args.seconds, args.timetables, args.seed)
+        runs.append(result)
+        print(f"{profile:>12}  reads {result['reads_per_second']:>10.1f}/s  writes {result['writes_per_second']:>9.1f}/s  "
+              f"errors {result['errors']}", file=sys.stderr)
+
+    report = {
+        'commit': current_commit(),
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'options': {'readers': args.readers, 'writers': args.writers, 'seconds': args.seconds,
+                    'timetables': args.timetables, 'seed': args.seed},
+        'runs': runs
+    }
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            handle.write(output + '\n')
+    else:
+        print(output)
+    return report
+
+
+if __name__ == '__main__':
+    main()
@@ -32,8 +32,7 @@ def clear_users():
     if confirm == 'YES':
         try:
             query = "DELETE FROM users"
-            result = database.execute_query("DELETE FROM users")
-            database.connection.commit()
+            database.execute_insert(query)
             print("All users deleted successfully!")
         except Exception as e:
             print(f"Error deleting users: {e}")
@@ -1,175 +1,271 @@
 import mysql.connector
-from mysql.connector import Error
+from mysql.connector import Error, pooling
+from mysql.connector.errors import PoolError
 import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 load_dotenv()
 
+TABLES = {
+    'users': '''
+        CREATE TABLE IF NOT EXISTS users (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            email VARCHAR(255) UNIQUE NOT NULL,
+            password VARCHAR(255) NOT NULL,
+            name VARCHAR(255) NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''',
+    'sections': '''
+        CREATE TABLE IF NOT EXISTS sections (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            year INT DEFAULT 1,
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''',
+    'courses': '''
+        CREATE TABLE IF NOT EXISTS courses (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            teacher VARCHAR(255) NOT NULL,
+            room VARCHAR(255),
+            section_id INT,
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (section_id) REFERENCES sections(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''',
+    'branches': '''
+        CREATE TABLE IF NOT EXISTS branches (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            code VARCHAR(10) NOT NULL,
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''',
+    'university_sections': '''
+        CREATE TABLE IF NOT EXISTS university_sections (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            year INT NOT NULL,
+            semester INT NOT NULL,
+            branch_id INT,
+            strength INT DEFAULT 60,
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (branch_id) REFERENCES branches(id),
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''',
+    'teachers': '''
+        CREATE TABLE IF NOT EXISTS teachers (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            employee_id VARCHAR(20) UNIQUE NOT NULL,
+            department VARCHAR(255),
+            max_hours_per_day INT DEFAULT 6,
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''',
+    'rooms': '''
+        CREATE TABLE IF NOT EXISTS rooms (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            number VARCHAR(20) NOT NULL,
+            building VARCHAR(255),
+            capacity INT DEFAULT 60,
+            room_type VARCHAR(20) DEFAULT 'classroom',
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    ''',
+    'subjects': '''
+        CREATE TABLE IF NOT EXISTS subjects (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            name VARCHAR(255) NOT NULL,
+            code VARCHAR(20) NOT NULL,
+            credits INT DEFAULT 3,
+            subject_type VARCHAR(20) DEFAULT 'theory',
+            hours_per_week INT DEFAULT 3,
+            user_id INT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (user_id) REFERENCES users(id)
+        )
+    '''
+}
+
 class Database:
+    """Pooled MySQL access; every call checks out a connection and opens its own cursor.
+
+    The pool is created on first use, and again after a failed attempt, so
+    the process starts even while MySQL is down. Checked-out connections
+    are pinged and reconnected if the server dropped them. When all
+    ``DB_POOL_SIZE`` connections are busy, callers retry for up to
+    ``DB_POOL_TIMEOUT`` seconds. The schema is not touched at startup; run
+    ``python -m config.database`` once to create it.
+    """
+
     def __init__(self):
-        self.connection = None
-        self.cursor = None
-        self.connect()
-        self.create_tables()
-    
-    def connect(self):
-        try:
-            # First try to create database if it doesn't exist
-            temp_connection = mysql.connector.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                user=os.getenv('DB_USER', 'root'),
-                password=os.getenv('DB_PASSWORD', '')
-            )
-            temp_cursor = temp_connection.cursor()
-            temp_cursor.execute("CREATE DATABASE IF NOT EXISTS timetable")
-            temp_connection.commit()
-            temp_cursor.close()
-            temp_connection.close()
-            
-            # Now connect to the database
-            self.connection = mysql.connector.connect(
-                host=os.getenv('DB_HOST', 'localhost'),
-                database=os.getenv('DB_NAME', 'timetable'),
-                user=os.getenv('DB_USER', 'root'),
-                password=os.getenv('DB_PASSWORD', '')
-            )
-            self.cursor = self.connection.cursor(dictionary=True)
-            print("MySQL Connected Successfully")
-        except Error as e:
-            print(f"MySQL connection failed: {e}")
-            print("Please ensure MySQL is running and credentials are correct")
-            self.connection = None
-            self.cursor = None
-    
-    def create_tables(self):
-        if not self.connection:
-            return
-        
-        tables = {
-            'users': '''
-                CREATE TABLE IF NOT EXISTS users (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    email VARCHAR(255) UNIQUE NOT NULL,
-                    password VARCHAR(255) NOT NULL,
-                    name VARCHAR(255) NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            ''',
-            'sections': '''
-                CREATE TABLE IF NOT EXISTS sections (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    year INT DEFAULT 1,
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            ''',
-            'courses': '''
-                CREATE TABLE IF NOT EXISTS courses (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    teacher VARCHAR(255) NOT NULL,
-                    room VARCHAR(255),
-                    section_id INT,
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (section_id) REFERENCES sections(id),
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            ''',
-            'branches': '''
-                CREATE TABLE IF NOT EXISTS branches (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    code VARCHAR(10) NOT NULL,
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            ''',
-            'university_sections': '''
-                CREATE TABLE IF NOT EXISTS university_sections (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    year INT NOT NULL,
-                    semester INT NOT NULL,
-                    branch_id INT,
-                    strength INT DEFAULT 60,
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (branch_id) REFERENCES branches(id),
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            ''',
-            'teachers': '''
-                CREATE TABLE IF NOT EXISTS teachers (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    employee_id VARCHAR(20) UNIQUE NOT NULL,
-                    department VARCHAR(255),
-                    max_hours_per_day INT DEFAULT 6,
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            ''',
-            'rooms': '''
-                CREATE TABLE IF NOT EXISTS rooms (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    number VARCHAR(20) NOT NULL,
-                    building VARCHAR(255),
-                    capacity INT DEFAULT 60,
-                    room_type VARCHAR(20) DEFAULT 'classroom',
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            ''',
-            'subjects': '''
-                CREATE TABLE IF NOT EXISTS subjects (
-                    id INT AUTO_INCREMENT PRIMARY KEY,
-                    name VARCHAR(255) NOT NULL,
-                    code VARCHAR(20) NOT NULL,
-                    credits INT DEFAULT 3,
-                    subject_type VARCHAR(20) DEFAULT 'theory',
-                    hours_per_week INT DEFAULT 3,
-                    user_id INT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (user_id) REFERENCES users(id)
-                )
-            '''
+        self.pool_size = int(os.getenv('DB_POOL_SIZE', '5'))
+        self.pool_timeout = float(os.getenv('DB_POOL_TIMEOUT', '10'))
+        self.pool = None
+        self._lock = threading.Lock()
+        self._stats = {'checkouts': 0, 'in_use': 0, 'peak_in_use': 0, 'waits': 0, 'wait_ms': 0.0,
+                       'reconnects': 0, 'errors': 0}
+
+    def _settings(self, with_database=True):
+        settings = {
+            'host': os.getenv('DB_HOST', 'localhost'),
+            'user': os.getenv('DB_USER', 'root'),
+            'password': os.getenv('DB_PASSWORD', '')
         }
-        
+        if with_database:
+            settings['database'] = os.getenv('DB_NAME', 'timetable')
+        return settings
+
+    def _get_pool(self):
+        with self._lock:
+            if self.pool is None:
+                self.pool = pooling.MySQLConnectionPool(
+                    pool_name=os.getenv('DB_POOL_NAME', 'timetable'),
+                    pool_size=self.pool_size,
+                    pool_reset_session=True,
+                    **self._settings()
+                )
+                print("MySQL Connected Successfully")
+            return self.pool
+
+    def _count(self, name, value=1):
+        with self._lock:
+            self._stats[name] += value
+
+    def _checkout(self):
+        pool = self._get_pool()
+        deadline = time.monotonic() + self.pool_timeout
+        waited_since = None
+        while True:
+            try:
+                connection = pool.get_connection()
+                break
+            except PoolError:
+                # mysql.connector raises instead of blocking when the pool is exhausted
+                if waited_since is None:
+                    waited_since = time.monotonic()
+                    self._count('waits')
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.01)
+        if waited_since is not None:
+            self._count('wait_ms', (time.monotonic() - waited_since) * 1000)
+
+        # Pre-ping: recover connections the server closed while they sat in the pool
+        try:
+            connection.ping(reconnect=False)
+        except Error:
+            self._count('reconnects')
+            try:
+                connection.ping(reconnect=True, attempts=3, delay=1)
+            except Error:
+                connection.close()
+                raise
+        return connection
+
+    @contextmanager
+    def connection(self):
+        connection = self._checkout()
+        with self._lock:
+            self._stats['checkouts'] += 1
+            self._stats['in_use'] += 1
+            self._stats['peak_in_use'] = max(self._stats['peak_in_use'], self._stats['in_use'])
         try:
-            for table_name, query in tables.items():
-                self.cursor.execute(query)
-            self.connection.commit()
+            yield connection
+        finally:
+            self._count('in_use', -1)
+            # Returns the connection to the pool (a pooled connection's close does not disconnect)
+            connection.close()
+
+    def ping(self):
+        try:
+            with self.connection():
+                return True
         except Error as e:
-            print(f"Error creating tables: {e}")
-    
+            print(f"MySQL connection failed: {e}")
+            return False
+
     def execute_query(self, query, params=None):
-        if not self.cursor:
-            return None
         try:
-            self.cursor.execute(query, params or ())
-            return self.cursor.fetchall()
+            with self.connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    cursor.execute(query, params or ())
+                    return cursor.fetchall()
+                finally:
+                    cursor.close()
         except Error as e:
+            self._count('errors')
             print(f"Query error: {e}")
             return None
-    
+
     def execute_insert(self, query, params=None):
-        if not self.cursor:
-            return None
         try:
-            self.cursor.execute(query, params or ())
-            self.connection.commit()
-            return self.cursor.lastrowid
+            with self.connection() as connection:
+                cursor = connection.cursor(dictionary=True)
+                try:
+                    cursor.execute(query, params or ())
+                    connection.commit()
+                    return cursor.lastrowid
+                except Error:
+                    connection.rollback()
+                    raise
+                finally:
+                    cursor.close()
         except Error as e:
+            self._count('errors')
             print(f"Insert error: {e}")
             if e.errno == 1062:  # Duplicate entry error
                 print(f"Duplicate entry error: {e}")
-            self.connection.rollback()
             return None
 
-database = Database()
\ No newline at end of file
+    def pool_stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['wait_ms'] = round(stats['wait_ms'], 1)
+        stats['pool_size'] = self.pool_size
+        stats['utilization'] = round(stats['in_use'] / self.pool_size, 3)
+        return stats
+
+    def create_tables(self):
+        # One-off schema setup, run by `python -m config.database` rather than on import
+        connection = mysql.connector.connect(**self._settings(with_database=False))
+        try:
+            cursor = connection.cursor()
+            cursor.execute(f"CREATE DATABASE IF NOT EXISTS `{os.getenv('DB_NAME', 'timetable')}`")
+            cursor.execute(f"USE `{os.getenv('DB_NAME', 'timetable')}`")
+            for table_name, query in TABLES.items():
+                cursor.execute(query)
+            connection.commit()
+            cursor.close()
+        finally:
+            connection.close()
+
+database = Database()
+
+if __name__ == "__main__":
+    try:
+        database.create_tables()
+        print(f"Created {len(TABLES)} tables")
+    except Error as e:
+        print(f"Error creating tables: {e}")
+        sys.exit(1)
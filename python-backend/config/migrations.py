@@ -0,0 +1,223 @@
+"""Versioned schema migrations for the SQLite database.
+
+Apply pending migrations and check that the hot queries use an index:
+
+    python -m config.migrations --db timetable.db
+    python -m config.migrations --db timetable.db --check
+
+Applied versions are recorded in ``schema_version``; each migration runs
+once, in its own transaction. The same file can hold the tables of the
+raw-SQL routes (``courses.name``/``teacher``/``room``), those of the
+SQLAlchemy models (``courses.section_id``/``subject_id``/...) or both, so
+each migration names the tables it needs. One whose tables do not exist
+yet waits, unrecorded, and runs once they have been created; ``--check``
+reports it without failing, and likewise skips hot queries over tables
+the database does not have.
+"""
+import argparse
+import logging
+import os
+import sqlite3
+import sys
+from typing import Callable, Dict, List, Sequence, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def table_columns(connection: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in connection.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def create_index(connection: sqlite3.Connection, name: str, table: str, columns: Sequence[str]):
+    existing = table_columns(connection, table)
+    missing = [column for column in columns if column not in existing]
+    if missing:
+        raise sqlite3.OperationalError(f"Cannot index {table}: missing columns {', '.join(missing)}")
+    connection.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})")
+
+
+def add_timetable_slot_room(connection: sqlite3.Connection):
+    # Rooms are allocated per slot; tables created before that lack the column
+    if 'room_id' not in table_columns(connection, 'timetable_slots'):
+        connection.execute("ALTER TABLE timetable_slots ADD COLUMN room_id INTEGER REFERENCES rooms(id)")
+
+
+def index_migration(*indexes: Tuple[str, str, Tuple[str, ...]]) -> Callable[[sqlite3.Connection], None]:
+    def apply(connection: sqlite3.Connection):
+        for name, table, columns in indexes:
+            create_index(connection, name, table, columns)
+    return apply
+
+
+# (version, name, tables it needs, migration). Each index serves lookups in HOT_QUERIES.
+MIGRATIONS: List[Tuple[int, str, Tuple[str, ...], Callable[[sqlite3.Connection], None]]] = [
+    (1, 'timetable_slots_room_id', ('timetable_slots',), add_timetable_slot_room),
+    (2, 'tenant_lookup_indexes', ('branches', 'teachers', 'rooms', 'subjects', 'courses'), index_migration(
+        ('idx_branches_user_code', 'branches', ('user_id', 'code')),
+        ('idx_teachers_user', 'teachers', ('user_id',)),
+        ('idx_teachers_name', 'teachers', ('name',)),
+        ('idx_rooms_user', 'rooms', ('user_id',)),
+        ('idx_rooms_number', 'rooms', ('number',)),
+        ('idx_subjects_user', 'subjects', ('user_id',)),
+        ('idx_subjects_name', 'subjects', ('name',)),
+        ('idx_courses_section_user', 'courses', ('section_id', 'user_id')),
+        ('idx_courses_user', 'courses', ('user_id',))
+    )),
+    (3, 'section_indexes', ('sections',), index_migration(
+        ('idx_sections_user', 'sections', ('user_id',))
+    )),
+    (4, 'university_section_indexes', ('university_sections',), index_migration(
+        ('idx_university_sections_user', 'university_sections', ('user_id',))
+    )),
+    (5, 'timetable_indexes', ('timetables', 'timetable_slots'), index_migration(
+        ('idx_timetables_user_section', 'timetables', ('user_id', 'section_id')),
+        ('idx_timetable_slots_timetable_day', 'timetable_slots', ('timetable_id', 'day'))
+    ))
+]
+
+
+def recorded_versions(connection: sqlite3.Connection) -> Set[int]:
+    # Read-only: a database never migrated has no schema_version table yet
+    if not table_columns(connection, 'schema_version'):
+        return set()
+    return {row[0] for row in connection.execute("SELECT version FROM schema_version").fetchall()}
+
+
+def applied_versions(connection: sqlite3.Connection) -> Set[int]:
+    connection.execute(
+        "CREATE TABLE IF NOT EXISTS schema_version ("
+        "version INTEGER PRIMARY KEY, name TEXT NOT NULL, applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
+    )
+    connection.commit()
+    return {row[0] for row in connection.execute("SELECT version FROM schema_version").fetchall()}
+
+
+def missing_tables(connection: sqlite3.Connection, tables: Sequence[str]) -> List[str]:
+    return [table for table in tables if not table_columns(connection, table)]
+
+
+def pending_migrations(connection: sqlite3.Connection) -> Tuple[List[str], List[str]]:
+    # (pending, waiting): unapplied migrations whose tables exist, and those
+    # whose tables this database has not created yet
+    applied = recorded_versions(connection)
+    pending, waiting = [], []
+    for number, name, tables, _ in MIGRATIONS:
+        if number not in applied:
+            (waiting if missing_tables(connection, tables) else pending).append(name)
+    return pending, waiting
+
+
+def migrate(connection: sqlite3.Connection) -> List[str]:
+    applied = []
+    done = applied_versions(connection)
+    for number, name, tables, apply in MIGRATIONS:
+        if number in done:
+            continue
+        missing = missing_tables(connection, tables)
+        if missing:
+            logger.info(f"Migration {number} ({name}) pending until {', '.join(missing)} exists")
+            continue
+        try:
+            connection.execute("BEGIN")
+            apply(connection)
+            connection.execute("INSERT INTO schema_version (version, name) VALUES (?, ?)", (number, name))
+            connection.commit()
+        except Exception:
+            connection.rollback()
+            logger.error(f"Migration {number} ({name}) failed")
+            raise
+        logger.info(f"Applied migration {number} ({name})")
+        applied.append(name)
+    return applied
+
+
+# Queries over columns only the raw-SQL routes create; on a database from
+# the ORM models their tables exist with other columns
+LEGACY_QUERIES = {'university_sections_by_user', 'public_generate'}
+
+# The lookups behind the list, generate and timetable endpoints
+HOT_QUERIES: Dict[str, str] = {
+    'branches_by_user': "SELECT * FROM branches WHERE user_id = ?",
+    'branch_by_code': "SELECT * FROM branches WHERE user_id = ? AND code = ?",
+    'sections_by_user': "SELECT * FROM sections WHERE user_id = ?",
+    'university_sections_by_user': "SELECT * FROM university_sections WHERE user_id = ?",
+    'teachers_by_user': "SELECT * FROM teachers WHERE user_id = ?",
+    'rooms_by_user': "SELECT * FROM rooms WHERE user_id = ?",
+    'subjects_by_user': "SELECT * FROM subjects WHERE user_id = ?",
+    'courses_by_user': "SELECT * FROM courses WHERE user_id = ?",
+    'courses_by_section': "SELECT * FROM courses WHERE section_id = ? AND user_id = ?",
+    'public_generate': (
+        "SELECT c.*, s.name as subject_name, s.code as subject_code, t.name as teacher_name, "
+        "r.number as room_number, r.building FROM courses c LEFT JOIN subjects s ON c.name = s.name "
+        "LEFT JOIN teachers t ON c.teacher = t.name LEFT JOIN rooms r ON c.room = r.number WHERE c.section_id = ?"
+    ),
+    'timetable_by_section': "SELECT * FROM timetables WHERE section_id = ? AND user_id = ?",
+    'timetable_slots': "SELECT * FROM timetable_slots WHERE timetable_id = ? ORDER BY day",
+    'timetable_slots_by_day': "SELECT * FROM timetable_slots WHERE timetable_id = ? AND day = ?"
+}
+
+
+def schema_copy(connection: sqlite3.Connection) -> sqlite3.Connection:
+    # Tables and indexes without rows or ANALYZE statistics: on a small
+    # database the planner rightly prefers a scan, which says nothing about
+    # whether the index would be used once the tables grow
+    copy = sqlite3.connect(':memory:')
+    for (statement,) in connection.execute(
+        "SELECT sql FROM sqlite_master WHERE type IN ('table', 'index') AND sql IS NOT NULL "
+        "AND name NOT LIKE 'sqlite_%' ORDER BY type = 'index'"
+    ).fetchall():
+        copy.execute(statement)
+    return copy
+
+
+def check_query_plans(connection: sqlite3.Connection) -> Dict[str, Dict]:
+    # A query passes when no step of its plan is a full table scan. One over
+    # a table this database has not created is skipped, as is one over
+    # columns only the legacy routes use; any other error fails.
+    results = {}
+    copy = schema_copy(connection)
+    for name, query in HOT_QUERIES.items():
+        try:
+            plan = [row[3] for row in copy.execute(
+                f"EXPLAIN QUERY PLAN {query}", (None,) * query.count('?')
+            ).fetchall()]
+        except sqlite3.OperationalError as e:
+            skipped = name in LEGACY_QUERIES or str(e).startswith('no such table')
+            results[name] = {'status': 'skipped' if skipped else 'missing', 'reason': str(e)}
+            continue
+        scans = [step for step in plan if step.startswith('SCAN') and 'CONSTANT ROW' not in step]
+        results[name] = {'status': 'fail' if scans else 'ok', 'plan': plan}
+    copy.close()
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Apply SQLite schema migrations")
+    parser.add_argument('--db', default=os.getenv('DB_PATH', 'timetable.db'))
+    parser.add_argument('--check', action='store_true', help="only report hot-query plans, fail on full scans")
+    args = parser.parse_args(argv)
+
+    connection = sqlite3.connect(args.db)
+    try:
+        if not args.check:
+            applied = migrate(connection)
+            print(f"Applied: {', '.join(applied)}" if applied else "Schema is up to date")
+
+        failures = 0
+        for name, result in check_query_plans(connection).items():
+            detail = result.get('reason') or '; '.join(result['plan'])
+            print(f"[{result['status'].upper():>7}] {name}: {detail}")
+            failures += result['status'] in ('fail', 'missing')
+        pending, waiting = pending_migrations(connection)
+        if waiting:
+            print(f"Waiting for their tables: {', '.join(waiting)}")
+        if pending:
+            print(f"Pending migrations: {', '.join(pending)}")
+        return 1 if failures or pending else 0
+    finally:
+        connection.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    sys.exit(main())
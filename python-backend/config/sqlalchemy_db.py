@@ -1,8 +1,11 @@
-from sqlalchemy import create_engine
+from contextlib import contextmanager
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
 import os
 from dotenv import load_dotenv
+from config.migrations import migrate
+from config.sqlite_tuning import SQLiteTuning
 
 load_dotenv()
 
@@ -15,6 +18,26 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
 )
 
+# Same PRAGMA profile as config.sqlite_database; in-memory databases keep the defaults
+if engine.dialect.name == "sqlite" and engine.url.database not in (None, "", ":memory:"):
+    sqlite_tuning = SQLiteTuning.from_env()
+
+    @event.listens_for(engine, "first_connect")
+    def apply_migrations(dbapi_connection, connection_record):
+        # The models map columns later versions added (timetable_slots.room_id),
+        # so every process using the ORM brings the schema up to date first
+        migrate(dbapi_connection)
+
+    @event.listens_for(engine, "connect")
+    def apply_sqlite_tuning(dbapi_connection, connection_record):
+        sqlite_tuning.apply(dbapi_connection)
+
+    @event.listens_for(engine, "checkin")
+    def optimize_sqlite(dbapi_connection, connection_record):
+        # dbapi_connection is None when the connection was invalidated
+        if dbapi_connection is not None:
+            sqlite_tuning.maybe_optimize(dbapi_connection)
+
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -27,4 +50,38 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+class QueryCounter:
+    """Statements sent to the database while a ``count_queries`` block is open."""
+
+    def __init__(self):
+        self.statements = []
+
+    @property
+    def count(self) -> int:
+        return len(self.statements)
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+@contextmanager
+def count_queries(db: Session):
+    counter = QueryCounter()
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", counter)
+
+@contextmanager
+def assert_max_queries(db: Session, limit: int):
+    # Fails when the block needs more round trips than budgeted, e.g. after a
+    # relationship starts lazy-loading per row again
+    with count_queries(db) as counter:
+        yield counter
+    if counter.count > limit:
+        raise AssertionError(
+            f"Expected at most {limit} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+        )
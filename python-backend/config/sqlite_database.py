@@ -1,50 +1,279 @@
+import asyncio
 import sqlite3
 import os
 import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional
 from dotenv import load_dotenv
+from config.sqlite_tuning import SQLiteTuning
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-class SQLiteDatabase:
+class _Waiter:
+    __slots__ = ('event', 'item')
+
     def __init__(self):
-        self.db_path = os.getenv('DB_PATH', 'timetable.db')
-        self.connection = None
+        self.event = threading.Event()
+        self.item = None
+
+# Handed to a waiter instead of a connection when a discarded one frees its slot
+_OPEN_SLOT = object()
+
+class SQLiteConnectionPool:
+    """Bounded pool of sqlite3 connections, checked out for one operation at a time.
+
+    Connections are opened lazily up to ``size``; a caller that finds all of
+    them busy waits, first come first served, up to ``timeout`` seconds for
+    one to be returned. A connection idle for longer than
+    ``health_check_interval`` seconds is pinged before reuse, and one that
+    fails the ping, or breaks while in use, is closed and replaced by a
+    fresh connection on the next checkout. New connections get the
+    ``tuning`` PRAGMAs before first use.
+    """
+
+    def __init__(self, db_path: str, size: int = 8, timeout: float = 10.0, health_check_interval: float = 30.0,
+                 tuning: Optional[SQLiteTuning] = None):
+        self.db_path = db_path
+        self.tuning = tuning
+        self.size = max(size, 1)
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._idle = []
+        self._waiters = deque()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        try:
+            connection = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        except Exception:
+            self._free_slot()
+            raise
+        connection.row_factory = sqlite3.Row
+        if self.tuning:
+            try:
+                self.tuning.apply(connection)
+            except Exception:
+                self._discard(connection)
+                raise
+        return connection
+
+    def _healthy(self, connection: sqlite3.Connection) -> bool:
+        try:
+            connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _free_slot(self):
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.item = _OPEN_SLOT
+                waiter.event.set()
+            else:
+                self._created -= 1
+
+    def _discard(self, connection: sqlite3.Connection):
+        try:
+            connection.close()
+        except sqlite3.Error:
+            pass
+        self._free_slot()
+
+    def acquire(self) -> sqlite3.Connection:
+        deadline = time.monotonic() + self.timeout
+        while True:
+            waiter = None
+            with self._lock:
+                if self._idle:
+                    item = self._idle.pop()
+                elif self._created < self.size:
+                    self._created += 1
+                    item = _OPEN_SLOT
+                else:
+                    waiter = _Waiter()
+                    self._waiters.append(waiter)
+
+            if waiter:
+                # Released connections go straight to the longest waiter, so
+                # a busy thread cannot take its own connection straight back
+                waiter.event.wait(max(deadline - time.monotonic(), 0))
+                with self._lock:
+                    if waiter.item is None:
+                        self._waiters.remove(waiter)
+                        raise TimeoutError(f"No SQLite connection available within {self.timeout}s")
+                item = waiter.item
+
+            if item is _OPEN_SLOT:
+                return self._open()
+            connection, returned_at = item
+            if time.monotonic() - returned_at > self.health_check_interval and not self._healthy(connection):
+                logger.warning("Discarding unhealthy SQLite connection")
+                self._discard(connection)
+                continue
+            return connection
+
+    def release(self, connection: sqlite3.Connection, broken: bool = False):
+        if broken or not self._healthy_after_use(connection):
+            self._discard(connection)
+            return
+        if self.tuning:
+            self.tuning.maybe_optimize(connection)
+        item = (connection, time.monotonic())
+        with self._lock:
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.item = item
+                waiter.event.set()
+            else:
+                self._idle.append(item)
+
+    def _healthy_after_use(self, connection: sqlite3.Connection) -> bool:
+        # Never hand out a connection with an open transaction
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+            return True
+        except sqlite3.Error:
+            return False
+
+    @contextmanager
+    def connection(self):
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except sqlite3.Error:
+            broken = not self._healthy(connection)
+            raise
+        finally:
+            self.release(connection, broken)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._discard(connection)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'size': self.size, 'open': self._created, 'idle': len(self._idle), 'waiting': len(self._waiters)}
+
+class SQLiteDatabase:
+    def __init__(self, db_path: Optional[str] = None, tuning: Optional[SQLiteTuning] = None):
+        self.db_path = db_path or os.getenv('DB_PATH', 'timetable.db')
+        self.pool = SQLiteConnectionPool(
+            self.db_path,
+            size=int(os.getenv('SQLITE_POOL_SIZE', '8')),
+            timeout=float(os.getenv('SQLITE_POOL_TIMEOUT', '10')),
+            health_check_interval=float(os.getenv('SQLITE_HEALTH_CHECK_INTERVAL', '30')),
+            tuning=tuning or SQLiteTuning.from_env()
+        )
         self.connect()
-    
+
     def connect(self):
-        try:
-            self.connection = sqlite3.connect(self.db_path, check_same_thread=False)
-            self.connection.row_factory = sqlite3.Row
+        # Connections are opened on demand; this only verifies the database is reachable
+        if self.ping():
             logger.info("SQLite Connected Successfully")
+        else:
+            logger.error("SQLite connection failed; will retry on the next query")
+
+    def ping(self) -> bool:
+        try:
+            with self.pool.connection() as connection:
+                connection.execute("SELECT 1").fetchone()
+            return True
         except Exception as e:
             logger.error(f"SQLite connection failed: {e}")
-            self.connection = None
-    
+            return False
+
     def execute_query(self, query, params=None):
-        if not self.connection:
-            return None
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            result = cursor.fetchall()
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute(query, params or ())
+                result = cursor.fetchall()
+                if connection.in_transaction:
+                    connection.commit()
             # Convert Row objects to dictionaries
             return [dict(row) for row in result] if result else []
         except Exception as e:
             logger.error(f"Query error: {e}")
             return None
-    
+
     def execute_insert(self, query, params=None):
-        if not self.connection:
-            return None
         try:
-            cursor = self.connection.cursor()
-            cursor.execute(query, params or ())
-            self.connection.commit()
-            return cursor.lastrowid
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.execute(query, params or ())
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+                return cursor.lastrowid
         except Exception as e:
             logger.error(f"Insert error: {e}")
-            self.connection.rollback()
             return None
 
-database = SQLiteDatabase()
\ No newline at end of file
+    def execute_many(self, query, params_seq):
+        try:
+            with self.pool.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    cursor.executemany(query, params_seq)
+                    connection.commit()
+                except Exception:
+                    connection.rollback()
+                    raise
+                return cursor.rowcount
+        except Exception as e:
+            logger.error(f"Batch error: {e}")
+            return None
+
+class AsyncSQLiteDatabase:
+    """Awaitable access to a SQLiteDatabase for ``async def`` routes.
+
+    Statements run on a dedicated executor with one thread per pooled
+    connection, so the event loop keeps serving other requests while SQLite
+    works and executor threads never queue for a connection. Results and
+    failures match the synchronous methods: errors are logged and come
+    back as None.
+    """
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+        self._executor = ThreadPoolExecutor(max_workers=database.pool.size, thread_name_prefix='sqlite')
+
+    async def _run(self, method, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    async def ping(self) -> bool:
+        return await self._run(self.database.ping)
+
+    async def fetch_all(self, query, params=None) -> Optional[List[Dict]]:
+        return await self._run(self.database.execute_query, query, params)
+
+    async def fetch_one(self, query, params=None) -> Optional[Dict]:
+        rows = await self.fetch_all(query, params)
+        return rows[0] if rows else None
+
+    async def execute(self, query, params=None) -> Optional[int]:
+        # Commits and returns the new row id, like execute_insert
+        return await self._run(self.database.execute_insert, query, params)
+
+    async def execute_many(self, query, params_seq: Iterable) -> Optional[int]:
+        return await self._run(self.database.execute_many, query, list(params_seq))
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        self.database.pool.close()
+
+database = SQLiteDatabase()
+async_database = AsyncSQLiteDatabase(database)
@@ -0,0 +1,126 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_MODES = ('DELETE', 'TRUNCATE', 'PERSIST', 'MEMORY', 'WAL', 'OFF')
+SYNCHRONOUS_LEVELS = ('OFF', 'NORMAL', 'FULL', 'EXTRA')
+TEMP_STORES = ('DEFAULT', 'FILE', 'MEMORY')
+
+# 'default' leaves SQLite's own settings (rollback journal, synchronous=FULL);
+# 'production' lets readers run alongside a writer and drops the fsync per commit
+PROFILES: Dict[str, Dict] = {
+    'default': {},
+    'production': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': 256 * 1024 * 1024,
+        'cache_size': -64 * 1024,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'optimize_interval': 3600
+    }
+}
+
+ENV_OVERRIDES = {
+    'journal_mode': ('SQLITE_JOURNAL_MODE', str),
+    'synchronous': ('SQLITE_SYNCHRONOUS', str),
+    'mmap_size': ('SQLITE_MMAP_SIZE', int),
+    'cache_size': ('SQLITE_CACHE_SIZE', int),
+    'temp_store': ('SQLITE_TEMP_STORE', str),
+    'busy_timeout': ('SQLITE_BUSY_TIMEOUT_MS', int),
+    'optimize_interval': ('SQLITE_OPTIMIZE_INTERVAL', int)
+}
+
+
+class SQLiteTuning:
+    """PRAGMA settings applied to every new SQLite connection.
+
+    Unset fields keep SQLite's defaults. ``cache_size`` follows the PRAGMA
+    convention (negative values are KiB), ``busy_timeout`` is milliseconds
+    and ``optimize_interval`` is the number of seconds between ``PRAGMA
+    optimize`` runs (0 disables them).
+    """
+
+    __slots__ = ('name', 'journal_mode', 'synchronous', 'mmap_size', 'cache_size', 'temp_store',
+                 'busy_timeout', 'optimize_interval', '_last_optimize', '_lock')
+
+    def __init__(self, name: str = 'custom', journal_mode: Optional[str] = None, synchronous: Optional[str] = None,
+                 mmap_size: Optional[int] = None, cache_size: Optional[int] = None,
+                 temp_store: Optional[str] = None, busy_timeout: Optional[int] = None, optimize_interval: int = 0):
+        self.name = name
+        self.journal_mode = self._choice('journal_mode', journal_mode, JOURNAL_MODES)
+        self.synchronous = self._choice('synchronous', synchronous, SYNCHRONOUS_LEVELS)
+        self.temp_store = self._choice('temp_store', temp_store, TEMP_STORES)
+        self.mmap_size = mmap_size
+        self.cache_size = cache_size
+        self.busy_timeout = busy_timeout
+        self.optimize_interval = optimize_interval
+        self._last_optimize = time.monotonic()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _choice(field: str, value: Optional[str], allowed) -> Optional[str]:
+        # PRAGMA values cannot be bound as parameters, so only known keywords get through
+        if value is None:
+            return None
+        value = value.upper()
+        if value not in allowed:
+            raise ValueError(f"Invalid {field} {value!r}, expected one of {', '.join(allowed)}")
+        return value
+
+    @classmethod
+    def from_env(cls, profile: Optional[str] = None) -> 'SQLiteTuning':
+        profile = profile or os.getenv('SQLITE_PROFILE', 'production')
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown SQLite profile {profile!r}, expected one of {', '.join(PROFILES)}")
+        settings = dict(PROFILES[profile])
+        for field, (variable, convert) in ENV_OVERRIDES.items():
+            if os.getenv(variable):
+                settings[field] = convert(os.getenv(variable))
+        return cls(profile, **settings)
+
+    def pragmas(self) -> List[str]:
+        statements = []
+        # busy_timeout first so the journal mode switch can wait for other writers
+        if self.busy_timeout is not None:
+            statements.append(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        if self.journal_mode is not None:
+            statements.append(f"PRAGMA journal_mode = {self.journal_mode}")
+        if self.synchronous is not None:
+            statements.append(f"PRAGMA synchronous = {self.synchronous}")
+        if self.mmap_size is not None:
+            statements.append(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+        if self.cache_size is not None:
+            statements.append(f"PRAGMA cache_size = {int(self.cache_size)}")
+        if self.temp_store is not None:
+            statements.append(f"PRAGMA temp_store = {self.temp_store}")
+        return statements
+
+    def apply(self, connection):
+        # Works on sqlite3 connections and on the DBAPI connection SQLAlchemy hands to its events
+        cursor = connection.cursor()
+        try:
+            for statement in self.pragmas():
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    def maybe_optimize(self, connection):
+        if not self.optimize_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_optimize < self.optimize_interval:
+                return
+            self._last_optimize = time.monotonic()
+        try:
+            connection.execute("PRAGMA optimize")
+        except sqlite3.Error as e:
+            logger.warning(f"PRAGMA optimize failed: {e}")
+
+    def as_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in self.__slots__ if not field.startswith('_')}
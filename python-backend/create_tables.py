@@ -1,5 +1,6 @@
 import sqlite3
 import os
+from config.migrations import migrate
 
 def create_all_tables():
     db_path = 'timetable.db'
@@ -78,9 +79,12 @@ def create_all_tables():
     ''')
     
     conn.commit()
+    applied = migrate(conn)
     conn.close()
     
     print("All tables created successfully!")
+    if applied:
+        print(f"Migrations applied: {', '.join(applied)}")
     print("Tables: users, sections, courses, branches, university_sections, teachers, rooms, subjects")
 
 if __name__ == "__main__":
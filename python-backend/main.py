@@ -2,8 +2,9 @@ from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.responses import FileResponse, JSONResponse
+from fastapi.concurrency import run_in_threadpool
 from routes.auth import router as auth_router
-from routes.university_timetable_fixed import router as university_router
+from routes.university_timetable import router as university_router
 try:
     from routes.timetable import router as timetable_router
 except ImportError:
@@ -70,13 +71,18 @@ async def read_root():
 
 @app.get("/api/health")
 async def health_check():
-    from config.sqlite_database import database
-    db_status = "connected" if database.connection else "disconnected"
+    from config.sqlite_database import async_database
+    from config.database import database as mysql_database
+    db_status = "connected" if await async_database.ping() else "disconnected"
     return JSONResponse(
         content={
             "status": "OK",
             "message": "AI Timetable Generator API is running",
             "database": db_status,
+            "pools": {
+                "sqlite": async_database.database.pool.stats(),
+                "mysql": mysql_database.pool_stats()
+            },
             "endpoints": [
                 "/api/login",
                 "/api/register", 
@@ -92,9 +98,24 @@ async def health_check():
 
 @app.on_event("startup")
 async def startup_event():
+    from config.sqlite_database import database
+    from config.migrations import migrate
+    # Only pending migrations run; an up-to-date schema costs one version lookup
+    with database.pool.connection() as connection:
+        applied = migrate(connection)
+    if applied:
+        logger.info(f"Applied schema migrations: {', '.join(applied)}")
+    # Pick up generation jobs queued, or left running by a stopped process
+    from services.job_queue import job_queue
+    await run_in_threadpool(job_queue.resume)
     logger.info("AI Timetable Generator API started successfully")
     logger.info("API Documentation available at: http://localhost:3000/docs")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    from config.sqlite_database import async_database
+    async_database.close()
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Time, Float
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Boolean, Time, Float, Table
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
 Base = declarative_base()
 
+# Users are created and read by the raw-SQL auth service; only their key is
+# declared, so the user_id foreign keys resolve when the ORM orders a flush
+users = Table("users", Base.metadata, Column("id", Integer, primary_key=True))
+
 class Branch(Base):
     __tablename__ = "branches"
     
@@ -115,6 +119,7 @@ class TimetableSlot(Base):
     id = Column(Integer, primary_key=True, index=True)
     timetable_id = Column(Integer, ForeignKey("timetables.id"), nullable=False)
     course_id = Column(Integer, ForeignKey("courses.id"))
+    room_id = Column(Integer, ForeignKey("rooms.id"))
     day = Column(String(10), nullable=False)
     start_time = Column(Time, nullable=False)
     end_time = Column(Time, nullable=False)
@@ -122,4 +127,5 @@ class TimetableSlot(Base):
     break_type = Column(String(20))
     
     timetable = relationship("Timetable", back_populates="slots")
-    course = relationship("Course", back_populates="timetable_slots")
\ No newline at end of file
+    course = relationship("Course", back_populates="timetable_slots")
+    room = relationship("Room")
\ No newline at end of file
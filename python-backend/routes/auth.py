@@ -96,10 +96,6 @@ async def register(user: UserRegister):
     except Exception as e:
         raise HTTPException(status_code=500, detail="Registration failed")
 
-@router.get("/health")
-async def health_check():
-    return {"status": "OK", "message": "API is running"}
-
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     email = verify_token(credentials.credentials)
     if not email:
@@ -3,7 +3,7 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List
 from services.auth_service import verify_token, get_user_profile
-from config.sqlite_database import database
+from config.sqlite_database import async_database
 import logging
 
 logger = logging.getLogger(__name__)
@@ -64,7 +64,7 @@ async def create_branch(
 ):
     try:
         query = "INSERT INTO branches (name, code, user_id) VALUES (%s, %s, %s)"
-        branch_id = database.execute_insert(query, (branch.name, branch.code, user_id))
+        branch_id = await async_database.execute(query, (branch.name, branch.code, user_id))
         
         if not branch_id:
             raise HTTPException(
@@ -88,7 +88,7 @@ async def create_branch(
 async def get_branches(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM branches WHERE user_id = %s"
-        branches = database.execute_query(query, (user_id,))
+        branches = await async_database.fetch_all(query, (user_id,))
         
         return {
             "success": True,
@@ -105,7 +105,7 @@ async def create_section(
 ):
     try:
         query = "INSERT INTO university_sections (name, year, semester, branch_id, strength, user_id) VALUES (%s, %s, %s, %s, %s, %s)"
-        section_id = database.execute_insert(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
+        section_id = await async_database.execute(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
         
         if not section_id:
             raise HTTPException(
@@ -134,7 +134,7 @@ async def create_teacher(
 ):
     try:
         query = "INSERT INTO teachers (name, employee_id, department, max_hours_per_day, user_id) VALUES (%s, %s, %s, %s, %s)"
-        teacher_id = database.execute_insert(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        teacher_id = await async_database.execute(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
         
         if not teacher_id:
             raise HTTPException(
@@ -163,7 +163,7 @@ async def create_room(
 ):
     try:
         query = "INSERT INTO rooms (number, building, capacity, room_type, user_id) VALUES (%s, %s, %s, %s, %s)"
-        room_id = database.execute_insert(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        room_id = await async_database.execute(query, (room.number, room.building, room.capacity, room.room_type, user_id))
         
         if not room_id:
             raise HTTPException(
@@ -192,7 +192,7 @@ async def create_subject(
 ):
     try:
         query = "INSERT INTO subjects (name, code, credits, subject_type, hours_per_week, user_id) VALUES (%s, %s, %s, %s, %s, %s)"
-        subject_id = database.execute_insert(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        subject_id = await async_database.execute(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
         
         if not subject_id:
             raise HTTPException(
@@ -219,7 +219,7 @@ async def create_subject(
 async def get_branches(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM branches WHERE user_id = %s"
-        branches = database.execute_query(query, (user_id,))
+        branches = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": branches or []}
     except Exception as e:
         logger.error(f"Error fetching branches: {e}")
@@ -229,7 +229,7 @@ async def get_branches(user_id: int = Depends(get_current_user_id)):
 async def get_university_sections(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM university_sections WHERE user_id = %s"
-        sections = database.execute_query(query, (user_id,))
+        sections = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": sections or []}
     except Exception as e:
         logger.error(f"Error fetching sections: {e}")
@@ -239,7 +239,7 @@ async def get_university_sections(user_id: int = Depends(get_current_user_id)):
 async def get_teachers(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM teachers WHERE user_id = %s"
-        teachers = database.execute_query(query, (user_id,))
+        teachers = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": teachers or []}
     except Exception as e:
         logger.error(f"Error fetching teachers: {e}")
@@ -249,7 +249,7 @@ async def get_teachers(user_id: int = Depends(get_current_user_id)):
 async def get_rooms(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM rooms WHERE user_id = %s"
-        rooms = database.execute_query(query, (user_id,))
+        rooms = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": rooms or []}
     except Exception as e:
         logger.error(f"Error fetching rooms: {e}")
@@ -259,7 +259,7 @@ async def get_rooms(user_id: int = Depends(get_current_user_id)):
 async def get_subjects(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM subjects WHERE user_id = %s"
-        subjects = database.execute_query(query, (user_id,))
+        subjects = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": subjects or []}
     except Exception as e:
         logger.error(f"Error fetching subjects: {e}")
@@ -1,9 +1,24 @@
 from fastapi import APIRouter, HTTPException, Depends, status
+from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel, validator
-from typing import List, Optional
+from typing import Dict, List, Optional
 from services.auth_service import verify_token, get_user_profile
-from config.sqlite_database import database
+from sqlalchemy.orm import Session
+from config.sqlite_database import async_database
+from config.sqlalchemy_db import SessionLocal, get_db
+from services.university_timetable_service import UniversityTimetableService
+from services.solution_cache import solution_cache
+from services.job_queue import JobError, job_queue
+from services.progress import ProgressReporter, progress_broker
+from services.metrics import PhaseTimer, metrics
+from services.solver_backends import get_solver, solver_names
+from services.conflict_analysis import grid_conflicts
+from services.slot_template import slot_template_from_config
+from services.smart_timetable import generate_smart_timetable
+import asyncio
+import json
 import logging
 
 logger = logging.getLogger(__name__)
@@ -56,6 +71,54 @@ class TimetableConfig(BaseModel):
     lunch_start: str = "12:30"
     lunch_duration: int = 45
     working_days: List[str] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    solver: str = "fast"
+    
+    @validator('solver')
+    def known_solver(cls, value):
+        if get_solver(value) is None:
+            raise ValueError(f"solver must be one of: {', '.join(solver_names())}")
+        return value
+
+class TenantTimetableConfig(BaseModel):
+    start_time: str = "09:00"
+    end_time: str = "16:00"
+    period_duration: int = 50
+    break_duration: int = 10
+    lunch_start: str = "12:30"
+    lunch_duration: int = 45
+    working_days: List[str] = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
+    solver: str = "greedy"
+    max_backtracks: int = 20000
+    attempts: int = 16
+    workers: Optional[int] = None
+    seed: Optional[int] = None
+    anneal_ms: int = 0
+    time_limit_ms: Optional[int] = None
+    quality_target: Optional[int] = None
+    
+    @validator('solver')
+    def known_solver(cls, value):
+        if get_solver(value) is None:
+            raise ValueError(f"solver must be one of: {', '.join(solver_names())}")
+        return value
+
+class SectionTimetableConfig(TenantTimetableConfig):
+    section_id: int
+
+class GenerationJobConfig(TenantTimetableConfig):
+    section_id: Optional[int] = None
+
+class RoomUnavailability(BaseModel):
+    room_id: int
+    day: Optional[str] = None
+    start_time: Optional[str] = None
+
+class TimetableRepair(BaseModel):
+    added_courses: List[int] = []
+    removed_courses: List[int] = []
+    teacher_changes: Dict[int, int] = {}
+    unavailable_rooms: List[RoomUnavailability] = []
+    max_backtracks: int = 20000
 
 def get_current_user_id(credentials: HTTPAuthorizationCredentials = Depends(security)):
     email = verify_token(credentials.credentials)
@@ -82,7 +145,7 @@ async def create_branch(
 ):
     try:
         query = "INSERT INTO branches (name, code, user_id) VALUES (?, ?, ?)"
-        branch_id = database.execute_insert(query, (branch.name, branch.code, user_id))
+        branch_id = await async_database.execute(query, (branch.name, branch.code, user_id))
         
         if not branch_id:
             raise HTTPException(
@@ -110,7 +173,7 @@ async def create_section(
 ):
     try:
         query = "INSERT INTO university_sections (name, year, semester, branch_id, strength, user_id) VALUES (?, ?, ?, ?, ?, ?)"
-        section_id = database.execute_insert(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
+        section_id = await async_database.execute(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
         
         if not section_id:
             raise HTTPException(
@@ -140,7 +203,8 @@ async def create_teacher(
 ):
     try:
         query = "INSERT INTO teachers (name, employee_id, department, max_hours_per_day, user_id) VALUES (?, ?, ?, ?, ?)"
-        teacher_id = database.execute_insert(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        teacher_id = await async_database.execute(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        solution_cache.invalidate("teachers")
         
         if not teacher_id:
             raise HTTPException(
@@ -168,7 +232,7 @@ async def create_branch_public(branch: BranchCreate):
     try:
         user_id = 1
         query = "INSERT INTO branches (name, code, user_id) VALUES (?, ?, ?)"
-        branch_id = database.execute_insert(query, (branch.name, branch.code, user_id))
+        branch_id = await async_database.execute(query, (branch.name, branch.code, user_id))
         return {"success": True, "data": {"id": branch_id, "name": branch.name, "code": branch.code}}
     except Exception as e:
         logger.error(f"Error creating branch: {e}")
@@ -179,7 +243,7 @@ async def create_section_public(section: SectionCreate):
     try:
         user_id = 1
         query = "INSERT INTO university_sections (name, year, semester, branch_id, strength, user_id) VALUES (?, ?, ?, ?, ?, ?)"
-        section_id = database.execute_insert(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
+        section_id = await async_database.execute(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
         return {"success": True, "data": {"id": section_id, "name": section.name, "year": section.year, "semester": section.semester, "strength": section.strength}}
     except Exception as e:
         logger.error(f"Error creating section: {e}")
@@ -190,7 +254,8 @@ async def create_teacher_public(teacher: TeacherCreate):
     try:
         user_id = 1
         query = "INSERT INTO teachers (name, employee_id, department, max_hours_per_day, user_id) VALUES (?, ?, ?, ?, ?)"
-        teacher_id = database.execute_insert(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        teacher_id = await async_database.execute(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        solution_cache.invalidate("teachers")
         return {"success": True, "data": {"id": teacher_id, "name": teacher.name, "employee_id": teacher.employee_id, "department": teacher.department, "max_hours_per_day": teacher.max_hours_per_day}}
     except Exception as e:
         logger.error(f"Error creating teacher: {e}")
@@ -201,7 +266,8 @@ async def create_room_public(room: RoomCreate):
     try:
         user_id = 1
         query = "INSERT INTO rooms (number, building, capacity, room_type, user_id) VALUES (?, ?, ?, ?, ?)"
-        room_id = database.execute_insert(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        room_id = await async_database.execute(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        solution_cache.invalidate("rooms")
         return {"success": True, "data": {"id": room_id, "number": room.number, "building": room.building, "capacity": room.capacity, "room_type": room.room_type}}
     except Exception as e:
         logger.error(f"Error creating room: {e}")
@@ -212,7 +278,8 @@ async def create_subject_public(subject: SubjectCreate):
     try:
         user_id = 1
         query = "INSERT INTO subjects (name, code, credits, subject_type, hours_per_week, user_id) VALUES (?, ?, ?, ?, ?, ?)"
-        subject_id = database.execute_insert(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        subject_id = await async_database.execute(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        solution_cache.invalidate("subjects")
         return {"success": True, "data": {"id": subject_id, "name": subject.name, "code": subject.code, "credits": subject.credits, "subject_type": subject.subject_type, "hours_per_week": subject.hours_per_week}}
     except Exception as e:
         logger.error(f"Error creating subject: {e}")
@@ -223,7 +290,8 @@ async def create_course_public(course: CourseCreate):
     try:
         user_id = 1
         query = "INSERT INTO courses (name, teacher, room, section_id, user_id) SELECT s.name, t.name, r.number, ?, ? FROM subjects s, teachers t, rooms r WHERE s.id = ? AND t.id = ? AND r.id = ?"
-        course_id = database.execute_insert(query, (course.section_id, user_id, course.subject_id, course.teacher_id, course.room_id or 1))
+        course_id = await async_database.execute(query, (course.section_id, user_id, course.subject_id, course.teacher_id, course.room_id or 1))
+        solution_cache.invalidate(f"section:{course.section_id}")
         return {"success": True, "data": {"id": course_id, "section_id": course.section_id, "subject_id": course.subject_id, "teacher_id": course.teacher_id, "room_id": course.room_id}}
     except Exception as e:
         logger.error(f"Error creating course: {e}")
@@ -234,7 +302,7 @@ async def create_course_public(course: CourseCreate):
 async def get_branches_public():
     try:
         query = "SELECT * FROM branches ORDER BY name"
-        branches = database.execute_query(query)
+        branches = await async_database.fetch_all(query)
         return {"success": True, "data": branches or []}
     except Exception as e:
         logger.error(f"Error fetching branches: {e}")
@@ -244,7 +312,7 @@ async def get_branches_public():
 async def get_sections_public():
     try:
         query = "SELECT * FROM university_sections ORDER BY year, semester, name"
-        sections = database.execute_query(query)
+        sections = await async_database.fetch_all(query)
         return {"success": True, "data": sections or []}
     except Exception as e:
         logger.error(f"Error fetching sections: {e}")
@@ -254,7 +322,7 @@ async def get_sections_public():
 async def get_teachers_public():
     try:
         query = "SELECT * FROM teachers ORDER BY name"
-        teachers = database.execute_query(query)
+        teachers = await async_database.fetch_all(query)
         return {"success": True, "data": teachers or []}
     except Exception as e:
         logger.error(f"Error fetching teachers: {e}")
@@ -264,7 +332,7 @@ async def get_teachers_public():
 async def get_rooms_public():
     try:
         query = "SELECT * FROM rooms ORDER BY building, number"
-        rooms = database.execute_query(query)
+        rooms = await async_database.fetch_all(query)
         return {"success": True, "data": rooms or []}
     except Exception as e:
         logger.error(f"Error fetching rooms: {e}")
@@ -274,7 +342,7 @@ async def get_rooms_public():
 async def get_subjects_public():
     try:
         query = "SELECT * FROM subjects ORDER BY name"
-        subjects = database.execute_query(query)
+        subjects = await async_database.fetch_all(query)
         return {"success": True, "data": subjects or []}
     except Exception as e:
         logger.error(f"Error fetching subjects: {e}")
@@ -284,7 +352,7 @@ async def get_subjects_public():
 async def get_courses_public():
     try:
         query = "SELECT * FROM courses ORDER BY section_id"
-        courses = database.execute_query(query)
+        courses = await async_database.fetch_all(query)
         return {"success": True, "data": courses or []}
     except Exception as e:
         logger.error(f"Error fetching courses: {e}")
@@ -294,7 +362,7 @@ async def get_courses_public():
 async def get_section_courses_public(section_id: int):
     try:
         query = "SELECT * FROM courses WHERE section_id = ?"
-        courses = database.execute_query(query, (section_id,))
+        courses = await async_database.fetch_all(query, (section_id,))
         return {"success": True, "data": courses or []}
     except Exception as e:
         logger.error(f"Error fetching section courses: {e}")
@@ -308,7 +376,8 @@ async def create_room(
 ):
     try:
         query = "INSERT INTO rooms (number, building, capacity, room_type, user_id) VALUES (?, ?, ?, ?, ?)"
-        room_id = database.execute_insert(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        room_id = await async_database.execute(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        solution_cache.invalidate("rooms")
         
         if not room_id:
             raise HTTPException(
@@ -338,7 +407,8 @@ async def create_subject(
 ):
     try:
         query = "INSERT INTO subjects (name, code, credits, subject_type, hours_per_week, user_id) VALUES (?, ?, ?, ?, ?, ?)"
-        subject_id = database.execute_insert(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        subject_id = await async_database.execute(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        solution_cache.invalidate("subjects")
         
         if not subject_id:
             raise HTTPException(
@@ -370,7 +440,8 @@ async def create_course(
     try:
         # Create a simple course mapping - using existing courses table structure
         query = "INSERT INTO courses (name, teacher, room, section_id, user_id) SELECT s.name, t.name, r.number, ?, ? FROM subjects s, teachers t, rooms r WHERE s.id = ? AND t.id = ? AND r.id = ?"
-        course_id = database.execute_insert(query, (course.section_id, user_id, course.subject_id, course.teacher_id, course.room_id or 1))
+        course_id = await async_database.execute(query, (course.section_id, user_id, course.subject_id, course.teacher_id, course.room_id or 1))
+        solution_cache.invalidate(f"section:{course.section_id}")
         
         if not course_id:
             raise HTTPException(
@@ -393,11 +464,26 @@ async def create_course(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create course")
 
 @router.post("/timetables/generate/public")
-async def generate_university_timetable_public(config: TimetableConfig):
+async def generate_university_timetable_public(config: TimetableConfig, debug: Optional[str] = None):
+    timings = PhaseTimer()
     try:
+        # Repeated requests resolve straight to the cached solution
+        with timings.phase('cache'):
+            request_key = solution_cache.fingerprint('generate/public', config.dict())
+            data = solution_cache.get_alias(request_key)
+        if data is not None:
+            timings.count('cache_hits')
+            return with_timings({"success": True, "data": data}, timings, debug)
+        
+        # Versions read before the inputs, so a write while solving makes this result stale
+        with timings.phase('cache'):
+            tags = (f"section:{config.section_id}", "subjects", "teachers", "rooms")
+            versions = solution_cache.versions(tags)
+        
         # Get courses for section
-        query = "SELECT c.*, s.name as subject_name, s.code as subject_code, t.name as teacher_name, r.number as room_number, r.building FROM courses c LEFT JOIN subjects s ON c.name = s.name LEFT JOIN teachers t ON c.teacher = t.name LEFT JOIN rooms r ON c.room = r.number WHERE c.section_id = ?"
-        courses = database.execute_query(query, (config.section_id,))
+        with timings.phase('load'):
+            query = "SELECT c.*, s.name as subject_name, s.code as subject_code, t.name as teacher_name, r.number as room_number, r.building FROM courses c LEFT JOIN subjects s ON c.name = s.name LEFT JOIN teachers t ON c.teacher = t.name LEFT JOIN rooms r ON c.room = r.number WHERE c.section_id = ?"
+            courses = await async_database.fetch_all(query, (config.section_id,))
         
         if not courses:
             raise HTTPException(
@@ -405,172 +491,292 @@ async def generate_university_timetable_public(config: TimetableConfig):
                 detail="No courses found for this section"
             )
         
-        # Generate time slots
-        time_slots = generate_time_slots(config.start_time, config.end_time, config.period_duration, config.lunch_start, config.lunch_duration)
+        # Same configuration and inputs always produce the same timetable
+        with timings.phase('cache'):
+            fingerprint = solution_cache.fingerprint(config.dict(), courses)
+            data = solution_cache.get(fingerprint)
         
-        # Generate timetable with proper logic
-        timetable = generate_smart_timetable(courses, time_slots, config.working_days)
+        solver_stats = None
+        if data is None:
+            # Compile the period grid (memoized per configuration)
+            with timings.phase('slots'):
+                template = slot_template_from_config(config.dict())
+            
+            # Generate timetable with proper logic
+            # The solver is CPU-bound; keep it off the event loop
+            with timings.phase('search'):
+                solver_stats = {}
+                timetable = await run_in_threadpool(
+                    generate_smart_timetable, courses, template, config.solver, config.dict(), solver_stats
+                )
+            for name in ('candidates_tried', 'failed_checks', 'backtracks', 'attempts'):
+                if name in solver_stats:
+                    timings.count(name, solver_stats[name])
+            
+            # Same contract as section generation, listed per solver under /timetables/solvers
+            if timetable is None:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="No conflict-free timetable exists" if solver_stats.get('exhausted')
+                    else "No conflict-free timetable found within the search budget"
+                )
+            
+            with timings.phase('conflicts'):
+                conflicts = detect_conflicts(timetable)
+            
+            with timings.phase('serialize'):
+                data = {
+                    "section_id": config.section_id,
+                    "timetable": timetable,
+                    "time_slots": template.as_slot_dicts(),
+                    "working_days": config.working_days,
+                    "total_courses": len(courses),
+                    "solver": config.solver,
+                    "complete": solver_stats['placed'] == solver_stats['total'],
+                    "conflicts": conflicts
+                }
+                solution_cache.put(fingerprint, data, tags, versions)
+        else:
+            timings.count('cache_hits')
+        
+        solution_cache.set_alias(request_key, fingerprint, tags, versions)
+        return with_timings({"success": True, "data": data}, timings, debug, solver_stats)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating timetable: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to generate timetable")
+    finally:
+        metrics.record('generate_public', timings)
+
+# Generation, repair and audit run the synchronous session and solver, so
+# these handlers are plain functions that FastAPI runs in its threadpool
+@router.post("/timetables/generate")
+def generate_section_timetable(
+    config: SectionTimetableConfig,
+    debug: Optional[str] = None,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = UniversityTimetableService(db)
+        timetable = service.generate_university_timetable(user_id, config.section_id, config.dict())
+        
+        if timetable is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="; ".join(service.conflicts) or "No courses found for this section"
+            )
+        
+        with service.timings.phase('serialize'):
+            data = {
+                "id": timetable.id,
+                "section_id": timetable.section_id,
+                "name": timetable.name,
+                "complete": service.solver_stats.get('complete', True),
+                "conflicts": service.conflicts,
+                "solver": service.solver_stats
+            }
+        return with_timings({"success": True, "data": data}, service.timings, debug)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error generating timetable: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to generate timetable")
+
+@router.post("/timetables/generate/all")
+def generate_tenant_timetables(
+    config: TenantTimetableConfig,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = UniversityTimetableService(db)
+        timetables = service.generate_tenant_timetables(user_id, config.dict())
+        
+        if timetables is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="; ".join(service.conflicts) or "No courses found for this user"
+            )
         
         return {
             "success": True,
             "data": {
-                "section_id": config.section_id,
-                "timetable": timetable,
-                "time_slots": time_slots,
-                "working_days": config.working_days,
-                "total_courses": len(courses),
-                "conflicts": detect_conflicts(timetable)
+                "timetables": [
+                    {"id": timetable.id, "section_id": timetable.section_id, "name": timetable.name}
+                    for timetable in timetables
+                ],
+                "total_sections": len(timetables)
             }
         }
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"Error generating timetable: {e}")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to generate timetable")
+        logger.error(f"Error generating tenant timetables: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to generate timetables")
 
-def generate_time_slots(start_time: str, end_time: str, period_duration: int, lunch_start: str, lunch_duration: int):
-    slots = []
-    start_minutes = time_to_minutes(start_time)
-    end_minutes = time_to_minutes(end_time)
-    lunch_start_minutes = time_to_minutes(lunch_start)
-    lunch_end_minutes = lunch_start_minutes + lunch_duration
-    
-    current = start_minutes
-    slot_num = 1
-    
-    while current + period_duration <= end_minutes:
-        slot_end = current + period_duration
-        
-        # Skip lunch time
-        if not (current >= lunch_start_minutes and current < lunch_end_minutes):
-            slots.append({
-                "slot_number": slot_num,
-                "start_time": minutes_to_time(current),
-                "end_time": minutes_to_time(slot_end),
-                "duration": period_duration
-            })
-            slot_num += 1
-        
-        current = slot_end + 10  # 10 minute break
-        
-        # Jump over lunch break
-        if current >= lunch_start_minutes and current < lunch_end_minutes:
-            current = lunch_end_minutes
-    
-    return slots
+def run_generation_job(user_id: int, config: Dict, publish) -> Dict:
+    # Runs on a job worker thread, so it needs its own session
+    db = SessionLocal()
+    try:
+        service = UniversityTimetableService(db, progress=ProgressReporter(publish))
+        if config.get('section_id'):
+            timetable = service.generate_university_timetable(user_id, config['section_id'], config)
+            timetables = [timetable] if timetable else None
+        else:
+            timetables = service.generate_tenant_timetables(user_id, config)
+        
+        if timetables is None:
+            raise JobError("; ".join(service.conflicts) or "No courses found")
+        
+        return {
+            "timetables": [
+                {"id": timetable.id, "section_id": timetable.section_id, "name": timetable.name}
+                for timetable in timetables
+            ],
+            "complete": service.solver_stats.get('complete', True),
+            "conflicts": service.conflicts,
+            "solver": service.solver_stats
+        }
+    finally:
+        db.close()
 
-def generate_smart_timetable(courses, time_slots, working_days):
-    timetable = {}
-    course_schedule = {}  # Track when each course is scheduled
-    teacher_schedule = {}  # Track teacher availability
-    room_schedule = {}  # Track room availability
-    
-    # Initialize timetable structure
-    for day in working_days:
-        timetable[day] = {}
-        for slot in time_slots:
-            timetable[day][slot["slot_number"]] = {
-                "time": f"{slot['start_time']}-{slot['end_time']}",
-                "subject": None,
-                "teacher": None,
-                "room": None,
-                "type": "free"
-            }
-    
-    # Distribute courses across days and time slots
-    course_index = 0
-    for day in working_days:
-        for slot in time_slots:
-            if course_index < len(courses):
-                course = courses[course_index % len(courses)]
-                slot_key = slot["slot_number"]
-                
-                # Check for conflicts
-                teacher_key = f"{day}-{slot_key}"
-                room_key = f"{day}-{slot_key}"
-                
-                if (teacher_key not in teacher_schedule.get(course.get('teacher', ''), []) and 
-                    room_key not in room_schedule.get(course.get('room', ''), [])):
-                    
-                    # Assign course to slot
-                    timetable[day][slot_key] = {
-                        "time": f"{slot['start_time']}-{slot['end_time']}",
-                        "subject": course.get('subject_name', course.get('name', 'Unknown')),
-                        "subject_code": course.get('subject_code', 'N/A'),
-                        "teacher": course.get('teacher_name', course.get('teacher', 'TBA')),
-                        "room": f"{course.get('room_number', course.get('room', 'TBA'))} - {course.get('building', '')}".strip(' - '),
-                        "type": "class",
-                        "course_id": course.get('id')
-                    }
-                    
-                    # Track schedules
-                    teacher_name = course.get('teacher_name', course.get('teacher', ''))
-                    room_name = course.get('room_number', course.get('room', ''))
-                    
-                    if teacher_name:
-                        if teacher_name not in teacher_schedule:
-                            teacher_schedule[teacher_name] = []
-                        teacher_schedule[teacher_name].append(teacher_key)
-                    
-                    if room_name:
-                        if room_name not in room_schedule:
-                            room_schedule[room_name] = []
-                        room_schedule[room_name].append(room_key)
-                    
-                    course_index += 1
-    
-    return timetable
+# Queued and orphaned jobs are picked up by job_queue.resume() at app startup
+job_queue.register('generate', run_generation_job)
 
-def detect_conflicts(timetable):
-    conflicts = []
-    teacher_slots = {}
-    room_slots = {}
+@router.post("/timetables/jobs")
+async def create_generation_job(
+    config: GenerationJobConfig,
+    user_id: int = Depends(get_current_user_id)
+):
+    try:
+        job_id = await run_in_threadpool(job_queue.submit, 'generate', user_id, config.dict())
+        
+        if job_id is None:
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to queue job")
+        
+        return {"success": True, "data": {"job_id": job_id, "status": "queued"}}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error queueing generation job: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to queue job")
+
+@router.get("/timetables/jobs/{job_id}")
+async def get_generation_job(
+    job_id: str,
+    user_id: int = Depends(get_current_user_id)
+):
+    try:
+        job = await run_in_threadpool(job_queue.get, job_id, user_id)
+        
+        if job is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        
+        return {"success": True, "data": job}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error fetching job: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch job")
+
+@router.get("/timetables/jobs/{job_id}/events")
+async def stream_generation_job(
+    job_id: str,
+    user_id: int = Depends(get_current_user_id)
+):
+    job = await run_in_threadpool(job_queue.get, job_id, user_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
     
-    for day, slots in timetable.items():
-        for slot_num, slot_data in slots.items():
-            if slot_data["type"] == "class":
-                teacher = slot_data["teacher"]
-                room = slot_data["room"]
-                time_key = f"{day}-{slot_num}"
-                
-                # Check teacher conflicts
-                if teacher and teacher != "TBA":
-                    if teacher in teacher_slots:
-                        if time_key in teacher_slots[teacher]:
-                            conflicts.append({
-                                "type": "teacher",
-                                "teacher": teacher,
-                                "time": slot_data["time"],
-                                "day": day
-                            })
-                        else:
-                            teacher_slots[teacher].append(time_key)
-                    else:
-                        teacher_slots[teacher] = [time_key]
-                
-                # Check room conflicts
-                if room and room != "TBA":
-                    if room in room_slots:
-                        if time_key in room_slots[room]:
-                            conflicts.append({
-                                "type": "room",
-                                "room": room,
-                                "time": slot_data["time"],
-                                "day": day
-                            })
-                        else:
-                            room_slots[room].append(time_key)
-                    else:
-                        room_slots[room] = [time_key]
+    async def events():
+        # Server-Sent Events: throttled solver progress, then the final job state
+        after = 0
+        while True:
+            update = progress_broker.read(job_id, after)
+            if update is None:
+                break
+            entries, closed = update
+            for sequence, event in entries:
+                after = sequence
+                yield f"id: {sequence}\nevent: progress\ndata: {json.dumps(event)}\n\n"
+            if closed:
+                break
+            await asyncio.sleep(0.2)
+        
+        final = await run_in_threadpool(job_queue.get, job_id)
+        yield f"event: done\ndata: {json.dumps(final, default=str)}\n\n"
     
-    return conflicts
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+@router.post("/timetables/{timetable_id}/repair")
+def repair_timetable(
+    timetable_id: int,
+    changes: TimetableRepair,
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = UniversityTimetableService(db)
+        result = service.repair_timetable(user_id, timetable_id, changes.dict())
+        
+        if result is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="; ".join(service.conflicts) or "Timetable not found"
+            )
+        
+        return {"success": True, "data": result}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error repairing timetable: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to repair timetable")
+
+@router.get("/timetables/audit")
+def audit_timetables(
+    user_id: int = Depends(get_current_user_id),
+    db: Session = Depends(get_db)
+):
+    try:
+        service = UniversityTimetableService(db)
+        return {"success": True, "data": service.audit_tenant_conflicts(user_id)}
+    except Exception as e:
+        logger.error(f"Error auditing timetables: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to audit timetables")
 
-def time_to_minutes(time_str: str) -> int:
-    hours, minutes = map(int, time_str.split(':'))
-    return hours * 60 + minutes
+def detect_conflicts(timetable):
+    return grid_conflicts(timetable)
+
+def with_timings(response: Dict, timings: PhaseTimer, debug: Optional[str],
+                 solver_stats: Optional[Dict] = None) -> Dict:
+    # ?debug=timings exposes the per-phase breakdown of this request, and the
+    # solver's own statistics when it ran (a cached answer has none)
+    if debug == 'timings':
+        response["timings"] = timings.as_dict()
+        if solver_stats is not None:
+            response["solver_stats"] = solver_stats
+    return response
+
+@router.get("/timetables/solvers")
+async def list_solvers():
+    return {
+        "success": True,
+        "data": [
+            {
+                "name": name,
+                "description": get_solver(name).description,
+                "partial_results": get_solver(name).partial_results,
+                "on_failure": get_solver(name).on_failure
+            }
+            for name in solver_names()
+        ]
+    }
 
-def minutes_to_time(minutes: int) -> str:
-    hours = minutes // 60
-    mins = minutes % 60
-    return f"{hours:02d}:{mins:02d}"
+@router.get("/timetables/metrics")
+async def get_generation_metrics(user_id: int = Depends(get_current_user_id)):
+    return {"success": True, "data": metrics.snapshot()}
 
 @router.get("/sections/{section_id}/timetable")
 async def get_university_timetable(
@@ -579,7 +785,7 @@ async def get_university_timetable(
 ):
     try:
         query = "SELECT * FROM courses WHERE section_id = ? AND user_id = ?"
-        courses = database.execute_query(query, (section_id, user_id))
+        courses = await async_database.fetch_all(query, (section_id, user_id))
         
         if not courses:
             raise HTTPException(
@@ -597,7 +803,7 @@ async def get_university_timetable(
 async def get_branches(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM branches WHERE user_id = ? ORDER BY name"
-        branches = database.execute_query(query, (user_id,))
+        branches = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": branches or []}
     except Exception as e:
         logger.error(f"Error fetching branches: {e}")
@@ -607,7 +813,7 @@ async def get_branches(user_id: int = Depends(get_current_user_id)):
 async def get_sections(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM university_sections WHERE user_id = ? ORDER BY year, semester, name"
-        sections = database.execute_query(query, (user_id,))
+        sections = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": sections or []}
     except Exception as e:
         logger.error(f"Error fetching sections: {e}")
@@ -617,7 +823,7 @@ async def get_sections(user_id: int = Depends(get_current_user_id)):
 async def get_teachers(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM teachers WHERE user_id = ? ORDER BY name"
-        teachers = database.execute_query(query, (user_id,))
+        teachers = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": teachers or []}
     except Exception as e:
         logger.error(f"Error fetching teachers: {e}")
@@ -627,7 +833,7 @@ async def get_teachers(user_id: int = Depends(get_current_user_id)):
 async def get_rooms(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM rooms WHERE user_id = ? ORDER BY building, number"
-        rooms = database.execute_query(query, (user_id,))
+        rooms = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": rooms or []}
     except Exception as e:
         logger.error(f"Error fetching rooms: {e}")
@@ -637,7 +843,7 @@ async def get_rooms(user_id: int = Depends(get_current_user_id)):
 async def get_subjects(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM subjects WHERE user_id = ? ORDER BY name"
-        subjects = database.execute_query(query, (user_id,))
+        subjects = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": subjects or []}
     except Exception as e:
         logger.error(f"Error fetching subjects: {e}")
@@ -647,7 +853,7 @@ async def get_subjects(user_id: int = Depends(get_current_user_id)):
 async def get_courses(user_id: int = Depends(get_current_user_id)):
     try:
         query = "SELECT * FROM courses WHERE user_id = ? ORDER BY section_id"
-        courses = database.execute_query(query, (user_id,))
+        courses = await async_database.fetch_all(query, (user_id,))
         return {"success": True, "data": courses or []}
     except Exception as e:
         logger.error(f"Error fetching courses: {e}")
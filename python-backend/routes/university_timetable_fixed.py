@@ -3,7 +3,8 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from pydantic import BaseModel
 from typing import List, Optional
 from services.auth_service import verify_token, get_user_profile
-from config.sqlite_database import database
+from config.sqlite_database import async_database
+from services.solution_cache import solution_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -62,7 +63,7 @@ async def create_section_public(section: SectionCreate):
     try:
         user_id = 1
         query = "INSERT INTO university_sections (name, year, semester, branch_id, strength, user_id) VALUES (?, ?, ?, ?, ?, ?)"
-        section_id = database.execute_insert(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
+        section_id = await async_database.execute(query, (section.name, section.year, section.semester, section.branch_id, section.strength, user_id))
         return {"success": True, "data": {"id": section_id, "name": section.name, "year": section.year, "semester": section.semester, "strength": section.strength}}
     except Exception as e:
         logger.error(f"Error creating section: {e}")
@@ -73,7 +74,8 @@ async def create_teacher_public(teacher: TeacherCreate):
     try:
         user_id = 1
         query = "INSERT INTO teachers (name, employee_id, department, max_hours_per_day, user_id) VALUES (?, ?, ?, ?, ?)"
-        teacher_id = database.execute_insert(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        teacher_id = await async_database.execute(query, (teacher.name, teacher.employee_id, teacher.department, teacher.max_hours_per_day, user_id))
+        solution_cache.invalidate("teachers")
         return {"success": True, "data": {"id": teacher_id, "name": teacher.name, "employee_id": teacher.employee_id, "department": teacher.department, "max_hours_per_day": teacher.max_hours_per_day}}
     except Exception as e:
         logger.error(f"Error creating teacher: {e}")
@@ -84,7 +86,8 @@ async def create_subject_public(subject: SubjectCreate):
     try:
         user_id = 1
         query = "INSERT INTO subjects (name, code, credits, subject_type, hours_per_week, user_id) VALUES (?, ?, ?, ?, ?, ?)"
-        subject_id = database.execute_insert(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        subject_id = await async_database.execute(query, (subject.name, subject.code, subject.credits, subject.subject_type, subject.hours_per_week, user_id))
+        solution_cache.invalidate("subjects")
         return {"success": True, "data": {"id": subject_id, "name": subject.name, "code": subject.code, "credits": subject.credits, "subject_type": subject.subject_type, "hours_per_week": subject.hours_per_week}}
     except Exception as e:
         logger.error(f"Error creating subject: {e}")
@@ -95,7 +98,8 @@ async def create_room_public(room: RoomCreate):
     try:
         user_id = 1
         query = "INSERT INTO rooms (number, building, capacity, room_type, user_id) VALUES (?, ?, ?, ?, ?)"
-        room_id = database.execute_insert(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        room_id = await async_database.execute(query, (room.number, room.building, room.capacity, room.room_type, user_id))
+        solution_cache.invalidate("rooms")
         return {"success": True, "data": {"id": room_id, "number": room.number, "building": room.building, "capacity": room.capacity, "room_type": room.room_type}}
     except Exception as e:
         logger.error(f"Error creating room: {e}")
@@ -106,7 +110,8 @@ async def create_course_public(course: CourseCreate):
     try:
         user_id = 1
         query = "INSERT INTO courses (name, teacher, room, section_id, user_id) SELECT s.name, t.name, r.number, ?, ? FROM subjects s, teachers t, rooms r WHERE s.id = ? AND t.id = ? AND r.id = ?"
-        course_id = database.execute_insert(query, (course.section_id, user_id, course.subject_id, course.teacher_id, course.room_id or 1))
+        course_id = await async_database.execute(query, (course.section_id, user_id, course.subject_id, course.teacher_id, course.room_id or 1))
+        solution_cache.invalidate(f"section:{course.section_id}")
         return {"success": True, "data": {"id": course_id, "section_id": course.section_id, "subject_id": course.subject_id, "teacher_id": course.teacher_id, "room_id": course.room_id}}
     except Exception as e:
         logger.error(f"Error creating course: {e}")
@@ -116,7 +121,7 @@ async def create_course_public(course: CourseCreate):
 async def get_sections_public():
     try:
         query = "SELECT * FROM university_sections ORDER BY year, semester, name"
-        sections = database.execute_query(query)
+        sections = await async_database.fetch_all(query)
         return {"success": True, "data": sections or []}
     except Exception as e:
         logger.error(f"Error fetching sections: {e}")
@@ -126,7 +131,7 @@ async def get_sections_public():
 async def get_teachers_public():
     try:
         query = "SELECT * FROM teachers ORDER BY name"
-        teachers = database.execute_query(query)
+        teachers = await async_database.fetch_all(query)
         return {"success": True, "data": teachers or []}
     except Exception as e:
         logger.error(f"Error fetching teachers: {e}")
@@ -136,7 +141,7 @@ async def get_teachers_public():
 async def get_subjects_public():
     try:
         query = "SELECT * FROM subjects ORDER BY name"
-        subjects = database.execute_query(query)
+        subjects = await async_database.fetch_all(query)
         return {"success": True, "data": subjects or []}
     except Exception as e:
         logger.error(f"Error fetching subjects: {e}")
@@ -146,7 +151,7 @@ async def get_subjects_public():
 async def get_section_courses_public(section_id: int):
     try:
         query = "SELECT * FROM courses WHERE section_id = ?"
-        courses = database.execute_query(query, (section_id,))
+        courses = await async_database.fetch_all(query, (section_id,))
         return {"success": True, "data": courses or []}
     except Exception as e:
         logger.error(f"Error fetching section courses: {e}")
@@ -156,7 +161,7 @@ async def get_section_courses_public(section_id: int):
 async def generate_timetable_public(config: TimetableConfig):
     try:
         query = "SELECT c.*, s.name as subject_name, s.code as subject_code, t.name as teacher_name, r.number as room_number FROM courses c LEFT JOIN subjects s ON c.name = s.name LEFT JOIN teachers t ON c.teacher = t.name LEFT JOIN rooms r ON c.room = r.number WHERE c.section_id = ?"
-        courses = database.execute_query(query, (config.section_id,))
+        courses = await async_database.fetch_all(query, (config.section_id,))
         
         if not courses:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No courses found for this section")
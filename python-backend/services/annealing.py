@@ -0,0 +1,141 @@
+import math
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from services.occupancy import OccupancyIndex
+from services.progress import ProgressReporter
+from services.schedule_quality import PenaltyModel
+from services.slot_template import SlotTemplate
+from services.timetable_search import SearchUnit
+
+
+def anneal_schedule(units: List[SearchUnit], template: SlotTemplate, assignment: List[Tuple[int, int, int]],
+                    occupancy: Optional[OccupancyIndex] = None, time_limit_ms: int = 200,
+                    seed: Optional[int] = None, weights: Optional[Dict[str, int]] = None,
+                    start_temperature: float = 5.0, end_temperature: float = 0.05,
+                    target_penalty: Optional[int] = None,
+                    progress: Optional[ProgressReporter] = None) -> Tuple[List[Tuple[int, int, int]], Dict]:
+    """Improve a feasible assignment with move/swap simulated annealing.
+
+    Hard constraints are kept at every step; only the soft penalty changes.
+    Stops at the time limit or as soon as the penalty reaches
+    ``target_penalty``. Returns the best assignment seen and run statistics.
+    """
+    rng = random.Random(seed)
+    periods = template.periods_per_day
+    cell_count = template.num_days * periods
+    model = PenaltyModel(units, template, assignment, weights)
+
+    # Occupancy with the current assignment booked on top of prior bookings
+    occupancy = occupancy.copy() if occupancy else OccupancyIndex(periods)
+    placed = [index for index, _, _ in assignment]
+    for index, day, period in assignment:
+        unit = units[index]
+        occupancy.assign(unit.teacher_id, unit.room_id, unit.section_id, day, period, unit.length)
+
+    by_section: Dict[Optional[int], List[int]] = {}
+    for index in placed:
+        by_section.setdefault(units[index].section_id, []).append(index)
+
+    stats = {'initial_penalty': model.cost, 'iterations': 0, 'accepted': 0}
+    best_cost = model.cost
+    best_cells = list(model.cells)
+
+    if target_penalty is None:
+        target_penalty = -1
+
+    if not placed or cell_count < 2 or time_limit_ms <= 0 or best_cost <= target_penalty:
+        stats['final_penalty'] = best_cost
+        return assignment, stats
+
+    def unbook(index: int, cell: int):
+        unit = units[index]
+        occupancy.release(unit.teacher_id, unit.room_id, unit.section_id, cell // periods, cell % periods, unit.length)
+
+    def release(index: int):
+        unbook(index, model.cells[index])
+
+    def book(index: int, cell: int):
+        unit = units[index]
+        occupancy.assign(unit.teacher_id, unit.room_id, unit.section_id, cell // periods, cell % periods, unit.length)
+
+    def fits(index: int, cell: int) -> bool:
+        unit = units[index]
+        if not template.block_starts(unit.length) >> (cell % periods) & 1:
+            return False
+        return occupancy.can_assign(unit.teacher_id, unit.room_id, unit.section_id,
+                                    cell // periods, cell % periods, unit.max_hours_per_day, unit.length)
+
+    started = time.monotonic()
+    budget = time_limit_ms / 1000.0
+    temperature = start_temperature
+    cooling = end_temperature / start_temperature
+
+    while True:
+        if stats['iterations'] % 64 == 0:
+            elapsed = time.monotonic() - started
+            if elapsed >= budget:
+                break
+            temperature = start_temperature * cooling ** (elapsed / budget)
+            if progress is not None and progress.due():
+                progress.emit('annealing', placed=len(placed), total=len(units), conflicts=len(units) - len(placed),
+                              best_penalty=best_cost, iterations=stats['iterations'])
+        stats['iterations'] += 1
+
+        first = placed[rng.randrange(len(placed))]
+        siblings = by_section[units[first].section_id]
+        old_first = model.cells[first]
+
+        if units[first].section_id and len(siblings) > 1 and rng.random() < 0.5:
+            # Swap two hours of the same section
+            second = siblings[rng.randrange(len(siblings))]
+            old_second = model.cells[second]
+            if second == first or old_second == old_first:
+                continue
+            release(first)
+            release(second)
+            # Check the second hour after booking the first: blocks of different lengths can overlap
+            if not fits(first, old_second):
+                book(first, old_first)
+                book(second, old_second)
+                continue
+            book(first, old_second)
+            if not fits(second, old_first):
+                unbook(first, old_second)
+                book(first, old_first)
+                book(second, old_second)
+                continue
+            book(second, old_first)
+            moves = [(first, old_second), (second, old_first)]
+        else:
+            # Move one hour to another free cell
+            target = rng.randrange(cell_count)
+            if target == old_first:
+                continue
+            release(first)
+            if not fits(first, target):
+                book(first, old_first)
+                continue
+            book(first, target)
+            moves = [(first, target)]
+
+        delta, undo = model.apply(moves)
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            stats['accepted'] += 1
+            if model.cost < best_cost:
+                best_cost = model.cost
+                best_cells = list(model.cells)
+                if best_cost <= target_penalty:
+                    break
+            continue
+
+        # Rejected: restore occupancy and penalty state
+        for index, _ in moves:
+            release(index)
+        for index, cell in undo:
+            book(index, cell)
+        model.revert(undo, delta)
+
+    stats['final_penalty'] = best_cost
+    stats['elapsed_ms'] = round((time.monotonic() - started) * 1000, 1)
+    return [(index, best_cells[index] // periods, best_cells[index] % periods) for index in placed], stats
@@ -50,4 +50,15 @@ def register_user(email: str, password: str, name: str):
         return user_id
     except Exception as e:
         print(f"Registration error for {email}: {e}")
-        return None
\ No newline at end of file
+        return None
+
+def get_user_profile(email: str):
+    try:
+        user = User.get_user_by_email(email)
+        if not user:
+            return None
+        
+        return {"id": user["id"], "email": user["email"], "name": user["name"]}
+    except Exception as e:
+        print(f"Profile lookup error for {email}: {e}")
+        return None
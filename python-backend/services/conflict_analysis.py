@@ -0,0 +1,164 @@
+from collections import Counter
+from typing import Dict, List, Sequence
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+RESOURCE_TYPES = ('teacher', 'room', 'section')
+
+
+class GridEncoder:
+    """Interns arbitrary labels (teacher names, room numbers, ...) to small ints."""
+
+    def __init__(self):
+        self.codes: Dict = {}
+        self.labels: List = []
+
+    def encode(self, label) -> int:
+        if label is None or label == '' or label == 'TBA':
+            return -1
+        code = self.codes.get(label)
+        if code is None:
+            code = len(self.labels)
+            self.codes[label] = code
+            self.labels.append(label)
+        return code
+
+
+def find_clashes(days: Sequence[int], periods: Sequence[int], resources: Dict[str, Sequence[int]],
+                 periods_per_day: int) -> List[Dict]:
+    """Every (resource, day, period) booked more than once, in one pass per resource type.
+
+    ``days``/``periods`` are parallel arrays of the booked cells and
+    ``resources`` maps a resource type to a parallel array of its codes;
+    ``-1`` means "no resource" and is ignored.
+    """
+    if not len(days):
+        return []
+
+    clashes = []
+    if np is not None:
+        cells = np.asarray(days, dtype=np.int64) * periods_per_day + np.asarray(periods, dtype=np.int64)
+        cell_count = int(cells.max()) + 1
+        for kind, codes in resources.items():
+            codes = np.asarray(codes, dtype=np.int64)
+            booked = codes >= 0
+            keys = codes[booked] * cell_count + cells[booked]
+            if not keys.size:
+                continue
+            unique, counts = np.unique(keys, return_counts=True)
+            repeated = counts > 1
+            for key, count in zip(unique[repeated].tolist(), counts[repeated].tolist()):
+                resource, cell = divmod(key, cell_count)
+                clashes.append({
+                    'type': kind, 'resource': resource,
+                    'day': cell // periods_per_day, 'period': cell % periods_per_day, 'count': count
+                })
+        return clashes
+
+    # Pure-Python fallback when NumPy is unavailable
+    for kind, codes in resources.items():
+        counts = Counter(
+            (code, day, period) for code, day, period in zip(codes, days, periods) if code >= 0
+        )
+        for (resource, day, period), count in sorted(counts.items()):
+            if count > 1:
+                clashes.append({'type': kind, 'resource': resource, 'day': day, 'period': period, 'count': count})
+    return clashes
+
+
+def find_overlaps(days: Sequence[int], starts: Sequence[int], ends: Sequence[int],
+                  resources: Dict[str, Sequence[int]]) -> List[Dict]:
+    """Every run of overlapping [start, end) bookings of one resource on one day.
+
+    Parallel arrays as in ``find_clashes``, with start and end minutes
+    instead of periods. Bookings that overlap in a chain (09:00-10:00,
+    09:30-10:30, 10:15-11:00) form one clash spanning all of them; ones
+    that only touch (09:00-10:00, 10:00-11:00) do not clash.
+    """
+    if not len(days):
+        return []
+
+    clashes = []
+    if np is not None:
+        days = np.asarray(days, dtype=np.int64)
+        starts = np.asarray(starts, dtype=np.int64)
+        ends = np.asarray(ends, dtype=np.int64)
+        day_count = int(days.max()) + 1
+        span = int(max(starts.max(), ends.max())) + 1
+        for kind, codes in resources.items():
+            codes = np.asarray(codes, dtype=np.int64)
+            booked = codes >= 0
+            if not booked.any():
+                continue
+            groups = codes[booked] * day_count + days[booked]
+            order = np.lexsort((starts[booked], groups))
+            groups, start, end = groups[order], starts[booked][order], ends[booked][order]
+            # Latest end so far within each (resource, day); groups ascend, so
+            # offsetting by group * span keeps one group's ends out of the next
+            reach = np.maximum.accumulate(groups * span + end) - groups * span
+            new_run = np.ones(len(groups), dtype=bool)
+            new_run[1:] = (groups[1:] != groups[:-1]) | (start[1:] >= reach[:-1])
+            first = np.flatnonzero(new_run)
+            last = np.append(first[1:] - 1, len(groups) - 1)
+            counts = last - first + 1
+            for run in np.flatnonzero(counts > 1).tolist():
+                resource, day = divmod(int(groups[first[run]]), day_count)
+                clashes.append({
+                    'type': kind, 'resource': resource, 'day': day,
+                    'start': int(start[first[run]]), 'end': int(reach[last[run]]), 'count': int(counts[run])
+                })
+        return clashes
+
+    # Pure-Python fallback when NumPy is unavailable
+    for kind, codes in resources.items():
+        bookings = sorted(
+            (code, day, start, end) for code, day, start, end in zip(codes, days, starts, ends) if code >= 0
+        )
+        run = None
+        for code, day, start, end in bookings:
+            if run and (run['resource'], run['day']) == (code, day) and start < run['end']:
+                run['end'] = max(run['end'], end)
+                run['count'] += 1
+                continue
+            if run and run['count'] > 1:
+                clashes.append(run)
+            run = {'type': kind, 'resource': code, 'day': day, 'start': start, 'end': end, 'count': 1}
+        if run and run['count'] > 1:
+            clashes.append(run)
+    return clashes
+
+
+def grid_conflicts(timetable: Dict) -> List[Dict]:
+    # Route-level grid: {day: {slot_number: {"type", "teacher", "room", "time"}}}
+    day_encoder = GridEncoder()
+    teacher_encoder = GridEncoder()
+    room_encoder = GridEncoder()
+    days, periods, teachers, rooms, times = [], [], [], [], {}
+    periods_per_day = 1
+
+    for day, slots in timetable.items():
+        day_code = day_encoder.encode(day)
+        for slot_num, slot_data in slots.items():
+            if slot_data["type"] != "class":
+                continue
+            period = int(slot_num)
+            periods_per_day = max(periods_per_day, period + 1)
+            days.append(day_code)
+            periods.append(period)
+            teachers.append(teacher_encoder.encode(slot_data["teacher"]))
+            rooms.append(room_encoder.encode(slot_data["room"]))
+            times[(day_code, period)] = slot_data["time"]
+
+    conflicts = []
+    for clash in find_clashes(days, periods, {'teacher': teachers, 'room': rooms}, periods_per_day):
+        encoder = teacher_encoder if clash['type'] == 'teacher' else room_encoder
+        conflicts.append({
+            "type": clash['type'],
+            clash['type']: encoder.labels[clash['resource']],
+            "time": times[(clash['day'], clash['period'])],
+            "day": day_encoder.labels[clash['day']],
+            "count": clash['count']
+        })
+    return conflicts
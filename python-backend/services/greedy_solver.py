@@ -0,0 +1,61 @@
+import random
+from typing import Dict, List, Optional, Tuple
+from services.occupancy import OccupancyIndex
+from services.progress import ProgressReporter
+from services.slot_template import SlotTemplate
+from services.timetable_search import SearchUnit
+
+
+def greedy_assign(units: List[SearchUnit], template: SlotTemplate, occupancy: Optional[OccupancyIndex] = None,
+                  rng: Optional[random.Random] = None,
+                  progress: Optional[ProgressReporter] = None,
+                  counters: Optional[Dict[str, int]] = None) -> Tuple[List[Tuple[int, int, int]], List[int]]:
+    """Randomized first-fit placement.
+
+    Returns ``(assignment, unplaced)`` where assignment holds
+    ``(unit_index, day, period)`` tuples. The given occupancy is not modified.
+    Candidate cells tried and failed checks are added to ``counters`` if given.
+    """
+    rng = rng or random.Random()
+    occupancy = occupancy.copy() if occupancy else OccupancyIndex(template.periods_per_day)
+
+    # Shuffle for randomization
+    order = list(range(len(units)))
+    rng.shuffle(order)
+
+    assignment = []
+    unplaced = []
+    periods = list(range(template.periods_per_day))
+    tried = 0
+    failed = 0
+
+    for index in order:
+        unit = units[index]
+        assigned = False
+        if progress is not None and progress.due():
+            progress.emit('greedy', placed=len(assignment), total=len(units), conflicts=len(unplaced))
+
+        starts = template.block_starts(unit.length)
+        for day in range(template.num_days):
+            rng.shuffle(periods)
+            for period in periods:
+                if not starts >> period & 1:
+                    continue
+                tried += 1
+                if occupancy.can_assign(unit.teacher_id, unit.room_id, unit.section_id,
+                                        day, period, unit.max_hours_per_day, unit.length):
+                    occupancy.assign(unit.teacher_id, unit.room_id, unit.section_id, day, period, unit.length)
+                    assignment.append((index, day, period))
+                    assigned = True
+                    break
+                failed += 1
+            if assigned:
+                break
+
+        if not assigned:
+            unplaced.append(index)
+
+    if counters is not None:
+        counters['candidates_tried'] = counters.get('candidates_tried', 0) + tried
+        counters['failed_checks'] = counters.get('failed_checks', 0) + failed
+    return assignment, unplaced
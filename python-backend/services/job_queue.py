@@ -0,0 +1,244 @@
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+from services.progress import progress_broker
+
+logger = logging.getLogger(__name__)
+
+# Running jobs refresh their heartbeat this often; one silent for STALE_AFTER
+# belongs to a process that died and may be run again
+HEARTBEAT_SECONDS = 15
+STALE_AFTER_SECONDS = 60
+
+
+class JobError(Exception):
+    """A failure whose message is meant for the user who submitted the job."""
+
+
+class JobQueue:
+    """Background jobs run on a bounded thread pool and tracked in SQLite.
+
+    Every state change is written to the ``generation_jobs`` table, so the
+    status API keeps working across restarts; ``resume()``, called once the
+    app starts, picks up jobs a previous process left queued or running.
+    Handlers take ``(user_id, payload, publish)`` and return a
+    JSON-serializable result; ``publish`` forwards progress events to the
+    job's channel on ``progress_broker``. Any exception a handler raises
+    marks the job failed; only a ``JobError`` message is shown to the user.
+
+    Several server processes may share the table: a job is claimed with a
+    conditional update, so only one of them runs it, and the claiming
+    process keeps a heartbeat on it while it runs.
+    """
+
+    def __init__(self, db_path: str, workers: int = 2):
+        self.db_path = db_path
+        self.workers = workers
+        self._handlers: Dict[str, Callable[[int, Dict, Callable[[Dict], None]], Dict]] = {}
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._heartbeat: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._table_ready = False
+
+    def register(self, kind: str, handler: Callable[[int, Dict, Callable[[Dict], None]], Dict]):
+        # Only records the handler, so importing the module that registers it
+        # touches neither the database nor the worker pool
+        self._handlers[kind] = handler
+
+    def resume(self):
+        for kind in list(self._handlers):
+            self._resume(kind)
+
+    def _resume(self, kind: str):
+        self._ensure_table()
+        # Jobs whose process stopped heartbeating go back to the queue; those
+        # another live process is running are left alone
+        stale = _now(-STALE_AFTER_SECONDS)
+        for (job_id,) in self._execute(
+            "SELECT id FROM generation_jobs WHERE kind = ? AND status = 'running' "
+            "AND (heartbeat_at IS NULL OR heartbeat_at < ?)", (kind, stale)
+        ) or []:
+            if self._update(
+                "UPDATE generation_jobs SET status = 'queued', owner = NULL, started_at = NULL WHERE id = ? "
+                "AND status = 'running' AND (heartbeat_at IS NULL OR heartbeat_at < ?)", (job_id, stale)
+            ):
+                logger.info(f"Requeued job {job_id} from a stopped worker")
+
+        # Every process may try queued jobs; the claim in _run lets only one run each
+        rows = self._execute(
+            "SELECT id FROM generation_jobs WHERE kind = ? AND status = 'queued' ORDER BY created_at", (kind,)
+        )
+        for (job_id,) in rows or []:
+            progress_broker.open(job_id)
+            self._get_executor().submit(self._run, job_id)
+
+    def submit(self, kind: str, user_id: int, payload: Dict) -> Optional[str]:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        self._ensure_table()
+        job_id = uuid.uuid4().hex
+        inserted = self._execute(
+            "INSERT INTO generation_jobs (id, kind, user_id, payload, status, created_at) VALUES (?, ?, ?, ?, 'queued', ?)",
+            (job_id, kind, user_id, json.dumps(payload), _now())
+        )
+        if inserted is None:
+            return None
+        progress_broker.open(job_id)
+        self._get_executor().submit(self._run, job_id)
+        return job_id
+
+    def get(self, job_id: str, user_id: Optional[int] = None) -> Optional[Dict]:
+        self._ensure_table()
+        rows = self._execute(
+            "SELECT id, kind, user_id, status, result, error, created_at, started_at, finished_at "
+            "FROM generation_jobs WHERE id = ?",
+            (job_id,)
+        )
+        if not rows:
+            return None
+        job_id, kind, owner, status, result, error, created_at, started_at, finished_at = rows[0]
+        if user_id is not None and owner != user_id:
+            return None
+        return {
+            'id': job_id,
+            'kind': kind,
+            'status': status,
+            'result': json.loads(result) if result else None,
+            'error': error,
+            'created_at': created_at,
+            'started_at': started_at,
+            'finished_at': finished_at
+        }
+
+    def _run(self, job_id: str):
+        claimed = self._update(
+            "UPDATE generation_jobs SET status = 'running', owner = ?, started_at = ?, heartbeat_at = ? "
+            "WHERE id = ? AND status = 'queued'",
+            (self.owner, _now(), _now(), job_id)
+        )
+        if not claimed:
+            # Another worker or process got there first
+            return
+        rows = self._execute("SELECT kind, user_id, payload FROM generation_jobs WHERE id = ?", (job_id,))
+        if not rows:
+            return
+        kind, user_id, payload = rows[0]
+        self._start_heartbeat()
+
+        def publish(event: Dict):
+            progress_broker.publish(job_id, event)
+
+        try:
+            result = self._handlers[kind](user_id, json.loads(payload), publish)
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {e}")
+            self._execute(
+                "UPDATE generation_jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                (str(e) if isinstance(e, JobError) else "Job failed", _now(), job_id)
+            )
+            progress_broker.close(job_id)
+            return
+
+        self._execute(
+            "UPDATE generation_jobs SET status = 'succeeded', result = ?, finished_at = ? WHERE id = ?",
+            (json.dumps(result, default=str), _now(), job_id)
+        )
+        progress_broker.close(job_id)
+
+    def _start_heartbeat(self):
+        with self._lock:
+            if self._heartbeat is None:
+                self._heartbeat = threading.Thread(target=self._beat, name='generation-job-heartbeat', daemon=True)
+                self._heartbeat.start()
+
+    def _beat(self):
+        while True:
+            time.sleep(HEARTBEAT_SECONDS)
+            self._execute(
+                "UPDATE generation_jobs SET heartbeat_at = ? WHERE owner = ? AND status = 'running'",
+                (_now(), self.owner)
+            )
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='generation-job')
+            return self._executor
+
+    def _ensure_table(self):
+        # Created on first use rather than when the singleton is built
+        with self._lock:
+            if self._table_ready:
+                return
+            self._table_ready = self._init_table()
+
+    def _init_table(self) -> bool:
+        created = self._execute('''
+            CREATE TABLE IF NOT EXISTS generation_jobs (
+                id TEXT PRIMARY KEY,
+                kind TEXT NOT NULL,
+                user_id INTEGER NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at TIMESTAMP NOT NULL,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                owner TEXT,
+                heartbeat_at TIMESTAMP
+            )
+        ''')
+        self._execute("CREATE INDEX IF NOT EXISTS idx_generation_jobs_status ON generation_jobs (status)")
+        # Tables created before jobs were claimed per process lack these
+        columns = [row[1] for row in self._execute("PRAGMA table_info(generation_jobs)") or []]
+        for column in ('owner TEXT', 'heartbeat_at TIMESTAMP'):
+            if columns and column.split()[0] not in columns:
+                self._execute(f"ALTER TABLE generation_jobs ADD COLUMN {column}")
+        return created is not None
+
+    def _execute(self, query: str, params=()):
+        try:
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            try:
+                rows = connection.execute(query, params).fetchall()
+                connection.commit()
+                return rows
+            finally:
+                connection.close()
+        except Exception as e:
+            logger.error(f"Job queue database error: {e}")
+            return None
+
+    def _update(self, query: str, params=()) -> int:
+        # Number of rows changed, 0 on error
+        try:
+            connection = sqlite3.connect(self.db_path, timeout=10)
+            try:
+                changed = connection.execute(query, params).rowcount
+                connection.commit()
+                return changed
+            finally:
+                connection.close()
+        except Exception as e:
+            logger.error(f"Job queue database error: {e}")
+            return 0
+
+
+def _now(offset_seconds: float = 0) -> str:
+    return (datetime.utcnow() + timedelta(seconds=offset_seconds)).isoformat(timespec='seconds')
+
+
+job_queue = JobQueue(
+    db_path=os.getenv('JOB_QUEUE_PATH', os.getenv('DB_PATH', 'timetable.db')),
+    workers=int(os.getenv('JOB_WORKERS', '2'))
+)
@@ -0,0 +1,82 @@
+from contextlib import contextmanager
+from threading import Lock
+from time import monotonic
+from typing import Dict
+
+
+class PhaseTimer:
+    """Monotonic wall time per named phase of one operation, plus counters.
+
+    Phases entered more than once accumulate, so a phase wrapped around a
+    helper that runs per section still reports one total.
+    """
+
+    def __init__(self):
+        self.started = monotonic()
+        self.phases: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = monotonic()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (monotonic() - started) * 1000
+
+    def count(self, name: str, value: int = 1):
+        self.counters[name] = self.counters.get(name, 0) + value
+
+    def as_dict(self) -> Dict:
+        return {
+            'total_ms': round((monotonic() - self.started) * 1000, 3),
+            'phases_ms': {name: round(elapsed, 3) for name, elapsed in self.phases.items()},
+            'counters': dict(self.counters)
+        }
+
+
+class MetricsRegistry:
+    """Process-wide aggregates of PhaseTimer results, keyed by operation."""
+
+    def __init__(self):
+        self._lock = Lock()
+        self._operations: Dict[str, Dict] = {}
+
+    def record(self, operation: str, timer: PhaseTimer):
+        total_ms = (monotonic() - timer.started) * 1000
+        with self._lock:
+            entry = self._operations.setdefault(operation, {'count': 0, 'phases': {}, 'counters': {}})
+            entry['count'] += 1
+            for name, elapsed in list(timer.phases.items()) + [('total', total_ms)]:
+                phase = entry['phases'].setdefault(name, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+                phase['count'] += 1
+                phase['total_ms'] += elapsed
+                phase['max_ms'] = max(phase['max_ms'], elapsed)
+            for name, value in timer.counters.items():
+                entry['counters'][name] = entry['counters'].get(name, 0) + value
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                operation: {
+                    'count': entry['count'],
+                    'phases': {
+                        name: {
+                            'count': phase['count'],
+                            'total_ms': round(phase['total_ms'], 3),
+                            'mean_ms': round(phase['total_ms'] / phase['count'], 3),
+                            'max_ms': round(phase['max_ms'], 3)
+                        }
+                        for name, phase in entry['phases'].items()
+                    },
+                    'counters': dict(entry['counters'])
+                }
+                for operation, entry in self._operations.items()
+            }
+
+    def reset(self):
+        with self._lock:
+            self._operations.clear()
+
+
+metrics = MetricsRegistry()
@@ -0,0 +1,132 @@
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, List, Optional
+from services.greedy_solver import greedy_assign
+from services.occupancy import OccupancyIndex
+from services.progress import ProgressReporter
+from services.schedule_quality import schedule_penalty
+from services.slot_template import SlotTemplate
+from services.timetable_search import SearchUnit
+
+# One process pool for the whole server, sized once; requests share it and
+# bound their own concurrency instead of resizing it
+POOL_WORKERS = int(os.getenv('MULTISTART_WORKERS', '0')) or os.cpu_count() or 1
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+class ProblemSnapshot:
+    """Picklable, ORM-free copy of everything one greedy attempt needs."""
+
+    __slots__ = ('units', 'template', 'occupancy')
+
+    def __init__(self, units: List[SearchUnit], template: SlotTemplate, occupancy: Optional[OccupancyIndex] = None):
+        self.units = units
+        self.template = template
+        self.occupancy = occupancy or OccupancyIndex(template.periods_per_day)
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Forking a multithreaded server can copy held locks into the
+            # children, so workers start from a clean interpreter instead
+            method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            _executor = ProcessPoolExecutor(max_workers=POOL_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _executor
+
+
+def _discard_executor(executor: ProcessPoolExecutor):
+    # Only a broken pool is replaced, and only by the first request to notice
+    global _executor
+    with _executor_lock:
+        if _executor is executor:
+            _executor = None
+    executor.shutdown(wait=False)
+
+
+def run_attempt(snapshot: ProblemSnapshot, seed: int) -> Dict:
+    assignment, unplaced = greedy_assign(snapshot.units, snapshot.template, snapshot.occupancy, random.Random(seed))
+    return {
+        'seed': seed,
+        'assignment': assignment,
+        'unplaced': unplaced,
+        'penalty': schedule_penalty(snapshot.units, assignment, unplaced, snapshot.template)
+    }
+
+
+def run_multistart(snapshot: ProblemSnapshot, attempts: int = 16, workers: Optional[int] = None,
+                   seed: Optional[int] = None, time_limit_ms: Optional[float] = None,
+                   target_penalty: Optional[int] = None, progress: Optional[ProgressReporter] = None) -> Dict:
+    """Run independently seeded greedy attempts and keep the lowest penalty.
+
+    Stops early once an attempt reaches ``target_penalty`` or the
+    ``time_limit_ms`` budget is spent; ``attempts`` in the result counts the
+    attempts that actually finished, which is always at least one.
+    """
+    base_seed = seed if seed is not None else random.randrange(1 << 30)
+    seeds = [base_seed + attempt for attempt in range(max(attempts, 1))]
+    workers = max(1, min(workers or POOL_WORKERS, POOL_WORKERS, len(seeds)))
+    deadline = time.monotonic() + time_limit_ms / 1000.0 if time_limit_ms else None
+
+    def better(result: Dict, best: Optional[Dict]) -> bool:
+        return best is None or (result['penalty'], result['seed']) < (best['penalty'], best['seed'])
+
+    def done(best: Dict) -> bool:
+        return target_penalty is not None and best['penalty'] <= target_penalty
+
+    def report(best: Dict, finished: int):
+        if progress is not None and progress.due():
+            progress.emit('multistart', placed=len(best['assignment']), total=len(snapshot.units),
+                          conflicts=len(best['unplaced']), best_penalty=best['penalty'], attempts=finished)
+
+    best = None
+    finished = 0
+    if workers == 1:
+        for attempt_seed in seeds:
+            if best is not None and (done(best) or (deadline is not None and time.monotonic() >= deadline)):
+                break
+            result = run_attempt(snapshot, attempt_seed)
+            finished += 1
+            if better(result, best):
+                best = result
+            report(best, finished)
+        return dict(best, attempts=finished)
+
+    # At most `workers` attempts of this request are in the shared pool at once
+    executor = _get_executor()
+    queued = list(seeds)
+    pending = set()
+    try:
+        while queued or pending:
+            while queued and len(pending) < workers:
+                pending.add(executor.submit(run_attempt, snapshot, queued.pop(0)))
+            timeout = max(deadline - time.monotonic(), 0) if deadline is not None else None
+            completed, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not completed:
+                break
+            for future in completed:
+                result = future.result()
+                finished += 1
+                if better(result, best):
+                    best = result
+            report(best, finished)
+            if done(best):
+                break
+    except BrokenProcessPool:
+        _discard_executor(executor)
+
+    for future in pending:
+        future.cancel()
+    if best is None:
+        # Nothing came back in time: fall back to one local attempt
+        best = run_attempt(snapshot, seeds[0])
+        finished = 1
+    return dict(best, attempts=finished)
@@ -0,0 +1,76 @@
+from typing import Dict, Optional, Tuple
+
+
+class OccupancyIndex:
+    """Bitmask occupancy of teachers, rooms and sections over (day, period).
+
+    Every (day, period) cell maps to one bit, so availability checks and
+    bookings are a couple of integer operations regardless of how many
+    assignments have already been made. A block of consecutive periods is
+    one contiguous run of bits, so it is tested and booked the same way.
+    """
+
+    def __init__(self, periods_per_day: int):
+        self.periods_per_day = periods_per_day
+        self.teacher_masks: Dict[int, int] = {}
+        self.room_masks: Dict[int, int] = {}
+        self.section_masks: Dict[int, int] = {}
+        self.teacher_day_hours: Dict[Tuple[int, int], int] = {}
+
+    def bit(self, day: int, period: int) -> int:
+        return 1 << (day * self.periods_per_day + period)
+
+    def span(self, day: int, period: int, length: int = 1) -> int:
+        return ((1 << length) - 1) << (day * self.periods_per_day + period)
+
+    def is_free(self, teacher_id: int, room_id: Optional[int], section_id: Optional[int],
+                day: int, period: int, length: int = 1) -> bool:
+        span = self.span(day, period, length)
+        if self.teacher_masks.get(teacher_id, 0) & span:
+            return False
+        if room_id and self.room_masks.get(room_id, 0) & span:
+            return False
+        if section_id and self.section_masks.get(section_id, 0) & span:
+            return False
+        return True
+
+    def can_assign(self, teacher_id: int, room_id: Optional[int], section_id: Optional[int],
+                   day: int, period: int, max_hours_per_day: Optional[int], length: int = 1) -> bool:
+        if not self.is_free(teacher_id, room_id, section_id, day, period, length):
+            return False
+        if max_hours_per_day and self.teacher_day_hours.get((teacher_id, day), 0) + length > max_hours_per_day:
+            return False
+        return True
+
+    def assign(self, teacher_id: int, room_id: Optional[int], section_id: Optional[int],
+               day: int, period: int, length: int = 1):
+        span = self.span(day, period, length)
+        self.teacher_masks[teacher_id] = self.teacher_masks.get(teacher_id, 0) | span
+        if room_id:
+            self.room_masks[room_id] = self.room_masks.get(room_id, 0) | span
+        if section_id:
+            self.section_masks[section_id] = self.section_masks.get(section_id, 0) | span
+        key = (teacher_id, day)
+        self.teacher_day_hours[key] = self.teacher_day_hours.get(key, 0) + length
+
+    def reserve_room(self, room_id: int, day: int, period: int, length: int = 1):
+        self.room_masks[room_id] = self.room_masks.get(room_id, 0) | self.span(day, period, length)
+
+    def release(self, teacher_id: int, room_id: Optional[int], section_id: Optional[int],
+                day: int, period: int, length: int = 1):
+        span = ~self.span(day, period, length)
+        self.teacher_masks[teacher_id] = self.teacher_masks.get(teacher_id, 0) & span
+        if room_id:
+            self.room_masks[room_id] = self.room_masks.get(room_id, 0) & span
+        if section_id:
+            self.section_masks[section_id] = self.section_masks.get(section_id, 0) & span
+        key = (teacher_id, day)
+        self.teacher_day_hours[key] = max(self.teacher_day_hours.get(key, 0) - length, 0)
+
+    def copy(self) -> 'OccupancyIndex':
+        clone = OccupancyIndex(self.periods_per_day)
+        clone.teacher_masks = dict(self.teacher_masks)
+        clone.room_masks = dict(self.room_masks)
+        clone.section_masks = dict(self.section_masks)
+        clone.teacher_day_hours = dict(self.teacher_day_hours)
+        return clone
@@ -0,0 +1,134 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy.orm import Session
+from models.university import Course, Room, Section, Subject, Teacher
+from services.room_allocation import RoomIndex
+from services.timetable_search import SearchUnit
+
+
+class CourseRecord:
+    __slots__ = ('id', 'section_id', 'teacher_id', 'room_id', 'subject_name', 'subject_type', 'hours_per_week')
+
+    def __init__(self, id: int, section_id: int, teacher_id: int, room_id: Optional[int],
+                 subject_name: str, subject_type: Optional[str], hours_per_week: int):
+        self.id = id
+        self.section_id = section_id
+        self.teacher_id = teacher_id
+        self.room_id = room_id
+        self.subject_name = subject_name
+        self.subject_type = subject_type
+        self.hours_per_week = hours_per_week or 0
+
+
+class TeacherRecord:
+    __slots__ = ('id', 'name', 'max_hours_per_day')
+
+    def __init__(self, id: int, name: str, max_hours_per_day: Optional[int]):
+        self.id = id
+        self.name = name
+        self.max_hours_per_day = max_hours_per_day
+
+
+class SectionRecord:
+    __slots__ = ('id', 'name', 'strength')
+
+    def __init__(self, id: int, name: str, strength: Optional[int]):
+        self.id = id
+        self.name = name
+        self.strength = strength or 0
+
+
+class RoomRecord:
+    __slots__ = ('id', 'number', 'capacity', 'room_type')
+
+    def __init__(self, id: int, number: str, capacity: Optional[int], room_type: Optional[str]):
+        self.id = id
+        self.number = number
+        self.capacity = capacity
+        self.room_type = room_type
+
+
+def block_lengths(subject_type: Optional[str], hours: int) -> List[int]:
+    # Labs run as blocks of 2-3 consecutive periods, as evenly sized as possible
+    if subject_type != 'lab' or hours < 2:
+        return [1] * hours
+    count = -(-hours // 3)
+    size, larger = divmod(hours, count)
+    return [size + 1] * larger + [size] * (count - larger)
+
+
+class ProblemInstance:
+    """Plain-Python snapshot of one tenant's scheduling inputs.
+
+    Built once per request with column-only queries, so solvers never touch
+    SQLAlchemy instrumentation or trigger lazy loads; the ORM is used again
+    only to persist the result. Records are ``__slots__`` objects keyed by
+    integer id, and the whole instance pickles into worker processes.
+    """
+
+    __slots__ = ('courses', 'teachers', 'sections', 'rooms', '_room_index')
+
+    # Queries issued by from_db, whatever the number of sections or courses
+    ROUND_TRIPS = 4
+
+    def __init__(self, courses: Iterable[CourseRecord], teachers: Iterable[TeacherRecord],
+                 sections: Iterable[SectionRecord], rooms: Iterable[RoomRecord]):
+        self.courses: Dict[int, CourseRecord] = {course.id: course for course in courses}
+        self.teachers: Dict[int, TeacherRecord] = {teacher.id: teacher for teacher in teachers}
+        self.sections: Dict[int, SectionRecord] = {section.id: section for section in sections}
+        self.rooms: Dict[int, RoomRecord] = {room.id: room for room in rooms}
+        self._room_index: Optional[RoomIndex] = None
+
+    @classmethod
+    def from_db(cls, db: Session, user_id: int, section_ids: Optional[Iterable[int]] = None) -> 'ProblemInstance':
+        query = db.query(
+            Course.id, Course.section_id, Course.teacher_id, Course.room_id,
+            Subject.name, Subject.subject_type, Subject.hours_per_week
+        ).join(Subject, Course.subject_id == Subject.id).filter(Course.user_id == user_id)
+        if section_ids is not None:
+            query = query.filter(Course.section_id.in_(list(section_ids)))
+        courses = [CourseRecord(*row) for row in query.order_by(Course.id).all()]
+
+        teachers = db.query(Teacher.id, Teacher.name, Teacher.max_hours_per_day).filter(Teacher.user_id == user_id)
+        sections = db.query(Section.id, Section.name, Section.strength).filter(
+            Section.id.in_({course.section_id for course in courses})
+        )
+        rooms = db.query(Room.id, Room.number, Room.capacity, Room.room_type).filter(Room.user_id == user_id)
+
+        return cls(
+            courses,
+            [TeacherRecord(*row) for row in teachers.all()],
+            [SectionRecord(*row) for row in sections.all()],
+            [RoomRecord(*row) for row in rooms.all()]
+        )
+
+    def blocks(self, hours: Dict[int, int]) -> List[Tuple[CourseRecord, int]]:
+        # (course, periods) units for the given hours per course; those of one
+        # course stay adjacent so the search can break their symmetry
+        expanded = []
+        for course_id, count in hours.items():
+            course = self.courses[course_id]
+            expanded.extend((course, length) for length in block_lengths(course.subject_type, count))
+        return expanded
+
+    def all_blocks(self) -> List[Tuple[CourseRecord, int]]:
+        return self.blocks({course.id: course.hours_per_week for course in self.courses.values()})
+
+    def max_hours_per_day(self, teacher_id: int) -> Optional[int]:
+        teacher = self.teachers.get(teacher_id)
+        return teacher.max_hours_per_day if teacher else None
+
+    def units(self, blocks: List[Tuple[CourseRecord, int]]) -> List[SearchUnit]:
+        return [
+            SearchUnit(course.id, course.teacher_id, course.room_id, course.section_id,
+                       self.max_hours_per_day(course.teacher_id), length)
+            for course, length in blocks
+        ]
+
+    def room_index(self) -> RoomIndex:
+        if self._room_index is None:
+            self._room_index = RoomIndex((room.id, room.capacity, room.room_type) for room in self.rooms.values())
+        return self._room_index
+
+    def describe(self, course: CourseRecord) -> str:
+        section = self.sections.get(course.section_id)
+        return f"{course.subject_name} for {section.name if section else course.section_id}"
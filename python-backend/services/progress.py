@@ -0,0 +1,81 @@
+import os
+import threading
+from collections import OrderedDict, deque
+from time import monotonic
+from typing import Callable, Dict, List, Optional, Tuple
+
+PROGRESS_INTERVAL_MS = int(os.getenv('PROGRESS_INTERVAL_MS', '250'))
+
+
+class ProgressReporter:
+    """Throttled progress events from a solver loop.
+
+    Solvers call ``due()`` (one clock read) at their existing checkpoints
+    and only build an event when it returns True, so reporting costs next to
+    nothing between intervals. ``emit`` always delivers and restarts the
+    interval; use it directly for phase boundaries.
+    """
+
+    def __init__(self, sink: Callable[[Dict], None], interval_ms: int = PROGRESS_INTERVAL_MS):
+        self.sink = sink
+        self.interval = interval_ms / 1000.0
+        self.started = monotonic()
+        self.events = 0
+        self._next = 0.0
+
+    def due(self) -> bool:
+        return monotonic() >= self._next
+
+    def emit(self, phase: str, **fields):
+        now = monotonic()
+        self._next = now + self.interval
+        self.events += 1
+        self.sink(dict(fields, phase=phase, elapsed_ms=round((now - self.started) * 1000, 1)))
+
+
+class ProgressBroker:
+    """In-process fan-out of progress events, keyed by job id.
+
+    Producers run on worker threads and consumers poll from the event loop,
+    so each channel is a bounded, sequence-numbered buffer behind a lock.
+    Closed channels are kept for a while so late subscribers still see the
+    final events.
+    """
+
+    def __init__(self, max_events: int = 64, max_channels: int = 256):
+        self.max_events = max_events
+        self.max_channels = max_channels
+        self._channels: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def open(self, key: str):
+        with self._lock:
+            self._channels[key] = {'events': deque(maxlen=self.max_events), 'sequence': 0, 'closed': False}
+            self._channels.move_to_end(key)
+            while len(self._channels) > self.max_channels:
+                self._channels.popitem(last=False)
+
+    def publish(self, key: str, event: Dict):
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                return
+            channel['sequence'] += 1
+            channel['events'].append((channel['sequence'], event))
+
+    def close(self, key: str):
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is not None:
+                channel['closed'] = True
+
+    def read(self, key: str, after: int = 0) -> Optional[Tuple[List[Tuple[int, Dict]], bool]]:
+        # Events newer than sequence number ``after`` and whether the channel is closed
+        with self._lock:
+            channel = self._channels.get(key)
+            if channel is None:
+                return None
+            return [entry for entry in channel['events'] if entry[0] > after], channel['closed']
+
+
+progress_broker = ProgressBroker()
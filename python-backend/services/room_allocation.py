@@ -0,0 +1,127 @@
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.occupancy import OccupancyIndex
+
+DEFAULT_ROOM_TYPE = 'classroom'
+
+# Subject types that need a specific kind of room; everything else is taught in classrooms
+ROOM_TYPE_FOR_SUBJECT = {'lab': 'lab'}
+
+
+def room_type_for(subject_type: Optional[str]) -> str:
+    return ROOM_TYPE_FOR_SUBJECT.get(subject_type or '', DEFAULT_ROOM_TYPE)
+
+
+class RoomIndex:
+    """Rooms grouped by type, each group sorted by capacity.
+
+    ``first_fit`` bisects to the smallest room that holds a class, so the
+    tightest free room is found without scanning the rooms that are too
+    small. Types without any rooms fall back to the pool of all rooms.
+    """
+
+    def __init__(self, rooms: Iterable[Tuple[int, Optional[int], Optional[str]]]):
+        groups: Dict[Optional[str], List[Tuple[int, int]]] = {None: []}
+        for room_id, capacity, room_type in rooms:
+            entry = (capacity or 0, room_id)
+            groups.setdefault(room_type or DEFAULT_ROOM_TYPE, []).append(entry)
+            groups[None].append(entry)
+        self.capacities: Dict[Optional[str], List[int]] = {}
+        self.room_ids: Dict[Optional[str], List[int]] = {}
+        for room_type, entries in groups.items():
+            entries.sort()
+            self.capacities[room_type] = [capacity for capacity, _ in entries]
+            self.room_ids[room_type] = [room_id for _, room_id in entries]
+
+    def __len__(self) -> int:
+        return len(self.room_ids[None])
+
+    def first_fit(self, room_type: str, size: int) -> Tuple[List[int], int]:
+        # Rooms of the type in capacity order and the position of the first large enough
+        if room_type not in self.room_ids:
+            room_type = None
+        return self.room_ids[room_type], bisect_left(self.capacities[room_type], size)
+
+
+class RoomRequest:
+    """One placed course-hour, or block of ``length`` periods, that still needs a room."""
+
+    __slots__ = ('room_type', 'size', 'day', 'period', 'length')
+
+    def __init__(self, room_type: str, size: int, day: int, period: int, length: int = 1):
+        self.room_type = room_type
+        self.size = size
+        self.day = day
+        self.period = period
+        self.length = length
+
+
+def allocate_rooms(requests: List[RoomRequest], rooms: RoomIndex,
+                   occupancy: OccupancyIndex) -> List[Optional[int]]:
+    """Give every request the tightest free room that fits its type and size.
+
+    Blocks are housed first, each in the tightest room that is free for
+    its whole span. Single hours are grouped by (day, period): a lone
+    request takes the first free room from its bisect position, competing
+    requests in one period are resolved by maximum bipartite matching
+    (augmenting paths, larger classes first, candidates tightest first).
+    Assigned rooms are booked on ``occupancy``; requests that cannot be
+    served get None.
+    """
+    allocation: List[Optional[int]] = [None] * len(requests)
+    by_cell: Dict[Tuple[int, int], List[int]] = {}
+    blocks = []
+    for position, request in enumerate(requests):
+        if request.length > 1:
+            blocks.append(position)
+        else:
+            by_cell.setdefault((request.day, request.period), []).append(position)
+
+    blocks.sort(key=lambda position: -requests[position].size)
+    for position in blocks:
+        request = requests[position]
+        span = occupancy.span(request.day, request.period, request.length)
+        room_ids, start = rooms.first_fit(request.room_type, request.size)
+        for index in range(start, len(room_ids)):
+            if not occupancy.room_masks.get(room_ids[index], 0) & span:
+                allocation[position] = room_ids[index]
+                occupancy.reserve_room(room_ids[index], request.day, request.period, request.length)
+                break
+
+    for (day, period), positions in by_cell.items():
+        bit = occupancy.bit(day, period)
+
+        def free_rooms(request: RoomRequest) -> Iterable[int]:
+            room_ids, start = rooms.first_fit(request.room_type, request.size)
+            for index in range(start, len(room_ids)):
+                if not occupancy.room_masks.get(room_ids[index], 0) & bit:
+                    yield room_ids[index]
+
+        if len(positions) == 1:
+            room_id = next(iter(free_rooms(requests[positions[0]])), None)
+            if room_id is not None:
+                allocation[positions[0]] = room_id
+                occupancy.reserve_room(room_id, day, period)
+            continue
+
+        positions.sort(key=lambda position: -requests[position].size)
+        candidates = {position: list(free_rooms(requests[position])) for position in positions}
+        owner: Dict[int, int] = {}
+
+        def augment(position: int, seen: set) -> bool:
+            for room_id in candidates[position]:
+                if room_id in seen:
+                    continue
+                seen.add(room_id)
+                if room_id not in owner or augment(owner[room_id], seen):
+                    owner[room_id] = position
+                    return True
+            return False
+
+        for position in positions:
+            augment(position, set())
+        for room_id, position in owner.items():
+            allocation[position] = room_id
+            occupancy.reserve_room(room_id, day, period)
+
+    return allocation
@@ -0,0 +1,108 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from services.slot_template import SlotTemplate
+from services.timetable_search import SearchUnit
+
+# Every unplaced hour outweighs any amount of soft-constraint cost
+UNPLACED_PENALTY = 1000
+
+DEFAULT_WEIGHTS = {
+    'spread': 10,  # pairs of hours of one course on the same day
+    'gaps': 3,     # idle periods inside a section's day
+    'load': 1      # squared teacher hours per day, favours even loads
+}
+
+
+class PenaltyModel:
+    """Soft-constraint cost that is updated incrementally.
+
+    Only the (course, day), (section, day) and (teacher, day) terms touched
+    by a move are re-scored, so evaluating a neighbour is O(1) in the size
+    of the timetable.
+    """
+
+    def __init__(self, units: List[SearchUnit], template: SlotTemplate,
+                 assignment: Iterable[Tuple[int, int, int]], weights: Optional[Dict[str, int]] = None):
+        self.units = units
+        self.periods = template.periods_per_day
+        self.weights = dict(DEFAULT_WEIGHTS, **(weights or {}))
+        self.cells: List[int] = [-1] * len(units)
+        self.course_day: Dict[Tuple[int, int], int] = {}
+        self.section_day: Dict[Tuple[int, int], int] = {}
+        self.teacher_day: Dict[Tuple[int, int], int] = {}
+        for index, day, period in assignment:
+            self._add(index, day * self.periods + period)
+        self.cost = self._score(self.course_day, self.section_day, self.teacher_day)
+
+    def _add(self, index: int, cell: int):
+        unit = self.units[index]
+        day, period = divmod(cell, self.periods)
+        self.cells[index] = cell
+        key = (unit.course_id, day)
+        self.course_day[key] = self.course_day.get(key, 0) + 1
+        if unit.section_id:
+            key = (unit.section_id, day)
+            self.section_day[key] = self.section_day.get(key, 0) | (((1 << unit.length) - 1) << period)
+        key = (unit.teacher_id, day)
+        self.teacher_day[key] = self.teacher_day.get(key, 0) + unit.length
+
+    def _remove(self, index: int):
+        unit = self.units[index]
+        day, period = divmod(self.cells[index], self.periods)
+        self.cells[index] = -1
+        self.course_day[(unit.course_id, day)] -= 1
+        if unit.section_id:
+            self.section_day[(unit.section_id, day)] &= ~(((1 << unit.length) - 1) << period)
+        self.teacher_day[(unit.teacher_id, day)] -= unit.length
+
+    def _score(self, course_day: Dict, section_day: Dict, teacher_day: Dict) -> int:
+        spread = 0
+        for key in course_day:
+            count = self.course_day.get(key, 0)
+            spread += count * (count - 1) // 2
+        gaps = 0
+        for key in section_day:
+            mask = self.section_day.get(key, 0)
+            if mask:
+                span = mask.bit_length() - ((mask & -mask).bit_length() - 1)
+                gaps += span - bin(mask).count('1')
+        load = 0
+        for key in teacher_day:
+            count = self.teacher_day.get(key, 0)
+            load += count * count
+        return self.weights['spread'] * spread + self.weights['gaps'] * gaps + self.weights['load'] * load
+
+    def _touched(self, moves: List[Tuple[int, int]]) -> Tuple[Dict, Dict, Dict]:
+        course_day, section_day, teacher_day = {}, {}, {}
+        for index, cell in moves:
+            unit = self.units[index]
+            for day in (self.cells[index] // self.periods, cell // self.periods):
+                course_day[(unit.course_id, day)] = None
+                if unit.section_id:
+                    section_day[(unit.section_id, day)] = None
+                teacher_day[(unit.teacher_id, day)] = None
+        return course_day, section_day, teacher_day
+
+    def apply(self, moves: List[Tuple[int, int]]) -> Tuple[int, List[Tuple[int, int]]]:
+        """Apply ``(unit, new_cell)`` moves; return the cost delta and the undo list."""
+        touched = self._touched(moves)
+        before = self._score(*touched)
+        undo = [(index, self.cells[index]) for index, _ in moves]
+        for index, _ in moves:
+            self._remove(index)
+        for index, cell in moves:
+            self._add(index, cell)
+        delta = self._score(*touched) - before
+        self.cost += delta
+        return delta, undo
+
+    def revert(self, undo: List[Tuple[int, int]], delta: int):
+        for index, _ in undo:
+            self._remove(index)
+        for index, cell in undo:
+            self._add(index, cell)
+        self.cost -= delta
+
+
+def schedule_penalty(units: List[SearchUnit], assignment: List[Tuple[int, int, int]], unplaced: List[int],
+                     template: SlotTemplate) -> int:
+    return len(unplaced) * UNPLACED_PENALTY + PenaltyModel(units, template, assignment).cost
@@ -0,0 +1,156 @@
+from datetime import datetime, time
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+DEFAULT_WORKING_DAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday')
+
+
+class SlotTemplate:
+    """Compiled day grid shared by every generator.
+
+    Periods are dense integers ``0..periods_per_day - 1`` and days are indices
+    into ``working_days``; clock times are only materialized through the
+    formatting helpers at the API/persistence boundary.
+    """
+
+    def __init__(self, working_days: Tuple[str, ...], periods: Tuple[Tuple[int, int], ...],
+                 breaks: Tuple[Tuple[int, int, str], ...]):
+        self.working_days = working_days
+        self.num_days = len(working_days)
+        self.periods = periods
+        self.breaks = breaks
+        self.periods_per_day = len(periods)
+        self.day_index = {day: index for index, day in enumerate(working_days)}
+        self.period_by_start = {start: index for index, (start, _) in enumerate(periods)}
+
+        # Chronological layout of one day: ('period', index) / ('break', index)
+        layout = [(start, 'period', index) for index, (start, _) in enumerate(periods)]
+        layout += [(start, 'break', index) for index, (start, _, _) in enumerate(breaks)]
+        self.day_layout = tuple((kind, index) for _, kind, index in sorted(layout))
+
+        self.period_labels = tuple((format_minutes(start), format_minutes(end)) for start, end in periods)
+        self.period_clock = tuple((minutes_to_clock(start), minutes_to_clock(end)) for start, end in periods)
+        self.break_labels = tuple((format_minutes(start), format_minutes(end)) for start, end, _ in breaks)
+        self.break_clock = tuple((minutes_to_clock(start), minutes_to_clock(end)) for start, end, _ in breaks)
+
+        # Runs of periods not interrupted by a break (lunch); blocks stay inside one
+        sessions = []
+        current = []
+        for kind, index in self.day_layout:
+            if kind == 'break':
+                if current:
+                    sessions.append(tuple(current))
+                current = []
+            else:
+                current.append(index)
+        if current:
+            sessions.append(tuple(current))
+        self.sessions = tuple(sessions)
+        self._block_starts: Dict[int, int] = {}
+
+    def cell_for(self, day: str, start) -> Optional[Tuple[int, int]]:
+        # Map a stored (day, start time) back onto the grid; None if off-grid
+        day_index = self.day_index.get(day)
+        if day_index is None:
+            return None
+        period = self.period_by_start.get(parse_minutes(start, None))
+        if period is None:
+            return None
+        return day_index, period
+
+    def block_starts(self, length: int) -> int:
+        """Bitmask over one day's periods where a block of ``length`` periods may start."""
+        mask = self._block_starts.get(length)
+        if mask is None:
+            mask = 0
+            for session in self.sessions:
+                for offset in range(len(session) - length + 1):
+                    mask |= 1 << session[offset]
+            self._block_starts[length] = mask
+        return mask
+
+    def period_time_label(self, period: int) -> str:
+        start, end = self.period_labels[period]
+        return f"{start}-{end}"
+
+    def as_slot_dicts(self) -> List[Dict]:
+        return [
+            {
+                "slot_number": period + 1,
+                "start_time": start,
+                "end_time": end,
+                "duration": self.periods[period][1] - self.periods[period][0]
+            }
+            for period, (start, end) in enumerate(self.period_labels)
+        ]
+
+
+def format_minutes(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def minutes_to_clock(minutes: int) -> time:
+    return time((minutes // 60) % 24, minutes % 60)
+
+
+def parse_minutes(value, default: Optional[str] = '09:00') -> Optional[int]:
+    if isinstance(value, time):
+        return value.hour * 60 + value.minute
+    try:
+        parsed = datetime.strptime(value, '%H:%M')
+    except (TypeError, ValueError):
+        if default is None:
+            return None
+        parsed = datetime.strptime(default, '%H:%M')
+    return parsed.hour * 60 + parsed.minute
+
+
+@lru_cache(maxsize=128)
+def compile_slot_template(start: int, end: int, period_duration: int, break_duration: int,
+                          lunch_start: Optional[int], lunch_duration: int,
+                          working_days: Tuple[str, ...]) -> SlotTemplate:
+    periods = []
+    breaks = []
+    current = start
+
+    while period_duration > 0 and current < end:
+        slot_end = current + period_duration
+
+        # Lunch starts inside (or at the edge of) this period
+        if lunch_start is not None and current <= lunch_start <= slot_end:
+            lunch_end = lunch_start + lunch_duration
+            breaks.append((lunch_start, lunch_end, 'lunch'))
+            current = lunch_end + break_duration
+            lunch_start = None
+            continue
+
+        if slot_end <= end:
+            periods.append((current, slot_end))
+
+        current = slot_end + break_duration
+
+    return SlotTemplate(tuple(working_days), tuple(periods), tuple(breaks))
+
+
+def slot_template_from_config(config: Dict) -> SlotTemplate:
+    return compile_slot_template(
+        parse_minutes(config.get('start_time', '09:00')),
+        parse_minutes(config.get('end_time', '16:00'), '16:00'),
+        config.get('period_duration', 50),
+        config.get('break_duration', 10),
+        parse_minutes(config.get('lunch_start', '12:30'), '12:30'),
+        config.get('lunch_duration', 45),
+        tuple(config.get('working_days') or DEFAULT_WORKING_DAYS)
+    )
+
+
+def slot_template_for_timetable(timetable, working_days: List[str]) -> SlotTemplate:
+    return compile_slot_template(
+        parse_minutes(timetable.start_time),
+        parse_minutes(timetable.end_time),
+        timetable.period_duration,
+        timetable.break_duration,
+        parse_minutes(timetable.lunch_start) if timetable.lunch_start else None,
+        timetable.lunch_duration or 0,
+        tuple(working_days)
+    )
@@ -0,0 +1,62 @@
+from typing import Dict, List, Optional
+from services.conflict_analysis import GridEncoder
+from services.occupancy import OccupancyIndex
+from services.slot_template import SlotTemplate
+from services.solver_backends import get_solver
+from services.timetable_search import SearchUnit
+
+
+def course_units(courses: List[Dict]) -> List[SearchUnit]:
+    # One weekly period per course row; teachers and rooms are only known by
+    # name here, so they are interned to ids. A course without a teacher gets
+    # an id of its own so it never clashes on the teacher check.
+    teachers = GridEncoder()
+    rooms = GridEncoder()
+    units = []
+    for index, course in enumerate(courses):
+        teacher = teachers.encode(course.get('teacher_name', course.get('teacher', '')))
+        room = rooms.encode(course.get('room_number', course.get('room', '')))
+        units.append(SearchUnit(
+            index, teacher if teacher >= 0 else -(index + 1), room + 1 if room >= 0 else None, 1, None
+        ))
+    return units
+
+
+def generate_smart_timetable(courses, template: SlotTemplate, solver: str = 'fast',
+                             config: Optional[Dict] = None, stats: Optional[Dict] = None):
+    timetable = {}
+
+    # Initialize timetable structure
+    for day in template.working_days:
+        timetable[day] = {}
+        for period in range(template.periods_per_day):
+            timetable[day][period + 1] = {
+                "time": template.period_time_label(period),
+                "subject": None,
+                "teacher": None,
+                "room": None,
+                "type": "free"
+            }
+
+    # Distribute courses across days and time slots with the chosen backend
+    units = course_units(courses)
+    result = get_solver(solver).solve(units, template, OccupancyIndex(template.periods_per_day), config or {})
+    if stats is not None:
+        stats.update(result.stats, solver=solver, placed=len(result.assignment or []), total=len(units))
+    if result.assignment is None:
+        # The backend has nothing to offer (backtracking without a partial); callers report it
+        return None
+
+    for index, day_index, period in result.assignment or []:
+        course = courses[index]
+        timetable[template.working_days[day_index]][period + 1] = {
+            "time": template.period_time_label(period),
+            "subject": course.get('subject_name', course.get('name', 'Unknown')),
+            "subject_code": course.get('subject_code', 'N/A'),
+            "teacher": course.get('teacher_name', course.get('teacher', 'TBA')),
+            "room": f"{course.get('room_number', course.get('room', 'TBA'))} - {course.get('building', '')}".strip(' - '),
+            "type": "class",
+            "course_id": course.get('id')
+        }
+
+    return timetable
@@ -0,0 +1,272 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class SolutionCache:
+    """Generated timetables keyed by a fingerprint of everything that shaped them.
+
+    Entries live in an in-process LRU and, when ``disk_path`` is set, in a
+    SQLite table that survives restarts. Each entry carries tags naming the
+    entities it was built from (``section:<id>``, ``teachers``, ...);
+    ``invalidate(tag)`` drops every entry that depends on a written entity.
+    Aliases map a cheap request key to a fingerprint so a repeated request
+    can be answered without re-reading its inputs.
+
+    The LRU and aliases are per process, so with several workers an
+    invalidation in one has to reach the others. Each tag has a version in
+    the ``solution_cache_versions`` table at ``versions_path``, shared by
+    every process using that file: ``invalidate`` bumps it, entries and
+    aliases remember the versions of their tags when stored, and a lookup
+    whose versions have moved on is a miss. The table is created on first
+    use and read over one connection kept open per process. Without
+    ``versions_path`` the versions are kept in memory, which is only correct
+    for a single worker.
+    """
+
+    def __init__(self, max_entries: int = 256, disk_path: Optional[str] = None,
+                 versions_path: Optional[str] = None):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self.versions_path = versions_path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._aliases: Dict[str, tuple] = {}
+        self._local_versions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._versions_lock = threading.Lock()
+        self._versions_db: Optional[sqlite3.Connection] = None
+        self._versions_pid: Optional[int] = None
+        if disk_path:
+            self._init_disk()
+
+    @staticmethod
+    def fingerprint(*parts) -> str:
+        payload = json.dumps(parts, sort_keys=True, default=str, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def versions(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        # Current version of each tag; None when they cannot be read
+        tags = sorted(set(tags))
+        if not self.versions_path:
+            with self._lock:
+                return {tag: self._local_versions.get(tag, 0) for tag in tags}
+        if not tags:
+            return {}
+        rows = self._versions_execute(
+            f"SELECT tag, version FROM solution_cache_versions WHERE tag IN ({', '.join('?' * len(tags))})",
+            tags
+        )
+        if rows is None:
+            return None
+        current = dict(rows)
+        return {tag: current.get(tag, 0) for tag in tags}
+
+    def get(self, fingerprint: str) -> Optional[Dict]:
+        return self._get(fingerprint)
+
+    def _get(self, fingerprint: str, known: Optional[Dict[str, int]] = None) -> Optional[Dict]:
+        # known: versions already read for this lookup, e.g. by get_alias
+        with self._lock:
+            entry = self._entries.get(fingerprint)
+        if entry is not None:
+            if known is not None and entry[1] <= known.keys():
+                current = {tag: known[tag] for tag in entry[1]}
+            else:
+                current = self.versions(entry[1])
+            if current == entry[2]:
+                with self._lock:
+                    if fingerprint in self._entries:
+                        self._entries.move_to_end(fingerprint)
+                    self.hits += 1
+                return entry[0]
+            # Another worker invalidated one of its tags since it was stored
+            with self._lock:
+                if self._entries.get(fingerprint) is entry:
+                    del self._entries[fingerprint]
+
+        # Every worker's invalidate deletes matching disk rows, so one found there is current
+        entry = self._disk_get(fingerprint)
+        versions = self.versions(entry[1]) if entry is not None else None
+        with self._lock:
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            if versions is not None:
+                self._store(fingerprint, entry[0], entry[1], versions)
+            return entry[0]
+
+    def put(self, fingerprint: str, result: Dict, tags: Iterable[str] = (),
+            versions: Optional[Dict[str, int]] = None):
+        # Callers pass the versions read before loading their inputs, so an
+        # invalidation that lands while the result is computed is not lost
+        tags = frozenset(tags)
+        versions = versions if versions is not None else self.versions(tags)
+        if versions is not None:
+            with self._lock:
+                self._store(fingerprint, result, tags, versions)
+        self._disk_put(fingerprint, result, tags)
+
+    def get_alias(self, alias: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._aliases.get(alias)
+        if entry is None:
+            return None
+        current = self.versions(entry[1])
+        if current != entry[2]:
+            with self._lock:
+                if self._aliases.get(alias) is entry:
+                    del self._aliases[alias]
+            return None
+        return self._get(entry[0], current)
+
+    def set_alias(self, alias: str, fingerprint: str, tags: Iterable[str] = (),
+                  versions: Optional[Dict[str, int]] = None):
+        tags = frozenset(tags)
+        versions = versions if versions is not None else self.versions(tags)
+        if versions is None:
+            return
+        with self._lock:
+            self._aliases[alias] = (fingerprint, tags, versions)
+            while len(self._aliases) > self.max_entries:
+                self._aliases.pop(next(iter(self._aliases)))
+
+    def invalidate(self, tag: str):
+        self._bump_version(tag)
+        with self._lock:
+            for key in [key for key, (_, tags, _) in self._entries.items() if tag in tags]:
+                del self._entries[key]
+            for key in [key for key, (_, tags, _) in self._aliases.items() if tag in tags]:
+                del self._aliases[key]
+        self._disk_invalidate(tag)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._aliases.clear()
+        if self.disk_path:
+            self._disk_execute("DELETE FROM solution_cache")
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'aliases': len(self._aliases),
+                'hits': self.hits,
+                'misses': self.misses,
+                'disk': bool(self.disk_path)
+            }
+
+    def _store(self, fingerprint: str, result: Dict, tags: frozenset, versions: Dict[str, int]):
+        self._entries[fingerprint] = (result, tags, versions)
+        self._entries.move_to_end(fingerprint)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    # On-disk tier
+
+    def _init_disk(self):
+        self._disk_execute('''
+            CREATE TABLE IF NOT EXISTS solution_cache (
+                fingerprint TEXT PRIMARY KEY,
+                tags TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+
+    def _disk_execute(self, query: str, params=()):
+        try:
+            connection = sqlite3.connect(self.disk_path, timeout=5)
+            try:
+                rows = connection.execute(query, params).fetchall()
+                connection.commit()
+                return rows
+            finally:
+                connection.close()
+        except Exception as e:
+            logger.error(f"Solution cache disk error: {e}")
+            return None
+
+    def _disk_get(self, fingerprint: str) -> Optional[tuple]:
+        if not self.disk_path:
+            return None
+        rows = self._disk_execute(
+            "SELECT payload, tags FROM solution_cache WHERE fingerprint = ?", (fingerprint,)
+        )
+        if not rows:
+            return None
+        payload, tags = rows[0]
+        return json.loads(payload), frozenset(tag for tag in tags.split(',') if tag)
+
+    def _disk_put(self, fingerprint: str, result: Dict, tags: frozenset):
+        if not self.disk_path:
+            return
+        self._disk_execute(
+            "INSERT OR REPLACE INTO solution_cache (fingerprint, tags, payload) VALUES (?, ?, ?)",
+            (fingerprint, ',' + ','.join(sorted(tags)) + ',', json.dumps(result, default=str))
+        )
+
+    def _disk_invalidate(self, tag: str):
+        if not self.disk_path:
+            return
+        self._disk_execute("DELETE FROM solution_cache WHERE tags LIKE ?", (f"%,{tag},%",))
+
+    # Tag versions shared between workers
+
+    def _versions_connection(self) -> sqlite3.Connection:
+        # Every lookup reads versions, so the connection is kept rather than
+        # opened per call; a forked worker opens its own
+        if self._versions_db is None or self._versions_pid != os.getpid():
+            connection = sqlite3.connect(self.versions_path, timeout=5, check_same_thread=False)
+            connection.execute('''
+                CREATE TABLE IF NOT EXISTS solution_cache_versions (
+                    tag TEXT PRIMARY KEY,
+                    version INTEGER NOT NULL
+                )
+            ''')
+            connection.commit()
+            self._versions_db, self._versions_pid = connection, os.getpid()
+        return self._versions_db
+
+    def _versions_execute(self, query: str, params=()):
+        with self._versions_lock:
+            try:
+                connection = self._versions_connection()
+                rows = connection.execute(query, params).fetchall()
+                if connection.in_transaction:
+                    connection.commit()
+                return rows
+            except Exception as e:
+                logger.error(f"Solution cache versions error: {e}")
+                if self._versions_db is not None and self._versions_pid == os.getpid():
+                    self._versions_db.close()
+                self._versions_db = None
+                return None
+
+    def _bump_version(self, tag: str):
+        if not self.versions_path:
+            with self._lock:
+                self._local_versions[tag] = self._local_versions.get(tag, 0) + 1
+            return
+        self._versions_execute(
+            "INSERT INTO solution_cache_versions (tag, version) VALUES (?, 1) "
+            "ON CONFLICT(tag) DO UPDATE SET version = version + 1",
+            (tag,)
+        )
+
+
+solution_cache = SolutionCache(
+    max_entries=int(os.getenv('SOLUTION_CACHE_SIZE', '256')),
+    disk_path=os.getenv('SOLUTION_CACHE_PATH') or None,
+    versions_path=os.getenv('SOLUTION_CACHE_PATH') or os.getenv('DB_PATH', 'timetable.db')
+)
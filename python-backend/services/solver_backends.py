@@ -0,0 +1,193 @@
+import random
+from typing import Dict, List, Optional, Tuple
+from services.greedy_solver import greedy_assign
+from services.multistart import ProblemSnapshot, run_multistart
+from services.occupancy import OccupancyIndex
+from services.progress import ProgressReporter
+from services.slot_template import SlotTemplate
+from services.timetable_search import BacktrackingSolver, SearchUnit
+
+# Without a time_limit_ms the exact backend still stops after this long
+EXACT_TIME_LIMIT_MS = 10000
+
+
+class SolverResult:
+    """What a backend returns: ``(unit_index, day, period)`` placements,
+    the indexes it could not place, and backend-specific statistics.
+
+    ``assignment`` is None when the backend found no complete assignment
+    and has no partial one to offer (not running in anytime mode).
+    """
+
+    __slots__ = ('assignment', 'unplaced', 'stats')
+
+    def __init__(self, assignment: Optional[List[Tuple[int, int, int]]], unplaced: List[int], stats: Dict):
+        self.assignment = assignment
+        self.unplaced = unplaced
+        self.stats = stats
+
+
+class SolverBackend:
+    """One way of placing units on the slot grid.
+
+    Backends receive the compiled units, the slot template and whatever is
+    already booked; they never modify ``occupancy``. ``config`` carries the
+    request options (seed, time_limit_ms, quality_target, ...), each backend
+    reading the ones it understands.
+
+    ``partial_results`` and ``on_failure`` tell clients, through the
+    ``/timetables/solvers`` listing, what a request gets back when not every
+    course fits.
+    """
+
+    name = ''
+    description = ''
+    partial_results = True
+    on_failure = 'returns the timetable with the courses it could place, marked complete: false'
+
+    def solve(self, units: List[SearchUnit], template: SlotTemplate, occupancy: OccupancyIndex,
+              config: Dict, progress: Optional[ProgressReporter] = None) -> SolverResult:
+        raise NotImplementedError
+
+
+def _unplaced(units: List[SearchUnit], assignment: List[Tuple[int, int, int]]) -> List[int]:
+    placed = {index for index, _, _ in assignment}
+    return [index for index in range(len(units)) if index not in placed]
+
+
+class FastBackend(SolverBackend):
+    """Sequential first fit: units in order, cells in row-major order.
+
+    Each unit takes the first feasible cell at or after the previous
+    placement of its section, so every section's grid is scanned once. This
+    is what the public generator has always done; cheapest, but it packs
+    the start of the week.
+    """
+
+    name = 'fast'
+    description = 'single sequential pass, lowest latency'
+
+    def solve(self, units, template, occupancy, config, progress=None):
+        occupancy = occupancy.copy()
+        periods = template.periods_per_day
+        cell_count = template.num_days * periods
+        assignment = []
+        unplaced = []
+        cursors: Dict[Optional[int], int] = {}
+        tried = 0
+        for index, unit in enumerate(units):
+            starts = template.block_starts(unit.length)
+            cell = cursors.get(unit.section_id, 0)
+            while cell < cell_count:
+                day, period = divmod(cell, periods)
+                if starts >> period & 1:
+                    tried += 1
+                    if occupancy.can_assign(unit.teacher_id, unit.room_id, unit.section_id,
+                                            day, period, unit.max_hours_per_day, unit.length):
+                        occupancy.assign(unit.teacher_id, unit.room_id, unit.section_id, day, period, unit.length)
+                        assignment.append((index, day, period))
+                        cursors[unit.section_id] = cell + 1
+                        break
+                cell += 1
+            else:
+                unplaced.append(index)
+        return SolverResult(assignment, unplaced, {
+            'candidates_tried': tried, 'failed_checks': tried - len(assignment)
+        })
+
+
+class GreedyBackend(SolverBackend):
+    name = 'greedy'
+    description = 'randomized first fit, spreads courses across the week'
+
+    def solve(self, units, template, occupancy, config, progress=None):
+        counters = {}
+        assignment, unplaced = greedy_assign(
+            units, template, occupancy, random.Random(config.get('seed')), progress, counters
+        )
+        return SolverResult(assignment, unplaced, counters)
+
+
+class BacktrackingBackend(SolverBackend):
+    name = 'backtracking'
+    description = 'constraint search with restarts, conflict-free when a solution is found in budget'
+    partial_results = False
+    on_failure = ('fails with 400 and the reason; only when time_limit_ms runs out first does it return '
+                  'the deepest partial timetable it reached, with complete: false')
+
+    def create_search(self, template: SlotTemplate, config: Dict,
+                      progress: Optional[ProgressReporter]) -> BacktrackingSolver:
+        return BacktrackingSolver(
+            template, max_backtracks=config.get('max_backtracks', 20000), seed=config.get('seed') or 0,
+            time_limit_ms=config.get('time_limit_ms'), progress=progress
+        )
+
+    def solve(self, units, template, occupancy, config, progress=None):
+        search = self.create_search(template, config, progress)
+        assignment = search.solve(units, occupancy)
+        stats = {
+            'nodes': search.nodes, 'backtracks': search.backtracks, 'timed_out': search.timed_out,
+            'candidates_tried': search.nodes, 'failed_checks': search.rejected
+        }
+        if assignment is None and config.get('time_limit_ms') and search.timed_out and search.best_partial:
+            # Anytime mode: the budget ran out first, keep the deepest partial
+            # assignment reached. A proved infeasibility has nothing to offer.
+            assignment = search.best_partial
+        if assignment is None:
+            stats['exhausted'] = search.exhausted
+            return SolverResult(None, list(range(len(units))), stats)
+        return SolverResult(assignment, _unplaced(units, assignment), stats)
+
+
+class ExactBackend(BacktrackingBackend):
+    """One complete depth-first search without restarts or a backtrack cap.
+
+    Either finds a conflict-free timetable or, when the tree is exhausted,
+    proves there is none; only the wall clock bounds it.
+    """
+
+    name = 'exact'
+    description = 'complete search, proves infeasibility; slowest'
+
+    def create_search(self, template, config, progress):
+        unbounded = 1 << 62
+        return BacktrackingSolver(
+            template, max_backtracks=unbounded, restart_backtracks=unbounded, seed=config.get('seed') or 0,
+            time_limit_ms=config.get('time_limit_ms') or EXACT_TIME_LIMIT_MS, progress=progress
+        )
+
+
+class MultistartBackend(SolverBackend):
+    name = 'multistart'
+    description = 'parallel seeded greedy attempts, best penalty wins'
+
+    def solve(self, units, template, occupancy, config, progress=None):
+        best = run_multistart(
+            ProblemSnapshot(units, template, occupancy),
+            attempts=config.get('attempts', 16),
+            workers=config.get('workers'),
+            seed=config.get('seed'),
+            time_limit_ms=config.get('time_limit_ms'),
+            target_penalty=config.get('quality_target'),
+            progress=progress
+        )
+        return SolverResult(best['assignment'], best['unplaced'], {'attempts': best['attempts']})
+
+
+SOLVER_BACKENDS: Dict[str, SolverBackend] = {}
+
+
+def register_solver(backend: SolverBackend):
+    SOLVER_BACKENDS[backend.name] = backend
+
+
+def get_solver(name: str) -> Optional[SolverBackend]:
+    return SOLVER_BACKENDS.get(name)
+
+
+def solver_names() -> List[str]:
+    return list(SOLVER_BACKENDS)
+
+
+for _backend in (FastBackend(), GreedyBackend(), BacktrackingBackend(), ExactBackend(), MultistartBackend()):
+    register_solver(_backend)
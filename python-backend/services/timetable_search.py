@@ -0,0 +1,344 @@
+import random
+import time
+from typing import Dict, List, Optional, Tuple
+from services.occupancy import OccupancyIndex
+from services.progress import ProgressReporter
+from services.slot_template import SlotTemplate
+
+
+class SearchUnit:
+    """One course-hour, or a block of ``length`` consecutive periods, to place on the grid."""
+
+    __slots__ = ('course_id', 'teacher_id', 'room_id', 'section_id', 'max_hours_per_day', 'length')
+
+    def __init__(self, course_id: int, teacher_id: int, room_id: Optional[int],
+                 section_id: Optional[int], max_hours_per_day: Optional[int], length: int = 1):
+        self.course_id = course_id
+        self.teacher_id = teacher_id
+        self.room_id = room_id
+        self.section_id = section_id
+        self.max_hours_per_day = max_hours_per_day
+        self.length = length
+
+
+class _Frame:
+    __slots__ = ('unit', 'candidates', 'position', 'trail_mark', 'active')
+
+    def __init__(self, unit: int, candidates: List[int], trail_mark: int):
+        self.unit = unit
+        self.candidates = candidates
+        self.position = 0
+        self.trail_mark = trail_mark
+        self.active = False
+
+
+class BacktrackingSolver:
+    """Complete search over (day, period) cells with forward checking.
+
+    Variables are picked by minimum remaining values, ties broken by degree
+    (how many other units share a teacher, room or section). Domains are
+    bitmasks over the template cells, so pruning a neighbour is one AND.
+    Hours of the same course are interchangeable, so they are placed in
+    increasing cell order to avoid exploring symmetric assignments.
+    A block unit's domain holds the cells where it may start; placing it
+    removes every start of a neighbour whose span would overlap.
+
+    Each run is cut off after a growing number of backtracks and restarted
+    with seeded tie-break noise, all within ``max_backtracks`` in total, so
+    one bad early decision does not consume the whole budget.
+
+    With ``time_limit_ms`` the search also stops on the wall clock; the
+    deepest partial assignment seen is kept in ``best_partial`` either way.
+    """
+
+    def __init__(self, template: SlotTemplate, max_backtracks: int = 20000, restart_backtracks: int = 200,
+                 restart_growth: float = 1.5, seed: int = 0, time_limit_ms: Optional[float] = None,
+                 progress: Optional[ProgressReporter] = None):
+        self.template = template
+        self.max_backtracks = max_backtracks
+        self.restart_backtracks = restart_backtracks
+        self.restart_growth = restart_growth
+        self.seed = seed
+        self.time_limit_ms = time_limit_ms
+        self.progress = progress
+        self.nodes = 0
+        self.backtracks = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.timed_out = False
+        self.best_partial: List[Tuple[int, int, int]] = []
+        self._exhausted = False
+        self._deadline = None
+
+    @property
+    def exhausted(self) -> bool:
+        # The whole tree was explored without a solution: none exists
+        return self._exhausted
+
+    def solve(self, units: List[SearchUnit],
+              occupancy: Optional[OccupancyIndex] = None) -> Optional[List[Tuple[int, int, int]]]:
+        periods = self.template.periods_per_day
+        cell_count = self.template.num_days * periods
+        day_mask = (1 << periods) - 1
+        occupancy = occupancy or OccupancyIndex(periods)
+        self.nodes = 0
+        self.backtracks = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.timed_out = False
+        self.best_partial = []
+        self._exhausted = False
+        self._deadline = time.monotonic() + self.time_limit_ms / 1000.0 if self.time_limit_ms else None
+
+        if not units:
+            return []
+        if cell_count == 0:
+            self._exhausted = True
+            return None
+
+        full = (1 << cell_count) - 1
+        count = len(units)
+
+        # Static constraint graph
+        by_teacher: Dict[int, List[int]] = {}
+        by_room: Dict[int, List[int]] = {}
+        by_section: Dict[int, List[int]] = {}
+        next_sibling = [-1] * count
+        has_previous = [False] * count
+        for index, unit in enumerate(units):
+            by_teacher.setdefault(unit.teacher_id, []).append(index)
+            if unit.room_id:
+                by_room.setdefault(unit.room_id, []).append(index)
+            if unit.section_id:
+                by_section.setdefault(unit.section_id, []).append(index)
+            if index and units[index - 1].course_id == unit.course_id and units[index - 1].length == unit.length:
+                next_sibling[index - 1] = index
+                has_previous[index] = True
+
+        neighbours = []
+        for index, unit in enumerate(units):
+            linked = set(by_teacher[unit.teacher_id])
+            if unit.room_id:
+                linked.update(by_room[unit.room_id])
+            if unit.section_id:
+                linked.update(by_section[unit.section_id])
+            linked.discard(index)
+            neighbours.append(tuple(linked))
+        degree = [len(linked) for linked in neighbours]
+
+        # Cells where a block of each length may start without crossing a break
+        starts = {}
+        for unit in units:
+            if unit.length not in starts:
+                day_starts = self.template.block_starts(unit.length)
+                starts[unit.length] = sum(day_starts << (day * periods) for day in range(self.template.num_days))
+
+        # Initial domains respect whatever is already booked
+        domains = []
+        for unit in units:
+            free = full & ~occupancy.teacher_masks.get(unit.teacher_id, 0)
+            if unit.room_id:
+                free &= ~occupancy.room_masks.get(unit.room_id, 0)
+            if unit.section_id:
+                free &= ~occupancy.section_masks.get(unit.section_id, 0)
+            # A start is usable only when the whole span behind it is free
+            domain = free & starts[unit.length]
+            for offset in range(1, unit.length):
+                domain &= free >> offset
+            if unit.max_hours_per_day:
+                for day in range(self.template.num_days):
+                    hours = occupancy.teacher_day_hours.get((unit.teacher_id, day), 0)
+                    if hours + unit.length > unit.max_hours_per_day:
+                        domain &= ~(day_mask << (day * periods))
+            domains.append(domain)
+
+        # A resource with more hours than free cells can never be satisfied
+        for group in list(by_teacher.values()) + list(by_room.values()) + list(by_section.values()):
+            free = 0
+            for index in group:
+                free |= domains[index]
+            if len(group) > bin(free).count('1'):
+                self._exhausted = True
+                return None
+
+        initial_domains = domains
+        rng = random.Random(self.seed)
+        cutoff = self.restart_backtracks
+        run = 0
+
+        while self.backtracks < self.max_backtracks:
+            # The first run is fully deterministic; restarts perturb tie-breaks
+            if run:
+                unit_rank = list(range(count))
+                rng.shuffle(unit_rank)
+                cell_rank = [rng.random() for _ in range(cell_count)]
+            else:
+                unit_rank = list(range(count))
+                cell_rank = [cell % periods for cell in range(cell_count)]
+            limit = min(self.backtracks + cutoff, self.max_backtracks)
+
+            result = self._run(units, list(initial_domains), dict(occupancy.teacher_day_hours),
+                               neighbours, degree, by_teacher, by_room, by_section, next_sibling,
+                               has_previous, unit_rank, cell_rank, limit)
+            if result is not None:
+                return result
+            if self._exhausted or self.timed_out:
+                return None
+            run += 1
+            self.restarts = run
+            cutoff = int(cutoff * self.restart_growth)
+
+        return None
+
+    def _run(self, units, domains, teacher_day_hours, neighbours, degree, by_teacher, by_room,
+             by_section, next_sibling, has_previous, unit_rank, cell_rank, limit):
+        periods = self.template.periods_per_day
+        cell_count = self.template.num_days * periods
+        day_mask = (1 << periods) - 1
+        count = len(units)
+        assigned = [-1] * count
+        unassigned = set(range(count))
+        trail: List[Tuple[int, int]] = []
+        longest = {teacher_id: max(units[index].length for index in group) for teacher_id, group in by_teacher.items()}
+        self._exhausted = False
+
+        def restrict(target: int, mask: int) -> bool:
+            current = domains[target]
+            reduced = current & mask
+            if reduced != current:
+                trail.append((target, current))
+                domains[target] = reduced
+            return reduced != 0
+
+        def overlapping(cell: int, length: int, other_length: int) -> int:
+            # Starts of an ``other_length`` block that would overlap [cell, cell + length)
+            low = cell - other_length + 1
+            width = length + other_length - 1
+            if low < 0:
+                width += low
+                low = 0
+            return ((1 << width) - 1) << low
+
+        def place(index: int, cell: int) -> bool:
+            unit = units[index]
+            assigned[index] = cell
+            unassigned.discard(index)
+            ok = True
+            for other in neighbours[index]:
+                if assigned[other] < 0 and not restrict(other, ~overlapping(cell, unit.length, units[other].length)):
+                    ok = False
+            if ok and next_sibling[index] >= 0:
+                ok = restrict(next_sibling[index], ~((1 << (cell + 1)) - 1))
+            day = cell // periods
+            key = (unit.teacher_id, day)
+            teacher_day_hours[key] = teacher_day_hours.get(key, 0) + unit.length
+            if ok and unit.max_hours_per_day and teacher_day_hours[key] + longest[unit.teacher_id] > unit.max_hours_per_day:
+                blocked = ~(day_mask << (day * periods))
+                for other in by_teacher[unit.teacher_id]:
+                    if (assigned[other] < 0 and teacher_day_hours[key] + units[other].length > unit.max_hours_per_day
+                            and not restrict(other, blocked)):
+                        ok = False
+            if ok:
+                ok = has_room(by_teacher[unit.teacher_id])
+            if ok and unit.room_id:
+                ok = has_room(by_room[unit.room_id])
+            if ok and unit.section_id:
+                ok = has_room(by_section[unit.section_id])
+            return ok
+
+        def has_room(group: List[int]) -> bool:
+            # Pigeonhole: the pending units of a resource need as many distinct start cells
+            pending = 0
+            free = 0
+            for other in group:
+                if assigned[other] < 0:
+                    pending += 1
+                    free |= domains[other]
+            return pending <= bin(free).count('1')
+
+        def unplace(index: int, trail_mark: int):
+            cell = assigned[index]
+            unit = units[index]
+            key = (unit.teacher_id, cell // periods)
+            teacher_day_hours[key] -= unit.length
+            assigned[index] = -1
+            unassigned.add(index)
+            while len(trail) > trail_mark:
+                target, previous = trail.pop()
+                domains[target] = previous
+
+        def select() -> int:
+            best = -1
+            best_key = None
+            for index in unassigned:
+                if has_previous[index] and assigned[index - 1] < 0:
+                    continue
+                key = (bin(domains[index]).count('1'), -degree[index], unit_rank[index])
+                if best_key is None or key < best_key:
+                    best, best_key = index, key
+            return best
+
+        def candidates(index: int) -> List[int]:
+            # Prefer days where this course has the fewest hours so far
+            course_id = units[index].course_id
+            per_day = [0] * self.template.num_days
+            for other in neighbours[index]:
+                if assigned[other] >= 0 and units[other].course_id == course_id:
+                    per_day[assigned[other] // periods] += 1
+            domain = domains[index]
+            cells = [cell for cell in range(cell_count) if domain >> cell & 1]
+            cells.sort(key=lambda cell: (per_day[cell // periods], cell_rank[cell], cell))
+            return cells
+
+        def remember():
+            # Keep the deepest partial assignment reached so far
+            if count - len(unassigned) > len(self.best_partial):
+                self.best_partial = [
+                    (index, cell // periods, cell % periods) for index, cell in enumerate(assigned) if cell >= 0
+                ]
+
+        stack: List[_Frame] = []
+        first = select()
+        stack.append(_Frame(first, candidates(first), len(trail)))
+
+        while stack:
+            frame = stack[-1]
+            if frame.active:
+                unplace(frame.unit, frame.trail_mark)
+                frame.active = False
+
+            if frame.position >= len(frame.candidates):
+                remember()
+                stack.pop()
+                self.backtracks += 1
+                if self.backtracks >= limit:
+                    return None
+                continue
+
+            if self.nodes % 256 == 0:
+                if self._deadline is not None and time.monotonic() >= self._deadline:
+                    remember()
+                    self.timed_out = True
+                    return None
+                if self.progress is not None and self.progress.due():
+                    best = max(count - len(unassigned), len(self.best_partial))
+                    self.progress.emit('backtracking', placed=count - len(unassigned), total=count,
+                                       conflicts=count - best, nodes=self.nodes, backtracks=self.backtracks)
+
+            cell = frame.candidates[frame.position]
+            frame.position += 1
+            frame.active = True
+            self.nodes += 1
+            if not place(frame.unit, cell):
+                self.rejected += 1
+                continue
+
+            if not unassigned:
+                return [(index, cell // periods, cell % periods) for index, cell in enumerate(assigned)]
+
+            following = select()
+            stack.append(_Frame(following, candidates(following), len(trail)))
+
+        # The whole tree was explored: no restart can find a solution
+        self._exhausted = True
+        return None
@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
 from models.university import Section, Course, Timetable, TimetableSlot
 from models.user import User
-from datetime import datetime, time, timedelta
+from datetime import datetime, time
 import random
 from typing import List, Dict, Optional
+from services.slot_template import slot_template_for_timetable
 
 class TimetableService:
     def __init__(self, db: Session):
@@ -148,10 +149,7 @@ class TimetableService:
             return datetime.strptime('09:00', '%H:%M').time()
     
     def _generate_time_slots(self, timetable: Timetable, courses: List[Course], working_days: List[str]):
-        # Calculate available time slots
-        current_time = datetime.combine(datetime.today(), timetable.start_time)
-        end_time = datetime.combine(datetime.today(), timetable.end_time)
-        lunch_start = datetime.combine(datetime.today(), timetable.lunch_start)
+        template = slot_template_for_timetable(timetable, working_days)
         
         # Create course pool with repetitions based on duration
         course_pool = []
@@ -162,49 +160,39 @@ class TimetableService:
         random.shuffle(course_pool)
         course_index = 0
         
-        for day in working_days:
-            day_start = current_time.replace(hour=timetable.start_time.hour, minute=timetable.start_time.minute)
-            current_slot = day_start
-            
-            while current_slot < end_time and course_index < len(course_pool):
-                # Check for lunch break
-                if (current_slot.time() <= timetable.lunch_start <= 
-                    (current_slot + timedelta(minutes=timetable.period_duration)).time()):
-                    
+        for day in template.working_days:
+            for kind, index in template.day_layout:
+                if course_index >= len(course_pool):
+                    break
+                
+                if kind == 'break':
                     # Add lunch break
-                    lunch_end = lunch_start + timedelta(minutes=timetable.lunch_duration)
+                    start_time, end_time = template.break_clock[index]
                     lunch_slot = TimetableSlot(
                         timetable_id=timetable.id,
                         course_id=course_pool[0].id,  # Dummy course for break
                         day=day,
-                        start_time=lunch_start.time(),
-                        end_time=lunch_end.time(),
+                        start_time=start_time,
+                        end_time=end_time,
                         is_break=True,
-                        break_type='lunch'
+                        break_type=template.breaks[index][2]
                     )
                     self.db.add(lunch_slot)
-                    current_slot = lunch_end
                     continue
                 
                 # Add course slot
-                if course_index < len(course_pool):
-                    course = course_pool[course_index]
-                    slot_end = current_slot + timedelta(minutes=timetable.period_duration)
-                    
-                    course_slot = TimetableSlot(
-                        timetable_id=timetable.id,
-                        course_id=course.id,
-                        day=day,
-                        start_time=current_slot.time(),
-                        end_time=slot_end.time(),
-                        is_break=False
-                    )
-                    self.db.add(course_slot)
-                    
-                    current_slot = slot_end + timedelta(minutes=timetable.break_duration)
-                    course_index += 1
-                else:
-                    break
+                course = course_pool[course_index]
+                start_time, end_time = template.period_clock[index]
+                course_slot = TimetableSlot(
+                    timetable_id=timetable.id,
+                    course_id=course.id,
+                    day=day,
+                    start_time=start_time,
+                    end_time=end_time,
+                    is_break=False
+                )
+                self.db.add(course_slot)
+                course_index += 1
         
         self.db.commit()
     
@@ -1,13 +1,30 @@
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
 from models.university import Branch, Section, Teacher, Room, Subject, Course, Timetable, TimetableSlot
-from datetime import datetime, time, timedelta
-import random
+from datetime import datetime, time
+from time import monotonic
 from typing import List, Dict, Optional, Tuple
+from services.occupancy import OccupancyIndex
+from services.slot_template import (
+    SlotTemplate, format_minutes, parse_minutes, slot_template_for_timetable, slot_template_from_config
+)
+from services.conflict_analysis import GridEncoder, find_overlaps
+from services.timetable_search import SearchUnit
+from services.solver_backends import get_solver
+from services.annealing import anneal_schedule
+from services.schedule_quality import UNPLACED_PENALTY, schedule_penalty
+from services.progress import ProgressReporter
+from services.room_allocation import RoomRequest, allocate_rooms, room_type_for
+from services.problem_instance import CourseRecord, ProblemInstance
+from services.metrics import PhaseTimer, metrics
 
 class UniversityTimetableService:
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, progress: Optional[ProgressReporter] = None):
         self.db = db
         self.conflicts = []
+        self.solver_stats = {}
+        self.progress = progress
+        self.timings = PhaseTimer()
     
     def create_branch(self, user_id: int, name: str, code: str) -> Optional[Branch]:
         existing = self.db.query(Branch).filter(
@@ -138,194 +155,442 @@ class UniversityTimetableService:
         return course
     
     def generate_university_timetable(self, user_id: int, section_id: int, config: Dict) -> Optional[Timetable]:
-        section = self.db.query(Section).filter(
-            Section.id == section_id, Section.user_id == user_id
+        self.timings = PhaseTimer()
+        try:
+            with self.timings.phase('load'):
+                section = self.db.query(Section).options(joinedload(Section.branch)).filter(
+                    Section.id == section_id, Section.user_id == user_id
+                ).first()
+                
+                if not section:
+                    return None
+                
+                instance = ProblemInstance.from_db(self.db, user_id, [section_id])
+            
+            if not instance.courses:
+                return None
+            
+            # Create timetable; it is only added to the session once a schedule is found
+            timetable = self._build_timetable(section, user_id, config)
+            working_days = timetable.working_days.split(',')
+            
+            # Generate schedule with the requested solver
+            success = self._generate_optimized_schedule(timetable, instance, working_days, config)
+            
+            if not success:
+                return None
+            
+            return timetable
+        finally:
+            metrics.record('generate_university_timetable', self.timings)
+    
+    def generate_tenant_timetables(self, user_id: int, config: Dict) -> Optional[List[Timetable]]:
+        # Solve every section against one shared occupancy; nothing is written
+        # unless all sections are placed
+        self.conflicts = []
+        self.timings = PhaseTimer()
+        try:
+            with self.timings.phase('load'):
+                instance = ProblemInstance.from_db(self.db, user_id)
+                if not instance.sections:
+                    return None
+                sections = self.db.query(Section).options(joinedload(Section.branch)).filter(
+                    Section.user_id == user_id, Section.id.in_(instance.sections)
+                ).all()
+            if not sections:
+                return None
+            
+            with self.timings.phase('slots'):
+                template = slot_template_from_config(config)
+                occupancy = OccupancyIndex(template.periods_per_day)
+            
+            placements = self._assign(instance, instance.all_blocks(), template, occupancy, config)
+            
+            if placements is None or self.conflicts:
+                return None
+            
+            # Replace previous timetables of the solved sections
+            with self.timings.phase('delete'):
+                previous = [row.id for row in self.db.query(Timetable.id).filter(
+                    Timetable.user_id == user_id,
+                    Timetable.section_id.in_([section.id for section in sections])
+                ).all()]
+                if previous:
+                    self.db.query(TimetableSlot).filter(TimetableSlot.timetable_id.in_(previous)).delete(
+                        synchronize_session=False
+                    )
+                    self.db.query(Timetable).filter(Timetable.id.in_(previous)).delete(synchronize_session='fetch')
+            
+            timetables = {section.id: self._build_timetable(section, user_id, config) for section in sections}
+            self._persist(timetables, template, placements)
+            return list(timetables.values())
+        finally:
+            metrics.record('generate_tenant_timetables', self.timings)
+    
+    def repair_timetable(self, user_id: int, timetable_id: int, changes: Dict) -> Optional[Dict]:
+        # Re-place only the hours touched by the change set; every other slot,
+        # here and in the tenant's other timetables, stays where it is
+        self.conflicts = []
+        
+        timetable = self.db.query(Timetable).filter(
+            Timetable.id == timetable_id, Timetable.user_id == user_id
         ).first()
         
-        if not section:
+        if not timetable:
             return None
         
-        courses = self.db.query(Course).filter(
-            Course.section_id == section_id, Course.user_id == user_id
+        template = slot_template_for_timetable(timetable, timetable.working_days.split(','))
+        instance = ProblemInstance.from_db(self.db, user_id, [timetable.section_id])
+        courses = instance.courses
+        added = [course_id for course_id in changes.get('added_courses') or [] if course_id in courses]
+        removed = set(changes.get('removed_courses') or [])
+        affected = set()
+        
+        # Course and slot changes are collected here and only written once
+        # the affected hours have been placed again
+        course_updates = {}
+        room_updates = {}
+        
+        # Teacher reassignments update the course rows themselves
+        for course_id, teacher_id in (changes.get('teacher_changes') or {}).items():
+            course = courses.get(int(course_id))
+            if not course or teacher_id not in instance.teachers:
+                self.conflicts.append(f"Invalid teacher change for course {course_id}")
+                return None
+            course.teacher_id = teacher_id
+            course_updates.setdefault(course.id, {'id': course.id})['teacher_id'] = teacher_id
+            affected.add(course.id)
+        
+        # Rooms taken out of service, for the whole week or for single periods
+        occupancy = OccupancyIndex(template.periods_per_day)
+        fixed_rooms = {course.id: course.room_id for course in courses.values()}
+        blocked_rooms = set()
+        for block in changes.get('unavailable_rooms') or []:
+            room_id = block['room_id']
+            if not block.get('day'):
+                for course in courses.values():
+                    if course.room_id == room_id:
+                        course.room_id = None
+                        course_updates.setdefault(course.id, {'id': course.id})['room_id'] = None
+                cells = [(day_index, period) for day_index in range(template.num_days)
+                         for period in range(template.periods_per_day)]
+            else:
+                day_index = template.day_index.get(block['day'])
+                if day_index is None:
+                    continue
+                if block.get('start_time'):
+                    cell = template.cell_for(block['day'], block['start_time'])
+                    cells = [cell] if cell else []
+                else:
+                    cells = [(day_index, period) for period in range(template.periods_per_day)]
+            for day_index, period in cells:
+                occupancy.reserve_room(room_id, day_index, period)
+            blocked_rooms.add(room_id)
+        
+        # Book everything else the tenant has scheduled in the timetables in
+        # effect: the latest of each other section, as the audit counts them
+        latest = self.db.query(func.max(Timetable.id)).filter(
+            Timetable.user_id == user_id,
+            Timetable.section_id != timetable.section_id
+        ).group_by(Timetable.section_id)
+        booked = self.db.query(
+            TimetableSlot.day, TimetableSlot.start_time, Course.teacher_id,
+            func.coalesce(TimetableSlot.room_id, Course.room_id), Course.section_id
+        ).join(Course, TimetableSlot.course_id == Course.id).filter(
+            TimetableSlot.timetable_id.in_(latest),
+            TimetableSlot.is_break == False
+        ).all()
+        for day, start_time, teacher_id, room_id, section_id in booked:
+            cell = template.cell_for(day, start_time)
+            if cell:
+                occupancy.assign(teacher_id, room_id, section_id, *cell)
+        
+        own_slots = self.db.query(
+            TimetableSlot.id, TimetableSlot.course_id, TimetableSlot.day, TimetableSlot.start_time, TimetableSlot.room_id
+        ).filter(
+            TimetableSlot.timetable_id == timetable.id, TimetableSlot.is_break == False
         ).all()
         
-        if not courses:
+        # Lab blocks are moved whole rather than hour by hour
+        relocated = {
+            slot.course_id for slot in own_slots
+            if slot.course_id in courses and courses[slot.course_id].subject_type == 'lab'
+            and (slot.course_id in affected or (slot.room_id or fixed_rooms[slot.course_id]) in blocked_rooms)
+        }
+        
+        freed = []
+        kept = {}
+        checked = []
+        for slot in own_slots:
+            cell = template.cell_for(slot.day, slot.start_time)
+            if slot.course_id in removed or slot.course_id not in courses or slot.course_id in relocated or cell is None:
+                freed.append(slot.id)
+            elif slot.course_id in affected or (slot.room_id or fixed_rooms[slot.course_id]) in blocked_rooms:
+                checked.append((slot, cell))
+            else:
+                course = courses[slot.course_id]
+                occupancy.assign(course.teacher_id, slot.room_id or course.room_id, course.section_id, *cell)
+                kept[course.id] = kept.get(course.id, 0) + 1
+        
+        # Affected hours stay put when they still fit; an allocated room that
+        # is no longer free is swapped for another one at the same time
+        pending = {course_id: courses[course_id].hours_per_week for course_id in relocated - removed}
+        rehoused = []
+        for slot, cell in checked:
+            course = courses[slot.course_id]
+            if not occupancy.can_assign(course.teacher_id, course.room_id, course.section_id,
+                                        cell[0], cell[1], instance.max_hours_per_day(course.teacher_id)):
+                freed.append(slot.id)
+                pending[course.id] = pending.get(course.id, 0) + 1
+                continue
+            occupancy.assign(course.teacher_id, course.room_id, course.section_id, *cell)
+            kept[course.id] = kept.get(course.id, 0) + 1
+            if course.room_id:
+                room_updates[slot.id] = course.room_id
+            elif slot.room_id and not occupancy.room_masks.get(slot.room_id, 0) & occupancy.bit(*cell):
+                occupancy.reserve_room(slot.room_id, *cell)
+            else:
+                rehoused.append((slot, cell))
+        
+        if rehoused:
+            rooms = self._allocate_rooms(
+                instance, [(courses[slot.course_id], *cell, 1) for slot, cell in rehoused], occupancy
+            )
+            for (slot, _), room_id in zip(rehoused, rooms):
+                room_updates[slot.id] = room_id
+        
+        for course_id in added:
+            missing = courses[course_id].hours_per_week - kept.get(course_id, 0)
+            pending[course_id] = max(pending.get(course_id, 0), missing)
+        
+        blocks = instance.blocks({course_id: pending[course_id] for course_id in sorted(pending)})
+        placements = self._assign(instance, blocks, template, occupancy, {
+            'solver': 'backtracking', 'max_backtracks': changes.get('max_backtracks', 20000)
+        })
+        if placements is None:
             return None
         
-        # Parse configuration
-        start_time = self._parse_time(config.get('start_time', '09:00'))
-        end_time = self._parse_time(config.get('end_time', '16:00'))
-        period_duration = config.get('period_duration', 50)
-        break_duration = config.get('break_duration', 10)
-        lunch_start = self._parse_time(config.get('lunch_start', '12:30'))
-        lunch_duration = config.get('lunch_duration', 45)
-        working_days = config.get('working_days', ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])
+        if freed:
+            self.db.query(TimetableSlot).filter(TimetableSlot.id.in_(freed)).delete(synchronize_session=False)
+        self.db.bulk_update_mappings(Course, list(course_updates.values()))
+        self.db.bulk_update_mappings(
+            TimetableSlot, [{'id': slot_id, 'room_id': room_id} for slot_id, room_id in room_updates.items()]
+        )
+        self.db.bulk_insert_mappings(
+            TimetableSlot, self._course_slot_rows({timetable.section_id: timetable}, template, placements)
+        )
+        self.db.commit()
         
-        # Create timetable
-        timetable = Timetable(
+        return {
+            'timetable_id': timetable.id,
+            'removed_slots': len(freed),
+            'added_slots': sum(placement[3] for placement in placements),
+            'unchanged_slots': sum(kept.values()),
+            'reassigned_rooms': len(rehoused)
+        }
+    
+    def _build_timetable(self, section: Section, user_id: int, config: Dict) -> Timetable:
+        working_days = config.get('working_days', ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday'])
+        return Timetable(
             name=f"{section.branch.name} {section.year}-{section.name} Sem-{section.semester}",
-            section_id=section_id,
+            section_id=section.id,
             user_id=user_id,
-            start_time=start_time,
-            end_time=end_time,
-            period_duration=period_duration,
-            break_duration=break_duration,
-            lunch_start=lunch_start,
-            lunch_duration=lunch_duration,
+            start_time=self._parse_time(config.get('start_time', '09:00')),
+            end_time=self._parse_time(config.get('end_time', '16:00')),
+            period_duration=config.get('period_duration', 50),
+            break_duration=config.get('break_duration', 10),
+            lunch_start=self._parse_time(config.get('lunch_start', '12:30')),
+            lunch_duration=config.get('lunch_duration', 45),
             working_days=','.join(working_days)
         )
-        
-        self.db.add(timetable)
-        self.db.commit()
-        self.db.refresh(timetable)
-        
-        # Generate optimized schedule
-        success = self._generate_optimized_schedule(timetable, courses, working_days)
-        
-        if not success:
-            self.db.delete(timetable)
-            self.db.commit()
-            return None
-        
-        return timetable
     
-    def _generate_optimized_schedule(self, timetable: Timetable, courses: List[Course], working_days: List[str]) -> bool:
+    def _generate_optimized_schedule(self, timetable: Timetable, instance: ProblemInstance, working_days: List[str],
+                                     config: Dict) -> bool:
         self.conflicts = []
         
-        # Create time slots
-        time_slots = self._generate_time_slots(timetable, working_days)
-        
-        # Create course requirements based on hours per week
-        course_requirements = []
-        for course in courses:
-            hours_needed = course.subject.hours_per_week
-            for _ in range(hours_needed):
-                course_requirements.append(course)
+        # Compiled period grid shared by all days
+        with self.timings.phase('slots'):
+            template = slot_template_for_timetable(timetable, working_days)
+            occupancy = OccupancyIndex(template.periods_per_day)
         
-        # Shuffle for randomization
-        random.shuffle(course_requirements)
-        
-        # Track teacher and room availability
-        teacher_schedule = {}
-        room_schedule = {}
-        
-        # Assign courses to time slots with conflict checking
-        for course in course_requirements:
-            assigned = False
-            
-            # Try to assign to available slot
-            for day in working_days:
-                if assigned:
-                    break
-                    
-                day_slots = [slot for slot in time_slots if slot['day'] == day and not slot['is_break']]
-                random.shuffle(day_slots)
-                
-                for slot in day_slots:
-                    if self._can_assign_course(course, slot, teacher_schedule, room_schedule):
-                        # Create timetable slot
-                        timetable_slot = TimetableSlot(
-                            timetable_id=timetable.id,
-                            course_id=course.id,
-                            day=day,
-                            start_time=slot['start_time'],
-                            end_time=slot['end_time'],
-                            is_break=False
-                        )
-                        
-                        self.db.add(timetable_slot)
-                        
-                        # Update schedules
-                        slot_key = f"{day}_{slot['start_time']}_{slot['end_time']}"
-                        teacher_schedule[f"teacher_{course.teacher_id}_{slot_key}"] = True
-                        if course.room_id:
-                            room_schedule[f"room_{course.room_id}_{slot_key}"] = True
-                        
-                        assigned = True
-                        break
-            
-            if not assigned:
-                self.conflicts.append(f"Could not assign {course.subject.name} for {course.section.name}")
-        
-        # Add break slots
-        self._add_break_slots(timetable, time_slots)
-        
-        self.db.commit()
-        return len(self.conflicts) == 0
-    
-    def _can_assign_course(self, course: Course, slot: Dict, teacher_schedule: Dict, room_schedule: Dict) -> bool:
-        slot_key = f"{slot['day']}_{slot['start_time']}_{slot['end_time']}"
-        
-        # Check teacher availability
-        teacher_key = f"teacher_{course.teacher_id}_{slot_key}"
-        if teacher_key in teacher_schedule:
+        placements = self._assign(instance, instance.all_blocks(), template, occupancy, config)
+        if placements is None:
             return False
         
-        # Check room availability
-        if course.room_id:
-            room_key = f"room_{course.room_id}_{slot_key}"
-            if room_key in room_schedule:
-                return False
-        
-        # Check teacher daily hour limits
-        day_teacher_hours = sum(1 for key in teacher_schedule.keys() 
-                               if key.startswith(f"teacher_{course.teacher_id}_{slot['day']}_"))
-        
-        if day_teacher_hours >= course.teacher.max_hours_per_day:
+        # With a time budget the best assignment found so far is kept, conflicts and all
+        if self.conflicts and not config.get('time_limit_ms'):
             return False
         
+        self._persist({timetable.section_id: timetable}, template, placements)
         return True
     
-    def _generate_time_slots(self, timetable: Timetable, working_days: List[str]) -> List[Dict]:
-        slots = []
-        
-        for day in working_days:
-            current_time = datetime.combine(datetime.today(), timetable.start_time)
-            end_time = datetime.combine(datetime.today(), timetable.end_time)
-            lunch_start = datetime.combine(datetime.today(), timetable.lunch_start)
-            
-            while current_time < end_time:
-                slot_end = current_time + timedelta(minutes=timetable.period_duration)
-                
-                # Check for lunch break
-                if (current_time.time() <= timetable.lunch_start <= slot_end.time()):
-                    # Add lunch break
-                    lunch_end = lunch_start + timedelta(minutes=timetable.lunch_duration)
-                    slots.append({
-                        'day': day,
-                        'start_time': lunch_start.time(),
-                        'end_time': lunch_end.time(),
-                        'is_break': True,
-                        'break_type': 'lunch'
-                    })
-                    current_time = lunch_end + timedelta(minutes=timetable.break_duration)
-                    continue
-                
-                # Add regular slot
-                if slot_end <= end_time:
-                    slots.append({
-                        'day': day,
-                        'start_time': current_time.time(),
-                        'end_time': slot_end.time(),
-                        'is_break': False
-                    })
-                
-                current_time = slot_end + timedelta(minutes=timetable.break_duration)
+    def _assign(self, instance: ProblemInstance, blocks: List[Tuple[CourseRecord, int]], template: SlotTemplate,
+                occupancy: OccupancyIndex, config: Dict) -> Optional[List[Tuple[CourseRecord, int, int, int, Optional[int]]]]:
+        # Solvers only ever see the plain records; the ORM is touched again to persist
+        units = instance.units(blocks)
+        solver = config.get('solver', 'greedy')
+        self.solver_stats = {'solver': solver}
+        seed = config.get('seed')
+        
+        # Anytime mode: a wall-clock budget and an optional "good enough" penalty
+        started = monotonic()
+        time_limit_ms = config.get('time_limit_ms')
+        quality_target = config.get('quality_target')
+        
+        def remaining_ms() -> Optional[float]:
+            if not time_limit_ms:
+                return None
+            return max(time_limit_ms - (monotonic() - started) * 1000, 0)
+        
+        with self.timings.phase('search'):
+            solved = self._solve(units, template, occupancy, config)
+        if solved is None:
+            return None
+        assignment, unplaced = solved
+        
+        anneal_ms = config.get('anneal_ms')
+        if anneal_ms and time_limit_ms:
+            anneal_ms = min(anneal_ms, remaining_ms())
+        if anneal_ms:
+            with self.timings.phase('anneal'):
+                assignment, self.solver_stats['annealing'] = anneal_schedule(
+                    units, template, assignment, occupancy,
+                    time_limit_ms=anneal_ms, seed=seed,
+                    target_penalty=quality_target - len(unplaced) * UNPLACED_PENALTY if quality_target is not None else None,
+                    progress=self.progress
+                )
         
-        return slots
+        for index in unplaced:
+            self.conflicts.append(f"Could not assign {instance.describe(blocks[index][0])}")
+        
+        self.solver_stats['complete'] = not unplaced
+        self.solver_stats['placed_hours'] = sum(units[index].length for index, _, _ in assignment)
+        self.solver_stats['total_hours'] = sum(unit.length for unit in units)
+        self.solver_stats['penalty'] = schedule_penalty(units, assignment, unplaced, template)
+        self.solver_stats['elapsed_ms'] = round((monotonic() - started) * 1000, 1)
+        if time_limit_ms:
+            self.solver_stats['budget_exhausted'] = remaining_ms() == 0
+        if self.progress is not None:
+            self.progress.emit('solved', placed=len(assignment), total=len(units), conflicts=len(unplaced),
+                               best_penalty=self.solver_stats['penalty'])
+        
+        placed = []
+        for index, day_index, period in assignment:
+            course, length = blocks[index]
+            occupancy.assign(course.teacher_id, course.room_id, course.section_id, day_index, period, length)
+            placed.append((course, day_index, period, length))
+        
+        with self.timings.phase('rooms'):
+            rooms = self._allocate_rooms(instance, placed, occupancy)
+        return [placement + (room_id,) for placement, room_id in zip(placed, rooms)]
     
-    def _add_break_slots(self, timetable: Timetable, time_slots: List[Dict]):
-        for slot in time_slots:
-            if slot['is_break']:
-                break_slot = TimetableSlot(
-                    timetable_id=timetable.id,
-                    day=slot['day'],
-                    start_time=slot['start_time'],
-                    end_time=slot['end_time'],
-                    is_break=True,
-                    break_type=slot.get('break_type', 'short')
+    def _solve(self, units: List[SearchUnit], template: SlotTemplate, occupancy: OccupancyIndex,
+               config: Dict) -> Optional[Tuple[List[Tuple[int, int, int]], List[int]]]:
+        # Run the configured backend; (assignment, unplaced unit indexes) or None
+        backend = get_solver(self.solver_stats['solver'])
+        if backend is None:
+            self.conflicts.append(f"Unknown solver '{self.solver_stats['solver']}'")
+            return None
+        
+        result = backend.solve(units, template, occupancy, config, self.progress)
+        self.solver_stats.update(result.stats)
+        for name in ('candidates_tried', 'failed_checks', 'backtracks', 'attempts'):
+            if name in result.stats:
+                self.timings.count(name, result.stats[name])
+        
+        if result.assignment is None:
+            if result.stats.get('nodes') == 0:
+                self.conflicts.append("Not enough free periods for the required teaching hours")
+            elif result.stats.get('exhausted'):
+                self.conflicts.append(
+                    f"No conflict-free timetable exists ({result.stats['nodes']} placements tried)"
+                )
+            else:
+                self.conflicts.append(
+                    f"No conflict-free timetable found after {result.stats.get('backtracks', 0)} backtracks "
+                    f"({result.stats.get('nodes', 0)} placements tried)"
                 )
-                self.db.add(break_slot)
+            return None
+        return result.assignment, result.unplaced
+    
+    def _allocate_rooms(self, instance: ProblemInstance, placed: List[Tuple[CourseRecord, int, int, int]],
+                        occupancy: OccupancyIndex) -> List[Optional[int]]:
+        # Courses without a fixed room get the tightest free room of the right type
+        rooms = [placement[0].room_id for placement in placed]
+        pending = [position for position, room_id in enumerate(rooms) if room_id is None]
+        if not pending:
+            return rooms
+        
+        index = instance.room_index()
+        if not len(index):
+            return rooms
+        
+        requests = []
+        for position in pending:
+            course, day_index, period, length = placed[position]
+            requests.append(RoomRequest(
+                room_type_for(course.subject_type), instance.sections[course.section_id].strength,
+                day_index, period, length
+            ))
+        allocation = allocate_rooms(requests, index, occupancy)
+        
+        for position, room_id in zip(pending, allocation):
+            rooms[position] = room_id
+        self.solver_stats['rooms'] = {
+            'allocated': sum(1 for room_id in allocation if room_id is not None),
+            'unallocated': sum(1 for room_id in allocation if room_id is None)
+        }
+        return rooms
+    
+    def _persist(self, timetables: Dict[int, Timetable], template: SlotTemplate,
+                 placements: List[Tuple[CourseRecord, int, int, int, Optional[int]]]):
+        # One flush for the timetable rows (their ids are needed), one batched
+        # insert for every course and break slot, one commit
+        with self.timings.phase('write'):
+            self.db.add_all(timetables.values())
+            self.db.flush()
+        with self.timings.phase('rows'):
+            rows = self._course_slot_rows(timetables, template, placements)
+        with self.timings.phase('breaks'):
+            for timetable in timetables.values():
+                rows.extend(self._break_slot_rows(timetable, template))
+        with self.timings.phase('write'):
+            self.db.bulk_insert_mappings(TimetableSlot, rows)
+        self.timings.count('rows_written', len(timetables) + len(rows))
+        with self.timings.phase('commit'):
+            self.db.commit()
+    
+    def _course_slot_rows(self, timetables: Dict[int, Timetable], template: SlotTemplate,
+                          placements: List[Tuple[CourseRecord, int, int, int, Optional[int]]]) -> List[Dict]:
+        rows = []
+        for course, day_index, period, length, room_id in placements:
+            for offset in range(length):
+                start_time, end_time = template.period_clock[period + offset]
+                rows.append({
+                    'timetable_id': timetables[course.section_id].id,
+                    'course_id': course.id,
+                    'room_id': room_id,
+                    'day': template.working_days[day_index],
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'is_break': False
+                })
+        return rows
+    
+    def _break_slot_rows(self, timetable: Timetable, template: SlotTemplate) -> List[Dict]:
+        rows = []
+        for day in template.working_days:
+            for index, (_, _, break_type) in enumerate(template.breaks):
+                start_time, end_time = template.break_clock[index]
+                rows.append({
+                    'timetable_id': timetable.id,
+                    'day': day,
+                    'start_time': start_time,
+                    'end_time': end_time,
+                    'is_break': True,
+                    'break_type': break_type
+                })
+        return rows
     
     def _parse_time(self, time_str: str) -> time:
         try:
@@ -334,7 +599,9 @@ class UniversityTimetableService:
             return datetime.strptime('09:00', '%H:%M').time()
     
     def get_timetable_with_details(self, user_id: int, section_id: int) -> Optional[Dict]:
-        timetable = self.db.query(Timetable).filter(
+        timetable = self.db.query(Timetable).options(
+            joinedload(Timetable.section).joinedload(Section.branch)
+        ).filter(
             Timetable.section_id == section_id,
             Timetable.user_id == user_id
         ).first()
@@ -342,7 +609,15 @@ class UniversityTimetableService:
         if not timetable:
             return None
         
-        slots = self.db.query(TimetableSlot).filter(
+        # Courses and their subject, teacher and room come in a fixed number of
+        # round trips instead of one lazy load per slot
+        course = selectinload(TimetableSlot.course)
+        slots = self.db.query(TimetableSlot).options(
+            selectinload(TimetableSlot.room),
+            course.selectinload(Course.subject),
+            course.selectinload(Course.teacher),
+            course.selectinload(Course.room)
+        ).filter(
             TimetableSlot.timetable_id == timetable.id
         ).all()
         
@@ -375,14 +650,15 @@ class UniversityTimetableService:
             }
             
             if not slot.is_break and slot.course:
+                room = slot.room or slot.course.room
                 slot_data.update({
                     'subject_name': slot.course.subject.name,
                     'subject_code': slot.course.subject.code,
                     'subject_type': slot.course.subject.subject_type,
                     'teacher_name': slot.course.teacher.name,
                     'teacher_id': slot.course.teacher.employee_id,
-                    'room_number': slot.course.room.number if slot.course.room else 'TBA',
-                    'building': slot.course.room.building if slot.course.room else 'TBA'
+                    'room_number': room.number if room else 'TBA',
+                    'building': room.building if room else 'TBA'
                 })
             
             timetable_data['slots'][slot.day].append(slot_data)
@@ -393,6 +669,60 @@ class UniversityTimetableService:
         
         return timetable_data
     
+    def audit_tenant_conflicts(self, user_id: int) -> Dict:
+        # The latest timetable of each section is the one in effect
+        latest = self.db.query(func.max(Timetable.id)).filter(
+            Timetable.user_id == user_id
+        ).group_by(Timetable.section_id)
+        
+        rows = self.db.query(
+            TimetableSlot.day, TimetableSlot.start_time, TimetableSlot.end_time,
+            Course.teacher_id, func.coalesce(TimetableSlot.room_id, Course.room_id).label('room_id'), Course.section_id
+        ).join(Course, TimetableSlot.course_id == Course.id).filter(
+            TimetableSlot.timetable_id.in_(latest),
+            TimetableSlot.is_break == False
+        ).all()
+        
+        # Sections may use different period grids, so bookings are compared as
+        # [start, end) minutes of the day rather than by period or start time
+        day_encoder = GridEncoder()
+        days = [day_encoder.encode(row.day) for row in rows]
+        starts = [parse_minutes(row.start_time) for row in rows]
+        ends = [parse_minutes(row.end_time) for row in rows]
+        resources = {
+            'teacher': [row.teacher_id for row in rows],
+            'room': [row.room_id if row.room_id is not None else -1 for row in rows],
+            'section': [row.section_id for row in rows]
+        }
+        clashes = find_overlaps(days, starts, ends, resources)
+        
+        models = {'teacher': Teacher, 'room': Room, 'section': Section}
+        labels = {}
+        for kind, model in models.items():
+            ids = {clash['resource'] for clash in clashes if clash['type'] == kind}
+            if ids:
+                for entity in self.db.query(model).filter(model.id.in_(ids)).all():
+                    labels[(kind, entity.id)] = entity.number if kind == 'room' else entity.name
+        
+        conflicts = [
+            {
+                'type': clash['type'],
+                clash['type']: labels.get((clash['type'], clash['resource']), clash['resource']),
+                'day': day_encoder.labels[clash['day']],
+                'time': format_minutes(clash['start']),
+                'end_time': format_minutes(clash['end']),
+                'count': clash['count']
+            }
+            for clash in clashes
+        ]
+        
+        return {
+            'slots_checked': len(rows),
+            'conflicts': conflicts,
+            'total_conflicts': len(conflicts),
+            'status': 'success' if not conflicts else 'warning'
+        }
+    
     def get_conflicts_report(self, user_id: int) -> Dict:
         return {
             'conflicts': self.conflicts,
@@ -3,24 +3,21 @@ from config.database import database
 def test_connection():
     print("Testing MySQL connection...")
     
-    if database.connection is None:
+    if not database.ping():
         print("[FAILED] Database connection failed!")
         return False
     
     try:
-        database.cursor.execute("SELECT 1")
-        result = database.cursor.fetchone()
         print("[SUCCESS] Database connected successfully!")
         
         # Test tables
-        database.cursor.execute("SHOW TABLES")
-        tables = database.cursor.fetchall()
-        print(f"[INFO] Available tables: {[table['Tables_in_timetable'] for table in tables]}")
+        tables = database.execute_query("SHOW TABLES") or []
+        print(f"[INFO] Available tables: {[list(table.values())[0] for table in tables]}")
         
         # Test users table
-        database.cursor.execute("SELECT COUNT(*) as count FROM users")
-        count = database.cursor.fetchone()
+        count = database.execute_query("SELECT COUNT(*) as count FROM users")[0]
         print(f"[INFO] Users table: {count['count']} records")
+        print(f"[INFO] Pool: {database.pool_stats()}")
         
         return True
         
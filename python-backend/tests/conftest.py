@@ -0,0 +1,10 @@
+import os
+import tempfile
+
+# Point every module-level database at a scratch file before the app is
+# imported, so tests never write to the tracked timetable.db
+_data_dir = tempfile.mkdtemp(prefix='timetable-tests-')
+os.environ['DB_PATH'] = os.path.join(_data_dir, 'timetable.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.environ['DB_PATH']}"
+os.environ.pop('JOB_QUEUE_PATH', None)
+os.environ.pop('SOLUTION_CACHE_PATH', None)
@@ -0,0 +1,18 @@
+from fastapi.testclient import TestClient
+from config.sqlite_database import async_database
+from main import app
+
+client = TestClient(app)
+
+
+def test_health_pings_the_database_and_reports_pools():
+    body = client.get('/api/health').json()
+    assert body['database'] == 'connected'
+    assert set(body['pools']) == {'sqlite', 'mysql'}
+    assert body['pools']['sqlite']['open'] >= 1
+    assert 'utilization' in body['pools']['mysql']
+
+
+def test_health_reports_a_failed_ping(monkeypatch):
+    monkeypatch.setattr(async_database.database, 'ping', lambda: False)
+    assert client.get('/api/health').json()['database'] == 'disconnected'
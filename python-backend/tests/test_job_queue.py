@@ -0,0 +1,47 @@
+import os
+import sqlite3
+import time
+from services.job_queue import STALE_AFTER_SECONDS, JobQueue, _now
+
+
+def wait_for(queue, job_id, status, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = queue.get(job_id)
+        if job and job['status'] == status:
+            return job
+        time.sleep(0.02)
+    return queue.get(job_id)
+
+
+def test_register_does_not_touch_the_database(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    JobQueue(path).register('echo', lambda user_id, payload, publish: payload)
+    assert not os.path.exists(path)
+
+
+def test_resume_requeues_stale_jobs_only(tmp_path):
+    path = str(tmp_path / 'jobs.db')
+    queue = JobQueue(path)
+    queue.register('echo', lambda user_id, payload, publish: payload)
+    queue._ensure_table()
+    connection = sqlite3.connect(path)
+    for job_id, heartbeat in (('stale', _now(-2 * STALE_AFTER_SECONDS)), ('live', _now())):
+        connection.execute(
+            "INSERT INTO generation_jobs (id, kind, user_id, payload, status, created_at, owner, heartbeat_at) "
+            "VALUES (?, 'echo', 1, '{\"n\": 1}', 'running', ?, 'other', ?)", (job_id, _now(), heartbeat)
+        )
+    connection.commit()
+    connection.close()
+
+    queue.resume()
+    assert wait_for(queue, 'stale', 'succeeded')['result'] == {'n': 1}
+    assert queue.get('live')['status'] == 'running'
+
+
+def test_submit_runs_the_handler(tmp_path):
+    queue = JobQueue(str(tmp_path / 'jobs.db'))
+    queue.register('echo', lambda user_id, payload, publish: {'user': user_id, **payload})
+    job_id = queue.submit('echo', 7, {'n': 2})
+    assert wait_for(queue, job_id, 'succeeded')['result'] == {'user': 7, 'n': 2}
+    assert queue.get(job_id, user_id=8) is None
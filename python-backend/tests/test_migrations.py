@@ -0,0 +1,39 @@
+import os
+import shutil
+import sqlite3
+from sqlalchemy import create_engine
+from config import migrations
+from models.university import Base
+
+SHIPPED_DB = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'timetable.db')
+
+
+def tables(path):
+    connection = sqlite3.connect(path)
+    try:
+        return {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    finally:
+        connection.close()
+
+
+def test_shipped_database_passes_check_once_migrated(tmp_path):
+    path = str(tmp_path / 'timetable.db')
+    shutil.copy(SHIPPED_DB, path)
+    assert migrations.main(['--db', path, '--check']) == 1
+    # --check only reads the database
+    assert 'schema_version' not in tables(path)
+
+    assert migrations.main(['--db', path]) == 0
+    connection = sqlite3.connect(path)
+    pending, waiting = migrations.pending_migrations(connection)
+    connection.close()
+    assert pending == []
+    assert set(waiting) == {'timetable_slots_room_id', 'timetable_indexes'}
+    assert migrations.main(['--db', path, '--check']) == 0
+
+
+def test_orm_database_passes_check_once_migrated(tmp_path):
+    path = str(tmp_path / 'orm.db')
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+    assert migrations.main(['--db', path]) == 0
+    assert migrations.main(['--db', path, '--check']) == 0
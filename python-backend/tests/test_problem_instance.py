@@ -0,0 +1,36 @@
+import pytest
+from benchmarks.dataset import SCALES, create_session, populate
+from config.sqlalchemy_db import assert_max_queries
+from models.university import Section
+from services.problem_instance import ProblemInstance
+
+
+@pytest.mark.parametrize('scale', ['small', 'large'])
+def test_from_db_stays_within_round_trips(scale):
+    # The budget holds whatever the size of the tenant
+    db = create_session()
+    populate(db, 1, seed=0, **SCALES[scale])
+    with assert_max_queries(db, ProblemInstance.ROUND_TRIPS):
+        instance = ProblemInstance.from_db(db, 1)
+    assert instance.courses and instance.sections and instance.teachers and instance.rooms
+
+
+def test_from_db_for_some_sections_stays_within_round_trips():
+    db = create_session()
+    populate(db, 1, seed=0, **SCALES['small'])
+    section_ids = [section.id for section in db.query(Section).limit(2)]
+    with assert_max_queries(db, ProblemInstance.ROUND_TRIPS):
+        instance = ProblemInstance.from_db(db, 1, section_ids)
+    assert set(instance.sections) == set(section_ids)
+    assert {course.section_id for course in instance.courses.values()} == set(section_ids)
+
+
+def test_assert_max_queries_fails_on_extra_round_trips():
+    # A per-row lazy load on top of the snapshot must not go unnoticed
+    db = create_session()
+    populate(db, 1, seed=0, **SCALES['small'])
+    with pytest.raises(AssertionError, match="Expected at most"):
+        with assert_max_queries(db, ProblemInstance.ROUND_TRIPS):
+            ProblemInstance.from_db(db, 1)
+            for section in db.query(Section).all():
+                section.branch.name
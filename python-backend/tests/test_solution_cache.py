@@ -0,0 +1,35 @@
+import os
+from services.solution_cache import SolutionCache
+
+TAGS = ('section:1', 'teachers')
+
+
+def test_versions_table_is_created_on_first_use(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = SolutionCache(versions_path=path)
+    assert not os.path.exists(path)
+    cache.put('fp', {'x': 1}, TAGS)
+    assert cache.get('fp') == {'x': 1}
+    assert os.path.exists(path)
+
+
+def test_invalidate_reaches_other_workers(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    first, second = SolutionCache(versions_path=path), SolutionCache(versions_path=path)
+    for cache in (first, second):
+        cache.put('fp', {'x': 1}, TAGS)
+        cache.set_alias('request', 'fp', TAGS)
+    assert second.get_alias('request') == {'x': 1}
+
+    first.invalidate('teachers')
+    assert second.get_alias('request') is None
+    assert second.get('fp') is None
+
+
+def test_result_computed_across_an_invalidation_is_stale(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache, writer = SolutionCache(versions_path=path), SolutionCache(versions_path=path)
+    versions = cache.versions(TAGS)
+    writer.invalidate('section:1')
+    cache.put('fp', {'x': 1}, TAGS, versions)
+    assert cache.get('fp') is None
@@ -0,0 +1,49 @@
+import os
+import sqlite3
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from services.solver_backends import get_solver, solver_names
+
+client = TestClient(app)
+
+# More weekly hours for one teacher than the default grid has periods
+SECTION_ID = 90
+OVERLOADED_COURSES = 60
+
+
+@pytest.fixture(scope='module', autouse=True)
+def overloaded_section():
+    # The public generator reads the raw-SQL tables
+    connection = sqlite3.connect(os.environ['DB_PATH'])
+    connection.executescript('''
+        CREATE TABLE IF NOT EXISTS courses (id INTEGER PRIMARY KEY, name TEXT, teacher TEXT, room TEXT,
+                                            section_id INTEGER, user_id INTEGER);
+        CREATE TABLE IF NOT EXISTS subjects (id INTEGER PRIMARY KEY, name TEXT, code TEXT);
+        CREATE TABLE IF NOT EXISTS teachers (id INTEGER PRIMARY KEY, name TEXT);
+        CREATE TABLE IF NOT EXISTS rooms (id INTEGER PRIMARY KEY, number TEXT, building TEXT);
+    ''')
+    connection.executemany(
+        "INSERT INTO courses (name, teacher, room, section_id, user_id) VALUES (?, 'Ann', '101', ?, 1)",
+        [(f"Course {index}", SECTION_ID) for index in range(OVERLOADED_COURSES)]
+    )
+    connection.commit()
+    connection.close()
+
+
+def test_solvers_listing_states_the_failure_contract():
+    listed = {solver['name']: solver for solver in client.get('/api/university/timetables/solvers').json()['data']}
+    assert set(listed) == set(solver_names())
+    for name, solver in listed.items():
+        assert solver['partial_results'] == get_solver(name).partial_results
+        assert solver['on_failure']
+
+
+@pytest.mark.parametrize('solver', solver_names())
+def test_public_generate_follows_the_listed_contract(solver):
+    response = client.post('/api/university/timetables/generate/public', json={'section_id': SECTION_ID, 'solver': solver})
+    if get_solver(solver).partial_results:
+        assert response.status_code == 200
+        assert response.json()['data']['complete'] is False
+    else:
+        assert response.status_code == 400